@@ -1,3 +1,30 @@
 from django.contrib import admin
+from django.contrib.auth.admin import UserAdmin
+from django.contrib.auth.models import User
+from django.db.models.functions import Lower
 
-# Register your models here.
+from todos.admin import EstimatedCountPaginator, prefix_range
+
+admin.site.unregister(User)
+
+
+@admin.register(User)
+class FastUserAdmin(UserAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+    ordering = ('-id',)
+    list_filter = ('is_staff', 'is_superuser', 'is_active')
+    search_fields = ('username', 'email')
+    search_help_text = 'Username prefix (case-sensitive) or email prefix'
+
+    def get_search_results(self, request, queryset, search_term):
+        # Ranges on the username index and on accounts_user_email_ci_uniq
+        # (LOWER(email) WHERE email > ''), instead of a LIKE over every row
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        by_username = queryset.filter(**prefix_range('username', search_term))
+        by_email = (queryset.alias(email_lower=Lower('email')).filter(email__gt='')
+                    .filter(**prefix_range('email_lower', search_term.lower())))
+        return by_username | by_email, False
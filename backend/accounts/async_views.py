@@ -0,0 +1,106 @@
+"""
+Async login and sign-up for ASGI deployments (`config.asgi`), mounted under
+/api/auth/async/ with the same payloads as the DRF views.
+
+Password hashing is deliberately slow CPU work. Here it runs, together with
+the queries around it, on a pool of ACCOUNTS_HASH_WORKERS threads: the event
+loop keeps serving other requests meanwhile, and a sign-up spike queues on
+the pool instead of occupying every worker.
+"""
+import json
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.authtoken.models import Token
+from rest_framework.authtoken.serializers import AuthTokenSerializer
+from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+from rest_framework.utils.encoders import JSONEncoder
+
+from todos.throttling import consume
+from .serializers import UserSerializer
+
+_hash_pool = ThreadPoolExecutor(max_workers=settings.ACCOUNTS_HASH_WORKERS, thread_name_prefix='accounts-hash')
+
+
+def _on_hash_pool(func):
+    def run(*args):
+        try:
+            return func(*args)
+        finally:
+            # Same connection handling as at the end of a sync request
+            close_old_connections()
+    return sync_to_async(run, thread_sensitive=False, executor=_hash_pool)
+
+
+def _json(data, status=200):
+    return JsonResponse(data, status=status, safe=False, encoder=JSONEncoder)
+
+
+def async_auth_view(view):
+    """POST-only, anonymous-throttled endpoint receiving the parsed JSON or form body."""
+    @csrf_exempt
+    async def wrapper(request):
+        if request.method != 'POST':
+            return _json({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get('anon')
+        wait = await sync_to_async(consume)(f'anon:{BaseThrottle().get_ident(request)}', rate) if rate else None
+        if wait is not None:
+            response = _json({'detail': f'Request was throttled. Expected available in {math.ceil(wait)} seconds.'},
+                             status=429)
+            response['Retry-After'] = str(math.ceil(wait))
+            return response
+        if request.content_type == 'application/json':
+            try:
+                data = json.loads(request.body or b'{}')
+            except ValueError:
+                return _json({'detail': 'JSON parse error'}, status=400)
+        else:
+            data = request.POST
+        return await view(request, data)
+    return wrapper
+
+
+def _login(request, data):
+    serializer = AuthTokenSerializer(data=data, context={'request': request})
+    if not serializer.is_valid():
+        return None, serializer.errors
+    return serializer.validated_data['user'], None
+
+
+def _register(data):
+    serializer = UserSerializer(data=data)
+    if not serializer.is_valid():
+        return None, serializer.errors
+    try:
+        serializer.save()
+    except ValidationError as exc:
+        return None, exc.detail
+    return serializer.data, None
+
+
+@async_auth_view
+async def login(request, data):
+    user, errors = await _on_hash_pool(_login)(request, data)
+    if errors:
+        return _json(errors, status=400)
+    token, _ = await Token.objects.aget_or_create(user=user)
+    return _json({
+        'token': token.key,
+        'user_id': user.pk,
+        'username': user.username
+    })
+
+
+@async_auth_view
+async def register(request, data):
+    payload, errors = await _on_hash_pool(_register)(data)
+    if errors:
+        return _json(errors, status=400)
+    return _json(payload, status=201)
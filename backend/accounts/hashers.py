@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher as DjangoPBKDF2PasswordHasher
+
+
+class PBKDF2PasswordHasher(DjangoPBKDF2PasswordHasher):
+    """
+    Django's PBKDF2-SHA256 with the work factor taken from
+    ACCOUNTS_PBKDF2_ITERATIONS (Django's own count when unset). Same algorithm
+    name, so existing hashes keep verifying and are re-encoded with the new
+    count on the user's next login.
+    """
+
+    @property
+    def iterations(self):
+        return settings.ACCOUNTS_PBKDF2_ITERATIONS or DjangoPBKDF2PasswordHasher.iterations
@@ -0,0 +1,47 @@
+import logging
+
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+INDEX_NAME = 'accounts_user_email_ci_uniq'
+
+logger = logging.getLogger(__name__)
+
+
+def create_email_index(apps, schema_editor):
+    """
+    Unique index on LOWER(email) for non-empty emails (users created with
+    createsuperuser may have none). PostgreSQL and SQLite support partial
+    expression indexes; other backends keep relying on the serializer check.
+    If existing users already share an email the index is created non-unique,
+    so the lookup is still indexed, and the duplicates are reported.
+    """
+    if schema_editor.connection.vendor not in ('postgresql', 'sqlite'):
+        return
+    User = apps.get_model('auth', 'User')
+    duplicates = (User.objects.using(schema_editor.connection.alias).exclude(email='')
+                  .values(email_lower=Lower('email')).annotate(n=Count('id')).filter(n__gt=1))
+    unique = 'UNIQUE ' if not duplicates.exists() else ''
+    if not unique:
+        logger.warning('%d emails are shared by several users; %s is not unique', duplicates.count(), INDEX_NAME)
+    table = schema_editor.quote_name(User._meta.db_table)
+    schema_editor.execute(
+        f"CREATE {unique}INDEX {schema_editor.quote_name(INDEX_NAME)} ON {table} (LOWER(email)) WHERE email > ''"
+    )
+
+
+def drop_email_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('postgresql', 'sqlite'):
+        schema_editor.execute(f'DROP INDEX IF EXISTS {schema_editor.quote_name(INDEX_NAME)}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_email_index, drop_email_index),
+    ]
@@ -1,6 +1,12 @@
 from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
 from rest_framework import serializers
 
+def users_with_email(email):
+    """Case-insensitive email match, shaped to use accounts_user_email_ci_uniq."""
+    return User.objects.alias(email_lower=Lower('email')).filter(email_lower=email.lower(), email__gt='')
+
 class UserSerializer(serializers.ModelSerializer):
     email = serializers.EmailField(required=True)
     password = serializers.CharField(write_only=True, required=True, style={'input_type': 'password'})
@@ -19,12 +25,25 @@ class UserSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError({"password": "Las contraseñas no coinciden."})
         
         email = data.get('email')
-        if User.objects.filter(email=email).exists():
+        others = users_with_email(email) if email else User.objects.none()
+        if self.instance is not None:
+            others = others.exclude(pk=self.instance.pk)
+        if others.exists():
              raise serializers.ValidationError({"email": "Este correo electrónico ya está registrado."})
              
         return data
 
     def create(self, validated_data):
         validated_data.pop('confirm_password')
-        user = User.objects.create_user(**validated_data)
+        try:
+            # Savepoint, so the lookup below still works inside a transaction
+            with transaction.atomic():
+                user = User.objects.create_user(**validated_data)
+        except IntegrityError:
+            # Lost a race with a concurrent sign-up: same username or (via the index) email
+            if User.objects.filter(username=validated_data['username']).exists():
+                raise serializers.ValidationError(
+                    {"username": User._meta.get_field('username').error_messages['unique']}
+                )
+            raise serializers.ValidationError({"email": "Este correo electrónico ya está registrado."})
         return user
@@ -1,3 +1,36 @@
-from django.test import TestCase
+from django.contrib.auth.hashers import PBKDF2PasswordHasher as DjangoPBKDF2PasswordHasher
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework import serializers
 
-# Create your tests here.
+from .hashers import PBKDF2PasswordHasher
+from .serializers import UserSerializer
+
+
+class PBKDF2IterationsTests(SimpleTestCase):
+    @override_settings(ACCOUNTS_PBKDF2_ITERATIONS=None)
+    def test_unset_uses_djangos_count(self):
+        self.assertEqual(PBKDF2PasswordHasher().iterations, DjangoPBKDF2PasswordHasher.iterations)
+
+    @override_settings(ACCOUNTS_PBKDF2_ITERATIONS=1000)
+    def test_setting_overrides_it(self):
+        self.assertEqual(PBKDF2PasswordHasher().iterations, 1000)
+
+
+class RegisterRaceTests(TestCase):
+    """create() after validate() passed, with the other sign-up already committed."""
+
+    def setUp(self):
+        User.objects.create_user('ana', email='ana@example.com', password='secret')
+
+    def create(self, **fields):
+        data = {'username': 'luis', 'email': 'luis@example.com', 'password': 'secret', 'confirm_password': 'secret'}
+        with self.assertRaises(serializers.ValidationError) as raised:
+            UserSerializer().create({**data, **fields})
+        return raised.exception.detail
+
+    def test_taken_username_is_reported_on_username(self):
+        self.assertEqual(list(self.create(username='ana')), ['username'])
+
+    def test_taken_email_is_reported_on_email(self):
+        self.assertEqual(list(self.create(email='ANA@example.com')), ['email'])
@@ -1,8 +1,12 @@
 from django.urls import path
+from . import async_views
 from .views import RegisterView, CustomAuthToken, UserDetailView
 
 urlpatterns = [
     path('register/', RegisterView.as_view(), name='register'),
     path('login/', CustomAuthToken.as_view(), name='login'),
     path('profile/', UserDetailView.as_view(), name='profile'),
+    # ASGI only: see accounts/async_views.py
+    path('async/login/', async_views.login, name='async-login'),
+    path('async/register/', async_views.register, name='async-register'),
 ]
@@ -0,0 +1,87 @@
+"""
+In-process variant of load_test.py: drives `config.asgi.application`
+directly on one event loop, so no server is needed. Sync DRF views run
+the way an ASGI server runs them (on the shared sync thread), so they can
+be compared with the /api/async/ endpoints:
+
+    python benchmarks/asgi_load_test.py --token <key> \\
+        /api/tasks/ /api/async/tasks/
+
+Uses the database configured in config.settings; the token is from
+/api/auth/login/. The client, the server and the database share one
+process (and its GIL), so compare paths with each other rather than with
+the numbers from a real server.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+from load_test import report  # noqa: E402
+
+
+async def fetch(application, path, token):
+    path, _, query = path.partition('?')
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+        'path': path, 'raw_path': path.encode(), 'query_string': query.encode(), 'root_path': '',
+        'headers': [(b'host', b'testserver')] + ([(b'authorization', f'Token {token}'.encode())] if token else []),
+        'client': ('127.0.0.1', 0), 'server': ('testserver', 80),
+    }
+    statuses = []
+    body_sent, done = False, asyncio.Event()
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        # The handler listens for a disconnect while the view runs
+        await done.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            statuses.append(message['status'])
+        elif message['type'] == 'http.response.body' and not message.get('more_body'):
+            done.set()
+
+    started = time.perf_counter()
+    await application(scope, receive, send)
+    return statuses == [200], time.perf_counter() - started
+
+
+async def run(application, path, token, requests, concurrency):
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with slots:
+            return await fetch(application, path, token)
+
+    # Warm up caches and the executor's threads
+    await asyncio.gather(*(one() for _ in range(concurrency)))
+    started = time.perf_counter()
+    results = await asyncio.gather(*(one() for _ in range(requests)))
+    return report(path, results, time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('paths', nargs='+')
+    parser.add_argument('--token', help='DRF auth token of the user to query as')
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=32)
+    args = parser.parse_args()
+
+    from config.asgi import application
+    for path in args.paths:
+        print(asyncio.run(run(application, path, args.token, args.requests, args.concurrency)))
+
+
+if __name__ == '__main__':
+    main()
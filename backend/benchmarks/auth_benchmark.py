@@ -0,0 +1,90 @@
+"""
+Sign-up and login throughput.
+
+Registers --users fresh accounts, then logs each of them in, with
+--concurrency client threads, against one or more API roots:
+
+    python benchmarks/auth_benchmark.py http://127.0.0.1:8001/api/auth/
+    python benchmarks/auth_benchmark.py --async-views http://127.0.0.1:8002/api/auth/
+
+`--async-views` targets async/register/ and async/login/ (ASGI only, see
+accounts/async_views.py) instead of the DRF views. Compare runs with
+different ACCOUNTS_PBKDF2_ITERATIONS / ACCOUNTS_HASH_WORKERS in the server's
+environment. Usernames get a random prefix so runs don't collide; the
+accounts are left in the database.
+
+The anonymous throttle rate (200/minute per client IP) will reject most of
+a large run; raise 'anon' in DEFAULT_THROTTLE_RATES on the server under test.
+"""
+import argparse
+import json
+import statistics
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+PASSWORD = 'bench-Password-2024'
+
+
+def post(url, payload):
+    request = urllib.request.Request(
+        url, data=json.dumps(payload).encode(), headers={'Content-Type': 'application/json'}, method='POST'
+    )
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            response.read()
+            ok = response.status in (200, 201)
+    except (urllib.error.URLError, TimeoutError):
+        ok = False
+    return ok, time.perf_counter() - started
+
+
+def signup_payload(username):
+    return {
+        'username': username, 'email': f'{username}@example.com', 'first_name': 'Bench', 'last_name': 'User',
+        'password': PASSWORD, 'confirm_password': PASSWORD,
+    }
+
+
+def phase(name, url, payloads, concurrency):
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        started = time.perf_counter()
+        results = list(pool.map(lambda payload: post(url, payload), payloads))
+        elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for ok, latency in results if ok)
+    errors = len(results) - len(latencies)
+    if not latencies:
+        return f'  {name:<8} all {errors} requests failed'
+    percentile = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+    return (
+        f'  {name:<8} {len(latencies) / elapsed:8.1f} req/s   errors: {errors}   '
+        f'latency ms  p50 {percentile(0.5):7.1f}  p95 {percentile(0.95):7.1f}  p99 {percentile(0.99):7.1f}  '
+        f'mean {statistics.mean(latencies) * 1000:7.1f}'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('roots', nargs='+', help='Auth API root, e.g. http://127.0.0.1:8000/api/auth/')
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--async-views', action='store_true')
+    args = parser.parse_args()
+
+    prefix = 'async/' if args.async_views else ''
+    for root in args.roots:
+        root = root.rstrip('/') + '/'
+        run_id = uuid.uuid4().hex[:8]
+        usernames = [f'bench_{run_id}_{i}' for i in range(args.users)]
+        print(root + prefix)
+        print(phase('signup', f'{root}{prefix}register/', [signup_payload(name) for name in usernames], args.concurrency))
+        print(phase('login', f'{root}{prefix}login/',
+                    [{'username': name, 'password': PASSWORD} for name in usernames], args.concurrency))
+
+
+if __name__ == '__main__':
+    main()
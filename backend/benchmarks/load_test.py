@@ -0,0 +1,77 @@
+"""
+Small HTTP load generator to compare the sync (WSGI) and async (ASGI) API.
+
+Start the same project under both servers (gunicorn and uvicorn are not in
+requirements.txt; `pip install gunicorn uvicorn`):
+
+    gunicorn config.wsgi -w 1 --threads 8 -b 127.0.0.1:8001
+    uvicorn config.asgi:application --workers 1 --port 8002
+
+then run, with a token from /api/auth/login/:
+
+    python benchmarks/load_test.py --token <key> \\
+        http://127.0.0.1:8001/api/statistics/ \\
+        http://127.0.0.1:8002/api/statistics/ \\
+        http://127.0.0.1:8002/api/async/statistics/
+
+Each URL gets --requests requests from --concurrency client threads, and
+the report shows throughput and latency percentiles per URL.
+"""
+import argparse
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def fetch(url, token):
+    request = urllib.request.Request(url, headers={'Authorization': f'Token {token}'} if token else {})
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            response.read()
+            ok = response.status == 200
+    except (urllib.error.URLError, TimeoutError):
+        ok = False
+    return ok, time.perf_counter() - started
+
+
+def run(url, token, requests, concurrency):
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        # Warm up connections, caches and the server's worker threads
+        list(pool.map(lambda _: fetch(url, token), range(concurrency)))
+        started = time.perf_counter()
+        results = list(pool.map(lambda _: fetch(url, token), range(requests)))
+        elapsed = time.perf_counter() - started
+    return report(url, results, elapsed)
+
+
+def report(url, results, elapsed):
+    """Throughput and latency percentiles of `results`, (ok, seconds) pairs."""
+    latencies = sorted(latency for ok, latency in results if ok)
+    errors = len(results) - len(latencies)
+    if not latencies:
+        return f'{url}\n  all {errors} requests failed'
+    percentile = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+    return (
+        f'{url}\n'
+        f'  {len(latencies) / elapsed:8.1f} req/s   errors: {errors}\n'
+        f'  latency ms  p50 {percentile(0.5):7.1f}  p95 {percentile(0.95):7.1f}  '
+        f'p99 {percentile(0.99):7.1f}  mean {statistics.mean(latencies) * 1000:7.1f}'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('urls', nargs='+')
+    parser.add_argument('--token', help='DRF auth token of the user to query as')
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=32)
+    args = parser.parse_args()
+    for url in args.urls:
+        print(run(url, args.token, args.requests, args.concurrency))
+
+
+if __name__ == '__main__':
+    main()
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -50,12 +51,18 @@ REST_FRAMEWORK = {
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.AnonRateThrottle',
-        'rest_framework.throttling.UserRateThrottle'
+        'todos.throttling.TokenBucketThrottle',
     ],
+    # Token-bucket rates; a full bucket holds one period's worth of requests.
+    # Views pick the scope with `throttle_scope` / `throttle_scopes`.
     'DEFAULT_THROTTLE_RATES': {
         'anon': '200/minute',
         'user': '1000/minute',
+        'toggle': '3000/minute',
+        'statistics': '60/minute',
+        'export': '10/minute',
+        'import': '10/minute',
+        'batch': '200/minute',
     }
 }
 
@@ -106,6 +113,102 @@ DATABASES = {
     }
 }
 
+# Optional per-user sharding of the todos data (see todos/sharding.py).
+# TODOS_SHARD_COUNT=N adds N SQLite databases `shard_0`..`shard_{N-1}`;
+# create their tables with `python manage.py shards migrate`.
+TODOS_SHARD_COUNT = int(os.environ.get('TODOS_SHARD_COUNT', '0'))
+TODOS_SHARDS = [f'shard_{i}' for i in range(TODOS_SHARD_COUNT)]
+for _alias in TODOS_SHARDS:
+    DATABASES[_alias] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / f'db_{_alias}.sqlite3',
+    }
+
+if TODOS_SHARDS:
+    DATABASE_ROUTERS = ['todos.routers.UserShardRouter']
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index('django.contrib.auth.middleware.AuthenticationMiddleware') + 1,
+        'todos.sharding.ShardContextMiddleware',
+    )
+
+
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+# Per-process memory by default. Per-user payloads are invalidated through a
+# version kept in the database, so that is correct with several workers too;
+# a shared backend (Redis, Memcached) lets them also share the computed values.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Seconds that per-user cached payloads (e.g. sidebar counts) are kept
+TODOS_USER_CACHE_TIMEOUT = 300
+
+# Where throttle buckets are kept: 'database' (the ThrottleBucket table; one
+# atomic UPDATE per request, shared by every worker) or 'cache' (the default
+# cache above: cheaper, but only shared with a shared cache backend, and not
+# atomic, so concurrent requests may slip one past the limit)
+TODOS_THROTTLE_STORE = 'database'
+
+
+# Background jobs (todos.Job, executed by `manage.py run_workers`)
+# Heavy writes (emptying the trash, bulk deletes, using a template) answer
+# 202 + job id while a worker is running, unless the request has ?async=0;
+# with no live worker, or when False, they run in the request. ?async=1 asks
+# for a job explicitly and gets a 503 when no worker is running.
+TODOS_ASYNC_JOBS = True
+# Base retry delay in seconds; doubles on every failed attempt
+TODOS_JOB_RETRY_DELAY = 30
+# A worker that hasn't checked in for this many seconds counts as gone
+TODOS_WORKER_TIMEOUT = 60
+# Days finished (succeeded / failed) jobs are kept before run_workers deletes them
+TODOS_JOB_RETENTION_DAYS = 7
+
+
+# Days a task stays in the trash before `manage.py purge_trash` deletes it
+TODOS_TRASH_RETENTION_DAYS = 30
+
+
+# Completed tasks untouched for this many days are archived by `manage.py archive_tasks`
+TODOS_ARCHIVE_AFTER_DAYS = 90
+
+
+# Maximum number of sub-requests in one POST /api/batch/
+TODOS_BATCH_MAX_REQUESTS = 20
+
+
+# Task updates within this many seconds of the previous one are merged into a
+# single UPDATED activity row (0 logs every save separately)
+TODOS_ACTIVITY_COALESCE_SECONDS = 300
+
+
+# Where `manage.py run_reminders` delivers due-date reminders. Any class with
+# a send(reminders) method; todos.reminders.FileNotifier takes {'path': ...}.
+TODOS_REMINDER_NOTIFIER = {
+    'BACKEND': 'todos.reminders.ConsoleNotifier',
+}
+
+
+# Password hashing: Django's default hashers, with the PBKDF2 work factor
+# configurable. Changing it re-hashes each password on its owner's next login.
+PASSWORD_HASHERS = [
+    'accounts.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+# None: the default of the installed Django version
+ACCOUNTS_PBKDF2_ITERATIONS = (
+    int(os.environ['ACCOUNTS_PBKDF2_ITERATIONS']) if 'ACCOUNTS_PBKDF2_ITERATIONS' in os.environ else None
+)
+# Threads the async login/register views hash passwords on (under ASGI),
+# so hashing never blocks the event loop and spikes queue instead of piling up
+ACCOUNTS_HASH_WORKERS = int(os.environ.get('ACCOUNTS_HASH_WORKERS', os.cpu_count() or 2))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -0,0 +1,78 @@
+"""
+UPDATED events are coalesced: a save that comes within
+TODOS_ACTIVITY_COALESCE_SECONDS of the target's previous UPDATED row (and
+with nothing else logged for it in between) is folded into that row, which
+keeps a change count and a {field: [old, new]} summary. CREATED, COMPLETED
+and DELETED events always get their own row.
+"""
+from datetime import date, datetime, timedelta
+
+from django.conf import settings
+from django.db import router, transaction
+from django.utils import timezone
+
+from .models import ActivityLog
+
+# Task fields whose changes are summarized in ActivityLog.changes
+TRACKED_TASK_FIELDS = (
+    'title', 'description', 'priority', 'due_date', 'project_id', 'is_important', 'completed',
+    'is_deleted', 'is_archived', 'recurrence', 'reminder_offset',
+)
+
+
+def _json_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def snapshot(instance, fields):
+    return {field: _json_value(getattr(instance, field)) for field in fields}
+
+
+def diff(before, after):
+    return {field: [before[field], after[field]] for field in before if before[field] != after[field]}
+
+
+def merge_changes(existing, new):
+    """Keep the first old value and the latest new one; drop fields that ended where they started."""
+    merged = dict(existing)
+    for field, (old, value) in new.items():
+        if field in merged:
+            old = merged[field][0]
+        if old == value:
+            merged.pop(field, None)
+        else:
+            merged[field] = [old, value]
+    return merged
+
+
+def log_update(user, target_type, target_id, target_name, details, changes):
+    window = settings.TODOS_ACTIVITY_COALESCE_SECONDS
+    now = timezone.now()
+    if window and target_id is not None:
+        using = router.db_for_write(ActivityLog, instance=user)
+        with transaction.atomic(using=using):
+            latest = (ActivityLog.objects.using(using).select_for_update()
+                      .filter(user=user, target_type=target_type, target_id=target_id)
+                      .order_by('-timestamp', '-id').first())
+            if latest is not None and latest.action == 'UPDATED' and latest.timestamp >= now - timedelta(seconds=window):
+                # A row opened by a save that changed no tracked field
+                # takes the first real change instead of counting it
+                if changes and (latest.changes or latest.change_count > 1):
+                    latest.change_count += 1
+                latest.changes = merge_changes(latest.changes, changes)
+                latest.target_name = target_name
+                latest.details = details
+                latest.timestamp = now
+                latest.save(update_fields=['changes', 'change_count', 'target_name', 'details', 'timestamp'])
+                return latest
+    return ActivityLog.objects.create(
+        user=user,
+        action='UPDATED',
+        target_type=target_type,
+        target_id=target_id,
+        target_name=target_name,
+        details=details,
+        changes=changes,
+    )
@@ -1,3 +1,202 @@
 from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.utils.functional import cached_property
 
-# Register your models here.
+from .models import (
+    Task, Project, Tag, Subtask, Comment, ActivityLog, DailyStat, Template, TemplateItem, Job, ThrottleBucket,
+    UserCacheVersion, WorkerHeartbeat,
+)
+
+
+def estimated_row_count(model, using):
+    """The database's own row estimate for the model's table, or None if it has none."""
+    connection = connections[using]
+    table = model._meta.db_table
+    queries = {
+        'postgresql': ('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table]),
+        'mysql': ('SELECT table_rows FROM information_schema.tables '
+                  'WHERE table_schema = DATABASE() AND table_name = %s', [table]),
+        # Only filled in by ANALYZE; the first number is the table's row count
+        'sqlite': ('SELECT stat FROM sqlite_stat1 WHERE tbl = %s AND idx IS NULL', [table]),
+    }
+    if connection.vendor not in queries:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(*queries[connection.vendor])
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    if row is None or row[0] is None:
+        return None
+    value = int(str(row[0]).split()[0])
+    return value if value >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Never runs an exact COUNT(*) over a whole table: an unfiltered changelist
+    uses the database's row estimate, a filtered one counts at most
+    COUNT_LIMIT rows (so only the first pages are reachable).
+    """
+    COUNT_LIMIT = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None:
+                return estimate
+        return queryset.order_by()[:self.COUNT_LIMIT].count()
+
+
+def prefix_range(field, prefix):
+    """
+    Lookups for `field` starting with `prefix` (case-sensitive) as a range,
+    which an index on the column can serve; LIKE 'prefix%' can't on SQLite
+    (case-insensitive LIKE) nor with istartswith's UPPER() on PostgreSQL.
+    """
+    lookups = {f'{field}__gte': prefix, f'{field}__startswith': prefix}
+    if ord(prefix[-1]) < 0x10FFFF:
+        lookups[f'{field}__lt'] = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return lookups
+
+
+class FastModelAdmin(admin.ModelAdmin):
+    """
+    Changelists that stay cheap on large tables: no exact counts, newest
+    first by primary key, related objects joined instead of fetched per row,
+    raw-id widgets instead of <select>s over every user/task, and a search
+    limited to lookups that hit an index.
+
+    With sharding enabled the todos models are read through the shard
+    router like everywhere else, i.e. from the shard of the signed-in admin.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+    ordering = ('-id',)
+    # get_search_results() below decides what is searched
+    search_fields = ('id',)
+    search_help_text = 'Exact id, or exact username of the owner'
+    # Path to the owning user, None when the model has none
+    user_lookup = 'user'
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        if search_term.isdigit():
+            return queryset.filter(pk=int(search_term)), False
+        if self.user_lookup is None:
+            return queryset.none(), False
+        user_ids = User.objects.filter(username=search_term).values('pk')
+        return queryset.filter(**{f'{self.user_lookup}__in': user_ids}), False
+
+
+@admin.register(Task)
+class TaskAdmin(FastModelAdmin):
+    list_display = ('id', 'title', 'user', 'project', 'priority', 'completed', 'is_important', 'due_date',
+                    'is_deleted', 'is_archived', 'updated_at')
+    list_select_related = ('user', 'project')
+    list_filter = ('completed', 'is_deleted', 'is_archived', 'is_important', 'priority')
+    raw_id_fields = ('user', 'project', 'tags', 'recurrence_parent')
+    readonly_fields = ('created_at', 'updated_at', 'position', 'urgency')
+
+
+@admin.register(Project)
+class ProjectAdmin(FastModelAdmin):
+    list_display = ('id', 'name', 'user', 'created_at')
+    list_select_related = ('user',)
+    raw_id_fields = ('user',)
+
+
+@admin.register(Tag)
+class TagAdmin(FastModelAdmin):
+    list_display = ('id', 'name', 'user')
+    list_select_related = ('user',)
+    raw_id_fields = ('user',)
+
+
+@admin.register(Subtask)
+class SubtaskAdmin(FastModelAdmin):
+    list_display = ('id', 'title', 'task', 'completed')
+    list_select_related = ('task',)
+    list_filter = ('completed',)
+    raw_id_fields = ('task',)
+    readonly_fields = ('position',)
+    user_lookup = 'task__user'
+
+
+@admin.register(Comment)
+class CommentAdmin(FastModelAdmin):
+    list_display = ('id', 'user', 'task', 'created_at')
+    # Comment.__str__ reads user and task
+    list_select_related = ('user', 'task')
+    raw_id_fields = ('user', 'task')
+
+
+@admin.register(ActivityLog)
+class ActivityLogAdmin(FastModelAdmin):
+    list_display = ('id', 'timestamp', 'user', 'action', 'target_type', 'target_name')
+    list_select_related = ('user',)
+    list_filter = ('action',)
+    raw_id_fields = ('user',)
+
+
+@admin.register(DailyStat)
+class DailyStatAdmin(FastModelAdmin):
+    list_display = ('id', 'day', 'user', 'created', 'completed')
+    list_select_related = ('user',)
+    raw_id_fields = ('user',)
+
+
+class TemplateItemInline(admin.TabularInline):
+    model = TemplateItem
+    extra = 0
+
+
+@admin.register(Template)
+class TemplateAdmin(FastModelAdmin):
+    list_display = ('id', 'title', 'category', 'user', 'updated_at')
+    list_select_related = ('user',)
+    raw_id_fields = ('user',)
+    inlines = [TemplateItemInline]
+
+
+@admin.register(Job)
+class JobAdmin(FastModelAdmin):
+    list_display = ('id', 'kind', 'user', 'status', 'progress', 'attempts', 'run_at', 'finished_at')
+    list_select_related = ('user',)
+    list_filter = ('status',)
+    raw_id_fields = ('user',)
+
+
+@admin.register(WorkerHeartbeat)
+class WorkerHeartbeatAdmin(admin.ModelAdmin):
+    list_display = ('name', 'seen_at')
+    ordering = ('name',)
+
+
+@admin.register(UserCacheVersion)
+class UserCacheVersionAdmin(FastModelAdmin):
+    list_display = ('user', 'version')
+    list_select_related = ('user',)
+    ordering = ('-pk',)
+    raw_id_fields = ('user',)
+
+
+@admin.register(ThrottleBucket)
+class ThrottleBucketAdmin(FastModelAdmin):
+    list_display = ('key', 'tat')
+    ordering = ('key',)
+    search_help_text = 'Key prefix (case-sensitive), e.g. "user:42"'
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        return queryset.filter(**prefix_range('key', search_term)), False
@@ -7,3 +7,4 @@ class TodosConfig(AppConfig):
 
     def ready(self):
         import todos.signals
+        import todos.throttling  # noqa: F401 (registers its system check)
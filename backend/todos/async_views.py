@@ -0,0 +1,113 @@
+"""
+Async versions of the read-heavy endpoints, for ASGI deployments
+(`config.asgi`). They are mounted under /api/async/ and return the same
+payloads as their DRF counterparts.
+
+DRF views are synchronous, so these are plain Django async views: they
+authenticate with the same token / session credentials and reuse the DRF
+serializers on fully prefetched objects (serializing then runs no queries).
+"""
+import math
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from rest_framework.settings import api_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.utils.encoders import JSONEncoder
+
+from .models import Task, ActivityLog
+from .serializers import TaskSerializer, ActivityLogSerializer
+from .statistics import abuild_statistics, in_own_connection
+from .throttling import consume
+from .views import list_tasks, prefetch_task_relations
+
+
+def _json(data, status=200):
+    return JsonResponse(data, status=status, safe=False, encoder=JSONEncoder)
+
+
+async def _authenticate(request):
+    """Same credentials as REST_FRAMEWORK's TokenAuthentication and SessionAuthentication."""
+    header = request.headers.get('Authorization', '').split()
+    if header and header[0] == 'Token':
+        if len(header) != 2:
+            return None
+        token = await Token.objects.select_related('user').filter(key=header[1]).afirst()
+        if token is None or not token.user.is_active:
+            return None
+        return token.user
+    user = await request.auser()
+    return user if user.is_authenticated else None
+
+
+def async_api_view(view, throttle_scope='user'):
+    """GET-only, authenticated and throttled (like the DRF views) async endpoint."""
+    if not callable(view):
+        return lambda func: async_api_view(func, throttle_scope=view)
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != 'GET':
+            return _json({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+        user = await _authenticate(request)
+        if user is None:
+            response = _json({'detail': 'Authentication credentials were not provided.'}, status=401)
+            response['WWW-Authenticate'] = 'Token'
+            return response
+        # Also what the shard router reads for this request
+        request.user = user
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(throttle_scope)
+        wait = await sync_to_async(consume)(f'{throttle_scope}:{user.pk}', rate) if rate else None
+        if wait is not None:
+            response = _json({'detail': f'Request was throttled. Expected available in {math.ceil(wait)} seconds.'},
+                             status=429)
+            response['Retry-After'] = str(math.ceil(wait))
+            return response
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+def _task_queryset(user):
+    return prefetch_task_relations(Task.objects.filter(user=user, is_deleted=False))
+
+
+@async_api_view('statistics')
+async def statistics(request):
+    return _json(await abuild_statistics(request.user))
+
+
+@async_api_view
+async def task_list(request):
+    # Same query parameters and payload as TaskViewSet.list. Not on the
+    # shared sync thread (where the async ORM and every DRF view queue up):
+    # concurrent lists run on executor threads with their own connections
+    try:
+        data = await sync_to_async(in_own_connection(list_tasks), thread_sensitive=False)(
+            _task_queryset(request.user), request.GET, lambda tasks: TaskSerializer(tasks, many=True).data
+        )
+    except ValueError as exc:
+        return _json({'error': str(exc)}, status=400)
+    return _json(data)
+
+
+@async_api_view
+async def task_detail(request, pk):
+    task = await _task_queryset(request.user).filter(pk=pk).afirst()
+    if task is None:
+        return _json({'detail': 'No Task matches the given query.'}, status=404)
+    return _json(TaskSerializer(task).data)
+
+
+@async_api_view
+async def activity_list(request):
+    logs = [log async for log in ActivityLog.objects.filter(user=request.user)]
+    return _json(ActivityLogSerializer(logs, many=True).data)
+
+
+@async_api_view
+async def activity_detail(request, pk):
+    log = await ActivityLog.objects.filter(user=request.user, pk=pk).afirst()
+    if log is None:
+        return _json({'detail': 'No ActivityLog matches the given query.'}, status=404)
+    return _json(ActivityLogSerializer(log).data)
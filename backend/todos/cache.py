@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import UserCacheVersion
+
+# Per-user cached payloads (sidebar counts, ...) are keyed by the user's
+# UserCacheVersion, which the model signals bump on every change. The version
+# lives in the database, so a change made through one worker is seen by all of
+# them even when the cache itself is per process; stale entries are never read
+# again and simply expire.
+
+
+def _version(user_id):
+    return UserCacheVersion.objects.filter(user_id=user_id).values_list('version', flat=True).first() or 0
+
+
+def user_cache_key(user_id, name, *parts):
+    return ':'.join(['todos', str(user_id), str(_version(user_id)), name, *map(str, parts)])
+
+
+def invalidate_user_cache(user_id):
+    rows = UserCacheVersion.objects.filter(user_id=user_id)
+    if rows.update(version=F('version') + 1):
+        return
+    try:
+        with transaction.atomic():
+            UserCacheVersion.objects.create(user_id=user_id, version=1)
+    except IntegrityError:
+        # Another request created the row in between
+        rows.update(version=F('version') + 1)
+
+
+def get_or_compute(user_id, name, parts, compute):
+    key = user_cache_key(user_id, name, *parts)
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, timeout=settings.TODOS_USER_CACHE_TIMEOUT)
+    return value
@@ -0,0 +1,90 @@
+import csv
+import json
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Task, Project, Tag, Subtask, Comment, ActivityLog
+
+# Rows are pulled from the database in chunks of this size, so memory stays
+# constant no matter how big the account is.
+EXPORT_CHUNK_SIZE = 2000
+
+# resource name -> (queryset factory filtered by user, exported columns)
+EXPORT_RESOURCES = {
+    'projects': (
+        lambda user: Project.objects.filter(user=user),
+        ['id', 'name', 'description', 'color', 'created_at'],
+    ),
+    'tags': (
+        lambda user: Tag.objects.filter(user=user),
+        ['id', 'name', 'color', 'icon'],
+    ),
+    'tasks': (
+        lambda user: Task.objects.filter(user=user),
+        ['id', 'title', 'description', 'priority', 'completed', 'is_important', 'due_date',
+         'project_id', 'is_deleted', 'deleted_at', 'created_at', 'updated_at'],
+    ),
+    'task_tags': (
+        lambda user: Task.tags.through.objects.filter(task__user=user),
+        ['task_id', 'tag_id'],
+    ),
+    'subtasks': (
+        lambda user: Subtask.objects.filter(task__user=user),
+        ['id', 'task_id', 'title', 'completed'],
+    ),
+    'comments': (
+        lambda user: Comment.objects.filter(task__user=user),
+        ['id', 'task_id', 'content', 'created_at'],
+    ),
+    'activity': (
+        lambda user: ActivityLog.objects.filter(user=user),
+        ['id', 'action', 'target_type', 'target_name', 'details', 'timestamp'],
+    ),
+}
+
+
+def iter_resource_rows(user, resource):
+    """Yield one tuple per row of ``resource``, streamed from the database."""
+    queryset_factory, fields = EXPORT_RESOURCES[resource]
+    queryset = queryset_factory(user).order_by('pk').values_list(*fields)
+    return queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def iter_ndjson(user, resources):
+    for resource in resources:
+        fields = EXPORT_RESOURCES[resource][1]
+        for row in iter_resource_rows(user, resource):
+            record = {'type': resource}
+            record.update(zip(fields, row))
+            yield json.dumps(record, cls=DjangoJSONEncoder) + '\n'
+
+
+class _LineBuffer:
+    """File-like object for csv.writer that hands back each written line."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(user, resource):
+    fields = EXPORT_RESOURCES[resource][1]
+    writer = csv.writer(_LineBuffer())
+    yield writer.writerow(fields)
+    for row in iter_resource_rows(user, resource):
+        yield writer.writerow([value.isoformat() if hasattr(value, 'isoformat') else value for value in row])
+
+
+def gzip_stream(chunks, flush_every=64 * 1024):
+    """Compress an iterable of str chunks on the fly into gzip bytes."""
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    pending = 0
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        pending += len(chunk)
+        if data:
+            yield data
+        if pending >= flush_every:
+            yield compressor.flush(zlib.Z_SYNC_FLUSH)
+            pending = 0
+    yield compressor.flush()
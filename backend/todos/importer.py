@@ -0,0 +1,246 @@
+import codecs
+import csv
+import json
+from datetime import datetime, time
+
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Task, Project, Tag, Subtask, ActivityLog
+from .cache import invalidate_user_cache
+from .ordering import append_keys, last_position
+from .rollups import record
+from .urgency import compute_urgency
+
+# Rows are validated one by one but written in chunks of this size, each chunk
+# in its own transaction.
+IMPORT_BATCH_SIZE = 500
+
+# Separator for the multi-valued `tags` and `subtasks` columns in CSV files
+CSV_LIST_SEPARATOR = '|'
+
+TRUE_VALUES = {'1', 'true', 't', 'yes', 'y', 'si', 'sí', 'x'}
+FALSE_VALUES = {'', '0', 'false', 'f', 'no', 'n'}
+PRIORITIES = {choice for choice, _ in Task.PRIORITY_CHOICES}
+
+
+class ImportRowError(ValueError):
+    pass
+
+
+def decode_lines(stream, encoding='utf-8-sig'):
+    """Turn a binary line iterator (request, uploaded file, open file) into text lines."""
+    return codecs.iterdecode(stream, encoding)
+
+
+def parse_ndjson(lines):
+    for row_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield row_number, json.loads(line)
+        except ValueError as exc:
+            yield row_number, ImportRowError(f'JSON inválido: {exc}')
+
+
+def parse_csv(lines):
+    reader = csv.DictReader(lines)
+    # Row 1 is the header
+    for row_number, row in enumerate(reader, start=2):
+        yield row_number, row
+
+
+def _as_bool(value, field):
+    if isinstance(value, bool):
+        return value
+    if value is None:
+        return False
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise ImportRowError(f'{field}: valor booleano inválido "{value}"')
+
+
+def _as_list(value):
+    if value is None or value == '':
+        return []
+    if isinstance(value, str):
+        return [item.strip() for item in value.split(CSV_LIST_SEPARATOR) if item.strip()]
+    if isinstance(value, list):
+        return value
+    raise ImportRowError('Se esperaba una lista')
+
+
+def _as_text(value, field, max_length=None, required=False):
+    text = '' if value is None else str(value).strip()
+    if required and not text:
+        raise ImportRowError(f'{field}: este campo es obligatorio')
+    if max_length and len(text) > max_length:
+        raise ImportRowError(f'{field}: máximo {max_length} caracteres')
+    return text
+
+
+def _as_datetime(value):
+    if value in (None, ''):
+        return None
+    parsed = parse_datetime(str(value))
+    if parsed is None:
+        day = parse_date(str(value))
+        if day is None:
+            raise ImportRowError(f'due_date: fecha inválida "{value}"')
+        parsed = datetime.combine(day, time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def clean_row(raw):
+    """Validate one raw row (dict) and return the normalized task data."""
+    if not isinstance(raw, dict):
+        raise ImportRowError('Cada fila debe ser un objeto')
+
+    priority = _as_text(raw.get('priority'), 'priority') or 'medium'
+    if priority not in PRIORITIES:
+        raise ImportRowError(f'priority: valor inválido "{priority}"')
+
+    subtasks = []
+    for item in _as_list(raw.get('subtasks')):
+        if isinstance(item, dict):
+            subtasks.append((
+                _as_text(item.get('title'), 'subtasks.title', 200, required=True),
+                _as_bool(item.get('completed'), 'subtasks.completed'),
+            ))
+        else:
+            subtasks.append((_as_text(item, 'subtasks.title', 200, required=True), False))
+
+    return {
+        'fields': {
+            'title': _as_text(raw.get('title'), 'title', 200, required=True),
+            'description': _as_text(raw.get('description'), 'description'),
+            'priority': priority,
+            'completed': _as_bool(raw.get('completed'), 'completed'),
+            'is_important': _as_bool(raw.get('is_important'), 'is_important'),
+            'due_date': _as_datetime(raw.get('due_date')),
+        },
+        'project': _as_text(raw.get('project'), 'project', 100),
+        'tags': sorted({_as_text(name, 'tags', 50) for name in _as_list(raw.get('tags'))} - {''}),
+        'subtasks': subtasks,
+    }
+
+
+class TaskImporter:
+    """
+    Bulk-imports tasks for one user. Tags and projects are looked up (or
+    created) per chunk with a single query each, and tasks, tag links and
+    subtasks are written with bulk_create. Invalid rows are reported and
+    skipped; they never abort the rest of the import.
+    """
+
+    def __init__(self, user, batch_size=IMPORT_BATCH_SIZE):
+        self.user = user
+        self.batch_size = batch_size
+        self.created = 0
+        self.errors = []
+        self._project_ids = {}
+        self._tag_ids = {}
+
+    def run(self, rows):
+        batch = []
+        row_number = 0
+        try:
+            for row_number, raw in rows:
+                try:
+                    if isinstance(raw, Exception):
+                        raise raw
+                    batch.append((row_number, clean_row(raw)))
+                except ImportRowError as exc:
+                    self.errors.append({'row': row_number, 'error': str(exc)})
+                if len(batch) >= self.batch_size:
+                    self._write_batch(batch)
+                    batch = []
+        except UnicodeDecodeError:
+            # Found while reading, after earlier chunks were committed: the
+            # rows read so far are still imported and reported
+            self.errors.append({'row': row_number + 1, 'error': 'El archivo no está codificado en UTF-8; se ha detenido la importación'})
+        if batch:
+            self._write_batch(batch)
+
+        if self.created:
+            ActivityLog.objects.create(
+                user=self.user,
+                action='CREATED',
+                target_type='Import',
+                target_name=f'{self.created} tareas',
+                details=f"Tareas importadas: {self.created}"
+            )
+        return {'created': self.created, 'failed': len(self.errors), 'errors': self.errors}
+
+    def _write_batch(self, batch):
+        try:
+            self._insert_atomic(batch)
+            self.created += len(batch)
+            invalidate_user_cache(self.user.pk)
+        except DatabaseError:
+            # Find the offending rows by retrying one at a time
+            for row_number, row in batch:
+                try:
+                    self._insert_atomic([(row_number, row)])
+                    self.created += 1
+                    invalidate_user_cache(self.user.pk)
+                except DatabaseError as exc:
+                    self.errors.append({'row': row_number, 'error': str(exc)})
+
+    def _insert_atomic(self, batch):
+        # Projects/tags created inside a rolled back transaction must not stay cached
+        project_ids, tag_ids = dict(self._project_ids), dict(self._tag_ids)
+        try:
+            with transaction.atomic():
+                self._insert(batch)
+                # bulk_create does not send the signals that normally do
+                # this; per chunk, so an import that fails later still counts
+                record(self.user, timezone.localdate(), created=len(batch))
+        except DatabaseError:
+            self._project_ids, self._tag_ids = project_ids, tag_ids
+            raise
+
+    def _resolve(self, model, names, cache):
+        missing = {name for name in names if name not in cache}
+        if missing:
+            existing = model.objects.filter(user=self.user, name__in=missing).order_by('id').values_list('name', 'id')
+            for name, pk in existing:
+                cache.setdefault(name, pk)
+            # bulk_create skips save(), which normally fills name_lower
+            to_create = [model(user=self.user, name=name, name_lower=name.lower())
+                         for name in sorted(missing - set(cache))]
+            for obj in model.objects.bulk_create(to_create):
+                cache[obj.name] = obj.pk
+
+    def _insert(self, batch):
+        rows = [row for _, row in batch]
+        self._resolve(Project, {row['project'] for row in rows if row['project']}, self._project_ids)
+        self._resolve(Tag, {name for row in rows for name in row['tags']}, self._tag_ids)
+
+        # bulk_create skips Task.save(), which normally sets position and urgency
+        positions = append_keys(last_position(Task.objects.filter(user=self.user)), len(rows))
+        tasks = [
+            Task(user=self.user, project_id=self._project_ids.get(row['project']), position=position, **row['fields'])
+            for row, position in zip(rows, positions)
+        ]
+        for task in tasks:
+            task.urgency = compute_urgency(task)
+        Task.objects.bulk_create(tasks)
+
+        TaskTag = Task.tags.through
+        TaskTag.objects.bulk_create([
+            TaskTag(task_id=task.pk, tag_id=self._tag_ids[name])
+            for task, row in zip(tasks, rows) for name in row['tags']
+        ])
+        Subtask.objects.bulk_create([
+            Subtask(task_id=task.pk, title=title, completed=completed, position=position)
+            for task, row in zip(tasks, rows)
+            for (title, completed), position in zip(row['subtasks'], append_keys(None, len(row['subtasks'])))
+        ])
@@ -0,0 +1,163 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job, Task, Subtask, Template, WorkerHeartbeat
+from .ordering import rebalance
+from .sharding import use_shard_for
+from .statistics import build_statistics
+
+logger = logging.getLogger(__name__)
+
+# kind -> callable(job) returning a JSON-serializable result
+JOB_HANDLERS = {}
+
+# Number of trashed tasks hard-deleted per query, between progress updates
+DELETE_CHUNK_SIZE = 200
+
+
+def job_handler(kind):
+    def register(func):
+        JOB_HANDLERS[kind] = func
+        return func
+    return register
+
+
+def enqueue(user, kind, payload=None, **kwargs):
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f'Unknown job kind: {kind}')
+    return Job.objects.create(user=user, kind=kind, payload=payload or {}, **kwargs)
+
+
+def run_inline(user, kind, payload=None):
+    """Run a handler in the current thread, for requests that don't ask for a job."""
+    return JOB_HANDLERS[kind](Job(user=user, kind=kind, payload=payload or {}))
+
+
+def retry_delay(attempts):
+    """Exponential backoff: base, 2*base, 4*base... capped at one hour."""
+    return timedelta(seconds=min(settings.TODOS_JOB_RETRY_DELAY * 2 ** (attempts - 1), 3600))
+
+
+def claim_jobs(limit):
+    """
+    Mark up to `limit` due jobs as running and return their ids. Each job is
+    claimed with a conditional UPDATE, so two runners never take the same job.
+    """
+    now = timezone.now()
+    candidates = list(
+        Job.objects.filter(status='pending', run_at__lte=now)
+        .order_by('run_at', 'id')
+        .values_list('id', flat=True)[:limit]
+    )
+    claimed = []
+    for job_id in candidates:
+        updated = Job.objects.filter(pk=job_id, status='pending').update(
+            status='running', started_at=now, attempts=F('attempts') + 1
+        )
+        if updated:
+            claimed.append(job_id)
+    return claimed
+
+
+def requeue_stale_jobs(older_than):
+    """Jobs left `running` by a worker that died are put back in the queue."""
+    return Job.objects.filter(status='running', started_at__lt=timezone.now() - older_than).update(status='pending')
+
+
+def delete_finished_jobs(older_than):
+    """Succeeded and failed jobs finished more than `older_than` ago. Returns how many were deleted."""
+    deleted, _ = Job.objects.filter(
+        status__in=('succeeded', 'failed'), finished_at__lt=timezone.now() - older_than
+    ).delete()
+    return deleted
+
+
+def record_heartbeat(name):
+    WorkerHeartbeat.objects.update_or_create(name=name, defaults={'seen_at': timezone.now()})
+
+
+def forget_heartbeat(name):
+    WorkerHeartbeat.objects.filter(name=name).delete()
+
+
+def workers_alive():
+    """Whether some `run_workers` process has checked in within TODOS_WORKER_TIMEOUT seconds."""
+    since = timezone.now() - timedelta(seconds=settings.TODOS_WORKER_TIMEOUT)
+    return WorkerHeartbeat.objects.filter(seen_at__gte=since).exists()
+
+
+def run_job(job_id):
+    """Execute one claimed job. Runs inside a worker process."""
+    job = Job.objects.select_related('user').get(pk=job_id)
+    try:
+        with use_shard_for(job.user_id):
+            result = JOB_HANDLERS[job.kind](job)
+    except Exception as exc:
+        logger.exception('Job %s (%s) failed', job.pk, job.kind)
+        if job.attempts < job.max_attempts:
+            Job.objects.filter(pk=job.pk).update(
+                status='pending', error=str(exc), run_at=timezone.now() + retry_delay(job.attempts)
+            )
+        else:
+            Job.objects.filter(pk=job.pk).update(status='failed', error=str(exc), finished_at=timezone.now())
+        return False
+    Job.objects.filter(pk=job.pk).update(
+        status='succeeded', progress=100, result=result, error='', finished_at=timezone.now()
+    )
+    return True
+
+
+def _hard_delete(job, tasks):
+    task_ids = list(tasks.values_list('id', flat=True))
+    for start in range(0, len(task_ids), DELETE_CHUNK_SIZE):
+        # QuerySet.delete() bypasses Task.delete(), so this is a real delete
+        Task.objects.filter(id__in=task_ids[start:start + DELETE_CHUNK_SIZE]).delete()
+        job.set_progress(min(99, (start + DELETE_CHUNK_SIZE) * 100 // len(task_ids)))
+    return {'deleted': len(task_ids)}
+
+
+@job_handler('empty_trash')
+def empty_trash(job):
+    return _hard_delete(job, Task.objects.filter(user=job.user, is_deleted=True))
+
+
+@job_handler('bulk_delete_forever')
+def bulk_delete_forever(job):
+    return _hard_delete(job, Task.objects.filter(id__in=job.payload['task_ids'], user=job.user, is_deleted=True))
+
+
+@job_handler('use_template')
+def use_template(job):
+    # A retry after the task was created returns that task instead of a copy
+    if job.result:
+        return job.result
+    template = Template.objects.get(pk=job.payload['template_id'], user=job.user)
+    if job.pk is None:
+        return {'task_id': template.create_task().id}
+    # The task and the job's result are committed together (one transaction
+    # unless the task lives in another shard, where the task commits first)
+    with transaction.atomic(using=router.db_for_write(Job, instance=job)), \
+            transaction.atomic(using=router.db_for_write(Task, instance=job.user)):
+        result = {'task_id': template.create_task().id}
+        Job.objects.filter(pk=job.pk).update(result=result)
+    return result
+
+
+@job_handler('statistics')
+def statistics(job):
+    return build_statistics(job.user)
+
+
+@job_handler('rebalance_positions')
+def rebalance_positions(job):
+    # payload {} rebalances the user's tasks, {'task_id': ...} one task's subtasks
+    if job.payload.get('task_id'):
+        siblings = Subtask.objects.filter(task_id=job.payload['task_id'], task__user=job.user)
+    else:
+        siblings = Task.objects.filter(user=job.user, is_deleted=False, is_archived=False)
+    return {'rebalanced': rebalance(siblings)}
@@ -0,0 +1,43 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from todos.cache import invalidate_user_cache
+from todos.models import Task
+from todos.sharding import data_aliases
+
+
+class Command(BaseCommand):
+    help = ('Moves completed tasks not modified for a while to the archive, so the default '
+            'task list no longer reads them. Meant to be run periodically (cron).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.TODOS_ARCHIVE_AFTER_DAYS,
+                            help='Archive completed tasks last updated more than this many days ago')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        archived = sum(self.archive(using, cutoff, options['batch_size']) for using in data_aliases())
+        self.stdout.write(self.style.SUCCESS(f'Archived {archived} tasks'))
+
+    def archive(self, using, cutoff, batch_size):
+        candidates = Task.objects.using(using).filter(
+            completed=True, is_archived=False, is_deleted=False, updated_at__lt=cutoff
+        )
+        archived = 0
+        while True:
+            batch = list(candidates.values_list('id', 'user_id')[:batch_size])
+            if not batch:
+                break
+            # update() leaves updated_at alone and sends no per-row signals,
+            # so the pending reminder is dropped here (see reminders.reminder_time)
+            Task.objects.using(using).filter(id__in=[task_id for task_id, _ in batch]).update(
+                is_archived=True, archived_at=timezone.now(), next_reminder_at=None
+            )
+            for user_id in {user_id for _, user_id in batch}:
+                invalidate_user_cache(user_id)
+            archived += len(batch)
+        return archived
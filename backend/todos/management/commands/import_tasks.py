@@ -0,0 +1,34 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from todos.importer import IMPORT_BATCH_SIZE, TaskImporter, decode_lines, parse_csv, parse_ndjson
+from todos.sharding import use_shard_for
+
+
+class Command(BaseCommand):
+    help = 'Bulk-imports tasks (with subtasks, tags and project names) from an NDJSON or CSV file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['ndjson', 'csv'],
+                            help='File format (default: guessed from the extension)')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['username']}' does not exist")
+
+        file_format = options['format'] or ('csv' if options['path'].lower().endswith('.csv') else 'ndjson')
+        with open(options['path'], 'rb') as stream, use_shard_for(user):
+            lines = decode_lines(stream)
+            rows = parse_csv(lines) if file_format == 'csv' else parse_ndjson(lines)
+            report = TaskImporter(user, batch_size=options['batch_size']).run(rows)
+
+        for error in report['errors']:
+            self.stderr.write(f"Row {error['row']}: {error['error']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report['created']} tasks ({report['failed']} rows failed)"
+        ))
@@ -0,0 +1,61 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from todos.cache import invalidate_user_cache
+from todos.models import Task
+from todos.sharding import data_aliases
+from todos.signals import quiet_deletes
+
+
+class Command(BaseCommand):
+    help = ('Hard-deletes tasks that have been in the trash longer than the retention window, '
+            'in small batches. Meant to be run periodically (cron).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.TODOS_TRASH_RETENTION_DAYS,
+                            help='Retention window in days (default: TODOS_TRASH_RETENTION_DAYS)')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--pause', type=float, default=0.05,
+                            help='Seconds to sleep between batches so other writers get the lock')
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        if options['dry_run']:
+            count = sum(self.expired(using, cutoff).count() for using in data_aliases())
+            self.stdout.write(f'{count} tasks would be purged')
+            return
+
+        purged = sum(self.purge(using, cutoff, options) for using in data_aliases())
+        self.stdout.write(self.style.SUCCESS(f'Purged {purged} tasks deleted before {cutoff:%Y-%m-%d %H:%M}'))
+
+    def expired(self, using, cutoff):
+        return Task.objects.using(using).filter(is_deleted=True, deleted_at__lt=cutoff)
+
+    def purge(self, using, cutoff, options):
+        expired = self.expired(using, cutoff)
+        purged = 0
+        while True:
+            batch = list(expired.order_by('deleted_at').values_list('id', 'user_id')[:options['batch_size']])
+            if not batch:
+                break
+            task_ids = [task_id for task_id, _ in batch]
+
+            # The collector deletes subtasks, comments and tag links and
+            # unlinks stored occurrences (SET_NULL) with set-based statements;
+            # each batch is its own short transaction. Purging is not a user
+            # action, so no DELETED activity is logged for it.
+            with transaction.atomic(using=using), quiet_deletes():
+                Task.objects.using(using).filter(id__in=task_ids).delete()
+
+            for user_id in {user_id for _, user_id in batch}:
+                invalidate_user_cache(user_id)
+            purged += len(batch)
+            if options['pause']:
+                time.sleep(options['pause'])
+        return purged
@@ -0,0 +1,24 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from todos.rollups import rebuild
+from todos.sharding import data_aliases
+
+
+class Command(BaseCommand):
+    help = ('Recomputes the daily statistics rollups (DailyStat) from the stored tasks and the '
+            'completion activity. Run once after upgrading, or to repair the counters.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('usernames', nargs='*', help='Only these users (default: everyone)')
+
+    def handle(self, *args, **options):
+        user_ids = None
+        if options['usernames']:
+            users = dict(User.objects.filter(username__in=options['usernames']).values_list('username', 'pk'))
+            missing = sorted(set(options['usernames']) - set(users))
+            if missing:
+                raise CommandError(f"Unknown users: {', '.join(missing)}")
+            user_ids = list(users.values())
+        rows = sum(rebuild(using, user_ids) for using in data_aliases())
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} daily rows'))
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from todos.models import Task
+from todos.reminders import reminder_time
+from todos.sharding import data_aliases
+from todos.urgency import compute_urgency, time_sensitive
+
+
+class Command(BaseCommand):
+    help = ('Recomputes Task.urgency for open tasks whose score depends on the date (due soon or '
+            'overdue). Meant to be run periodically (cron), at least once a day after midnight.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='Recompute every task, e.g. after changing the scoring rules')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        checked = changed = 0
+        for using in data_aliases():
+            tasks = Task.objects.using(using)
+            tasks = tasks.all() if options['all'] else time_sensitive(tasks, today)
+            stale = []
+            for task in tasks.only('id', 'urgency', 'priority', 'is_important', 'due_date', 'completed',
+                                   'is_deleted', 'is_archived', 'reminder_offset', 'next_reminder_at',
+                                   'last_reminder_at').iterator(chunk_size=options['batch_size']):
+                checked += 1
+                urgency = compute_urgency(task, today)
+                # What the pre_save signal would set, which bulk_update skips
+                next_reminder_at = reminder_time(task)
+                if urgency != task.urgency or next_reminder_at != task.next_reminder_at:
+                    task.urgency = urgency
+                    task.next_reminder_at = next_reminder_at
+                    stale.append(task)
+                if len(stale) >= options['batch_size']:
+                    changed += self.write(using, stale)
+                    stale = []
+            changed += self.write(using, stale)
+        self.stdout.write(self.style.SUCCESS(f'Checked {checked} tasks, updated {changed}'))
+
+    def write(self, using, tasks):
+        # bulk_update leaves updated_at alone and sends no signals
+        Task.objects.using(using).bulk_update(tasks, ['urgency', 'next_reminder_at'])
+        return len(tasks)
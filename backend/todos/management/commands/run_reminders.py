@@ -0,0 +1,37 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from todos.reminders import ReminderScheduler, get_notifier
+
+
+class Command(BaseCommand):
+    help = 'Sends due-date reminders as they come due (runs until interrupted)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--window', type=int, default=600,
+                            help='Seconds of upcoming reminders kept in memory')
+        parser.add_argument('--refresh', type=int, default=60,
+                            help='Seconds between reloads from the index (how soon task edits are seen)')
+        parser.add_argument('--batch-size', type=int, default=100,
+                            help='Reminders handed to the notifier at once')
+        parser.add_argument('--once', action='store_true',
+                            help='Send the reminders already due and exit')
+
+    def handle(self, *args, **options):
+        scheduler = ReminderScheduler(
+            get_notifier(),
+            window=timedelta(seconds=options['window']),
+            refresh=timedelta(seconds=options['refresh']),
+            batch_size=options['batch_size'],
+        )
+        while True:
+            now = timezone.now()
+            sent = scheduler.run_pending(now)
+            if sent:
+                self.stdout.write(f'Sent {sent} reminders')
+            if options['once']:
+                break
+            time.sleep(scheduler.seconds_until_next(timezone.now()))
@@ -0,0 +1,82 @@
+import multiprocessing
+import os
+import socket
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from todos.jobs import claim_jobs, delete_finished_jobs, forget_heartbeat, record_heartbeat, requeue_stale_jobs
+from todos.workers import execute_job, init_worker
+
+
+class Command(BaseCommand):
+    help = 'Runs queued background jobs (todos.Job) with a pool of worker processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=os.cpu_count() or 2)
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds to wait between queue checks when idle')
+        parser.add_argument('--stale-after', type=int, default=30,
+                            help='Requeue jobs left running for more than this many minutes')
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once the queue is empty instead of polling forever')
+        parser.add_argument('--housekeeping-interval', type=float, default=15.0,
+                            help='Seconds between heartbeats, stale-job requeues and old-job cleanups')
+
+    def housekeeping(self, options):
+        """Signs of life for the API (see views.wants_job), and the queue's upkeep."""
+        record_heartbeat(self.worker_name)
+        requeued = requeue_stale_jobs(timedelta(minutes=options['stale_after']))
+        if requeued:
+            self.stdout.write(f'Requeued {requeued} stale jobs')
+        deleted = delete_finished_jobs(timedelta(days=settings.TODOS_JOB_RETENTION_DAYS))
+        if deleted:
+            self.stdout.write(f'Deleted {deleted} finished jobs')
+
+    def handle(self, *args, **options):
+        processes = options['processes']
+        self.worker_name = f'{socket.gethostname()}:{os.getpid()}'
+        try:
+            self.run(processes, options)
+        finally:
+            forget_heartbeat(self.worker_name)
+
+    def run(self, processes, options):
+        self.housekeeping(options)
+        next_housekeeping = time.monotonic() + options['housekeeping_interval']
+
+        # Fresh interpreters: workers must not share the parent's DB connections
+        connections.close_all()
+        context = multiprocessing.get_context('spawn')
+        in_flight = {}
+        with ProcessPoolExecutor(max_workers=processes, mp_context=context, initializer=init_worker) as pool:
+            self.stdout.write(f'Running jobs with {processes} processes')
+            while True:
+                if time.monotonic() >= next_housekeeping:
+                    self.housekeeping(options)
+                    next_housekeeping = time.monotonic() + options['housekeeping_interval']
+
+                free = processes - len(in_flight)
+                if free:
+                    for job_id in claim_jobs(free):
+                        in_flight[pool.submit(execute_job, job_id)] = job_id
+
+                if not in_flight:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                done, _ = wait(in_flight, timeout=options['poll_interval'], return_when=FIRST_COMPLETED)
+                for future in done:
+                    job_id = in_flight.pop(future)
+                    if future.exception() is not None:
+                        self.stderr.write(f'Job {job_id} crashed its worker: {future.exception()}')
+                    elif future.result():
+                        self.stdout.write(f'Job {job_id} done')
+                    else:
+                        self.stdout.write(f'Job {job_id} failed')
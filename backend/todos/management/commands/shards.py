@@ -0,0 +1,62 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from todos.models import Task, Project, Tag, Template, ActivityLog, DailyStat
+from todos.sharding import move_user_data, shard_for_user
+
+
+class Command(BaseCommand):
+    help = 'Manages the per-user todos shards (TODOS_SHARD_COUNT): migrate, rebalance, locate'
+
+    def add_arguments(self, parser):
+        subcommands = parser.add_subparsers(dest='subcommand', required=True)
+        subcommands.add_parser('migrate', help='Apply migrations to default and every shard')
+        rebalance = subcommands.add_parser(
+            'rebalance', help="Move each user's data to the shard the hash ring assigns (also drains default)"
+        )
+        rebalance.add_argument('--dry-run', action='store_true')
+        locate = subcommands.add_parser('locate', help='Print the shard of a user')
+        locate.add_argument('username')
+
+    def handle(self, *args, **options):
+        if not settings.TODOS_SHARDS:
+            raise CommandError('Sharding is disabled; set TODOS_SHARD_COUNT')
+        getattr(self, f"handle_{options['subcommand']}")(**options)
+
+    def handle_migrate(self, **options):
+        for alias in ['default'] + settings.TODOS_SHARDS:
+            self.stdout.write(f'Migrating {alias}...')
+            call_command('migrate', database=alias, verbosity=0)
+        self.stdout.write(self.style.SUCCESS('All databases migrated'))
+
+    def handle_locate(self, username, **options):
+        try:
+            user = User.objects.get(username=username)
+        except User.DoesNotExist:
+            raise CommandError(f"User '{username}' does not exist")
+        self.stdout.write(shard_for_user(user.pk))
+
+    def _user_ids(self, alias):
+        ids = set()
+        for model in (Task, Project, Tag, Template, ActivityLog, DailyStat):
+            ids.update(model.objects.using(alias).values_list('user_id', flat=True).distinct())
+        return ids
+
+    def handle_rebalance(self, dry_run=False, **options):
+        moved_users = moved_tasks = 0
+        for source in ['default'] + settings.TODOS_SHARDS:
+            if 'todos_task' not in connections[source].introspection.table_names():
+                continue
+            for user in User.objects.filter(pk__in=self._user_ids(source)).order_by('pk'):
+                target = shard_for_user(user.pk)
+                if target == source:
+                    continue
+                self.stdout.write(f'{user.username}: {source} -> {target}')
+                if not dry_run:
+                    moved_tasks += move_user_data(user, source, target)
+                moved_users += 1
+        verb = 'Would move' if dry_run else 'Moved'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {moved_users} users ({moved_tasks} tasks)'))
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todos', '0009_template_templateitem'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'due_date'], name='todos_task_user_due_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todos', '0011_job'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('is_deleted', True)), fields=['deleted_at'], name='todos_task_trash_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:29
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todos', '0012_task_trash_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='archived_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='is_archived',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('is_archived', False), ('is_deleted', False)), fields=['user', 'created_at'], name='todos_task_hot_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todos', '0013_task_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ThrottleBucket',
+            fields=[
+                ('key', models.CharField(max_length=200, primary_key=True, serialize=False)),
+                ('tat', models.FloatField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+from todos.ordering import append_keys
+
+
+def backfill_positions(apps, schema_editor):
+    # Existing rows keep their current order: creation order per list
+    alias = schema_editor.connection.alias
+    Task = apps.get_model('todos', 'Task')
+    Subtask = apps.get_model('todos', 'Subtask')
+    for model, scope, order in ((Task, 'user_id', 'created_at'), (Subtask, 'task_id', 'id')):
+        rows, current, last = [], None, None
+        for row in model.objects.using(alias).order_by(scope, order, 'id').only('id', scope):
+            if getattr(row, scope) != current:
+                current, last = getattr(row, scope), None
+            last = row.position = append_keys(last, 1)[0]
+            rows.append(row)
+        model.objects.using(alias).bulk_update(rows, ['position'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todos', '0014_throttle_bucket'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='subtask',
+            options={'ordering': ['position', 'id']},
+        ),
+        migrations.AlterModelOptions(
+            name='task',
+            options={'ordering': ['position', 'id']},
+        ),
+        migrations.AddField(
+            model_name='subtask',
+            name='position',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='position',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.RunPython(backfill_positions, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='subtask',
+            index=models.Index(fields=['task', 'position'], name='todos_subtask_task_pos_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'position'], name='todos_task_user_position_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', 'position'], name='todos_task_project_pos_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+from todos.urgency import compute_urgency
+
+
+def backfill_urgency(apps, schema_editor):
+    Task = apps.get_model('todos', 'Task')
+    tasks = Task.objects.using(schema_editor.connection.alias).filter(completed=False, is_deleted=False)
+    rows = []
+    for task in tasks.only('id', 'priority', 'is_important', 'due_date', 'completed', 'is_deleted').iterator():
+        task.urgency = compute_urgency(task)
+        rows.append(task)
+    Task.objects.using(schema_editor.connection.alias).bulk_update(rows, ['urgency'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todos', '0015_manual_position'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='urgency',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_urgency, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('completed', False), ('is_archived', False), ('is_deleted', False)), fields=['user', '-urgency', 'position'], name='todos_task_urgency_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:53
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todos', '0016_task_urgency'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='occurrence_date',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='recurrence',
+            field=models.CharField(blank=True, default='', max_length=200),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='recurrence_exceptions',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='recurrence_parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='occurrences', to='todos.task'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='recurrence_start',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('is_deleted', False), models.Q(('recurrence', ''), _negated=True)), fields=['user', 'due_date'], name='todos_task_recurring_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='task',
+            constraint=models.UniqueConstraint(fields=('recurrence_parent', 'occurrence_date'), name='todos_task_occurrence_uniq'),
+        ),
+    ]
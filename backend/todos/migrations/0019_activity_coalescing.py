@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todos', '0018_task_reminders'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activitylog',
+            name='change_count',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='activitylog',
+            name='changes',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='activitylog',
+            name='target_id',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['user', 'target_type', 'target_id', 'timestamp'], name='todos_activity_target_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:08
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todos', '0019_activity_coalescing'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(models.F('user'), django.db.models.functions.text.Lower('name'), name='todos_project_user_lname_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(models.F('user'), django.db.models.functions.text.Lower('name'), name='todos_tag_user_lname_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_name_lower(apps, schema_editor):
+    # Lowercased in Python, like LowercaseNameMixin.save()
+    alias = schema_editor.connection.alias
+    for model_name in ('Project', 'Tag'):
+        model = apps.get_model('todos', model_name)
+        rows = list(model.objects.using(alias).only('id', 'name'))
+        for row in rows:
+            row.name_lower = row.name.lower()
+        model.objects.using(alias).bulk_update(rows, ['name_lower'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todos', '0021_daily_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='project',
+            name='todos_project_user_lname_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='tag',
+            name='todos_tag_user_lname_idx',
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='name_lower',
+            field=models.CharField(default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='name_lower',
+            field=models.CharField(default='', editable=False, max_length=50),
+        ),
+        migrations.RunPython(backfill_name_lower, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['user', 'name_lower'], name='todos_project_user_lname_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['user', 'name_lower'], name='todos_tag_user_lname_idx'),
+        ),
+    ]
@@ -2,22 +2,53 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
 
-class Project(models.Model):
+from .ordering import append_keys, next_position
+from .urgency import compute_urgency
+
+class LowercaseNameMixin:
+    """
+    Keeps name_lower, the name lowercased by Python, for case-insensitive
+    prefix lookups. The database's LOWER() can't be used: SQLite's only
+    folds ASCII, so "Ñandú" would never match "ñ".
+    """
+
+    def save(self, *args, **kwargs):
+        self.name_lower = self.name.lower()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'name' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'name_lower'}
+        super().save(*args, **kwargs)
+
+class Project(LowercaseNameMixin, models.Model):
     name = models.CharField(max_length=100)
+    name_lower = models.CharField(max_length=100, editable=False, default='')
     description = models.TextField(blank=True)
     color = models.CharField(max_length=7, default='#667eea')  # Hex color code
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='projects')
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Prefix lookups for the project picker (?prefix=)
+            models.Index(fields=['user', 'name_lower'], name='todos_project_user_lname_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
-class Tag(models.Model):
+class Tag(LowercaseNameMixin, models.Model):
     name = models.CharField(max_length=50)
+    name_lower = models.CharField(max_length=50, editable=False, default='')
     color = models.CharField(max_length=7, default='#667eea')
     icon = models.CharField(max_length=50, default='bi-tag')
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='tags')
 
+    class Meta:
+        indexes = [
+            # Prefix lookups for the tag picker (?prefix=)
+            models.Index(fields=['user', 'name_lower'], name='todos_tag_user_lname_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -41,6 +72,114 @@ class Task(models.Model):
     project = models.ForeignKey(Project, on_delete=models.SET_NULL, null=True, blank=True, related_name='tasks')
     is_important = models.BooleanField(default=False)
     tags = models.ManyToManyField(Tag, blank=True, related_name='tasks')
+    # Old completed tasks are archived (see `manage.py archive_tasks`) and
+    # skipped by the default task list
+    is_archived = models.BooleanField(default=False)
+    archived_at = models.DateTimeField(null=True, blank=True)
+    # Manual order: fractional rank key within the user's tasks (see todos/ordering.py)
+    position = models.CharField(max_length=64, blank=True, default='')
+    # Derived from priority, importance and due date on save (see todos/urgency.py)
+    urgency = models.PositiveSmallIntegerField(default=0)
+    # Recurring task (see todos/recurrence.py): an RRULE, the days skipped
+    # and the first occurrence. due_date is the next pending occurrence.
+    recurrence = models.CharField(max_length=200, blank=True, default='')
+    recurrence_exceptions = models.JSONField(default=list, blank=True)
+    recurrence_start = models.DateTimeField(null=True, blank=True)
+    # Stored occurrence of a recurring task and the slot it stands for
+    recurrence_parent = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True,
+                                          related_name='occurrences')
+    occurrence_date = models.DateTimeField(null=True, blank=True)
+    # Reminder this many minutes before due_date. next_reminder_at is derived
+    # on save (see todos/reminders.py); last_reminder_at is the last one sent.
+    reminder_offset = models.PositiveIntegerField(null=True, blank=True)
+    next_reminder_at = models.DateTimeField(null=True, blank=True)
+    last_reminder_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['position', 'id']
+        indexes = [
+            models.Index(fields=['user', 'due_date'], name='todos_task_user_due_idx'),
+            # Only trashed rows, for the purge_trash retention scan
+            models.Index(fields=['deleted_at'], condition=models.Q(is_deleted=True), name='todos_task_trash_idx'),
+            # Only live, non-archived rows: what the default list reads
+            models.Index(fields=['user', 'created_at'], condition=models.Q(is_deleted=False, is_archived=False),
+                         name='todos_task_hot_idx'),
+            models.Index(fields=['user', 'position'], name='todos_task_user_position_idx'),
+            models.Index(fields=['project', 'position'], name='todos_task_project_pos_idx'),
+            # "What's next": open tasks by urgency, the ?ordering=urgency list
+            models.Index(fields=['user', '-urgency', 'position'],
+                         condition=models.Q(completed=False, is_deleted=False, is_archived=False),
+                         name='todos_task_urgency_idx'),
+            # Live recurring tasks, expanded by the windowed list and the calendar
+            models.Index(fields=['user', 'due_date'], condition=models.Q(is_deleted=False) & ~models.Q(recurrence=''),
+                         name='todos_task_recurring_idx'),
+            # Only pending reminders: what run_reminders reads
+            models.Index(fields=['next_reminder_at'], condition=models.Q(next_reminder_at__isnull=False),
+                         name='todos_task_reminder_idx'),
+        ]
+        constraints = [
+            # One row per occurrence: also what `materialize` relies on
+            models.UniqueConstraint(fields=['recurrence_parent', 'occurrence_date'],
+                                    name='todos_task_occurrence_uniq'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Reopening an archived task brings it back to the active list
+        if self.is_archived and not self.completed:
+            self.unarchive(save=False)
+        if not self.position:
+            self.position = next_position(Task.objects.filter(user_id=self.user_id))
+        if self.recurrence and self.recurrence_start is None:
+            self.recurrence_start = self.due_date
+        if self.recurrence and self.completed and not self.is_deleted and self.pk:
+            self.complete_occurrence()
+        self.urgency = compute_urgency(self)
+        super().save(*args, **kwargs)
+
+    def complete_occurrence(self):
+        """
+        Completing a recurring task stores the current occurrence as a
+        completed copy and moves the task on to the next one. Called by
+        save(); the last occurrence of a finished series just stays completed.
+        """
+        from .recurrence import next_slot
+        slot = self.due_date
+        following = next_slot(self, slot)
+        if following is None:
+            self.recurrence = ''
+            return
+        occurrence, created = self.store_occurrence(slot, completed=True)
+        if not occurrence.completed:
+            occurrence.completed = True
+            occurrence.save()
+        # The next occurrence starts with a clean checklist
+        self.subtasks.filter(completed=True).update(completed=False)
+        self.due_date = following
+        self.completed = False
+        # Read by the activity signal: this save logs the completion, not an update
+        self._completed_occurrence = occurrence
+
+    def store_occurrence(self, slot, completed=False):
+        """Get or create the row of this recurring task's occurrence at `slot`: a copy due then."""
+        occurrence, created = Task.objects.get_or_create(recurrence_parent=self, occurrence_date=slot, defaults={
+            'user_id': self.user_id, 'title': self.title, 'description': self.description,
+            'priority': self.priority, 'is_important': self.is_important, 'project_id': self.project_id,
+            'due_date': slot, 'completed': completed,
+        })
+        if created:
+            occurrence.tags.set(self.tags.all())
+            Subtask.objects.bulk_create([
+                Subtask(task=occurrence, title=subtask.title, completed=completed and subtask.completed,
+                        position=subtask.position)
+                for subtask in self.subtasks.all()
+            ])
+        return occurrence, created
+
+    def unarchive(self, save=True):
+        self.is_archived = False
+        self.archived_at = None
+        if save:
+            self.save()
 
     def delete(self, using=None, keep_parents=False):
         self.is_deleted = True
@@ -62,6 +201,19 @@ class Subtask(models.Model):
     title = models.CharField(max_length=200)
     completed = models.BooleanField(default=False)
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='subtasks')
+    # Manual order within the task (see todos/ordering.py)
+    position = models.CharField(max_length=64, blank=True, default='')
+
+    class Meta:
+        ordering = ['position', 'id']
+        indexes = [
+            models.Index(fields=['task', 'position'], name='todos_subtask_task_pos_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self.position:
+            self.position = next_position(Subtask.objects.filter(task_id=self.task_id))
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return self.title
@@ -89,13 +241,38 @@ class ActivityLog(models.Model):
     target_name = models.CharField(max_length=200)
     details = models.TextField(blank=True, null=True)
     timestamp = models.DateTimeField(auto_now_add=True)
+    target_id = models.PositiveIntegerField(null=True, blank=True)
+    # UPDATED rows merge bursts of saves (see todos/activity.py): how many,
+    # and {field: [old, new]} across them. timestamp is the latest one.
+    change_count = models.PositiveIntegerField(default=1)
+    changes = models.JSONField(default=dict, blank=True)
 
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            # Latest event for a target, looked up on every task save
+            models.Index(fields=['user', 'target_type', 'target_id', 'timestamp'], name='todos_activity_target_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} {self.action} {self.target_type}: {self.target_name}"
 
+class DailyStat(models.Model):
+    """Per-user counters for one day, behind the statistics history (see todos/rollups.py)."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_stats')
+    day = models.DateField()
+    created = models.PositiveIntegerField(default=0)
+    completed = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # Also the index for date-range reads
+            models.UniqueConstraint(fields=['user', 'day'], name='todos_dailystat_user_day_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} {self.day}: +{self.created} / {self.completed} completed"
+
 class Template(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True)
@@ -105,6 +282,21 @@ class Template(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    def create_task(self):
+        """Create a task (with one subtask per item) from this template."""
+        task = Task.objects.create(
+            user=self.user,
+            title=self.title,
+            description=self.description,
+            priority=self.priority,
+        )
+        items = list(self.items.all())
+        Subtask.objects.bulk_create([
+            Subtask(task=task, title=item.content, completed=False, position=position)
+            for item, position in zip(items, append_keys(None, len(items)))
+        ])
+        return task
+
     def __str__(self):
         return self.title
 
@@ -115,3 +307,76 @@ class TemplateItem(models.Model):
 
     def __str__(self):
         return self.content
+
+class Job(models.Model):
+    """A unit of background work, executed by `manage.py run_workers`."""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='jobs')
+    kind = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    progress = models.PositiveSmallIntegerField(default=0)  # 0-100
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'run_at'], name='todos_job_status_run_at_idx'),
+        ]
+
+    def set_progress(self, progress):
+        self.progress = progress
+        if self.pk:  # jobs run inline are never saved
+            Job.objects.filter(pk=self.pk).update(progress=progress)
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+
+class WorkerHeartbeat(models.Model):
+    """Last sign of life of a `run_workers` process, refreshed while it runs."""
+    name = models.CharField(max_length=200, primary_key=True)  # host:pid
+    seen_at = models.DateTimeField()
+
+    def __str__(self):
+        return self.name
+
+
+class ThrottleBucket(models.Model):
+    """
+    Token-bucket state of one throttle key, shared by every worker process
+    when TODOS_THROTTLE_STORE is 'database'.
+    `tat` is the GCRA "theoretical arrival time": the bucket is full again
+    at that moment (epoch seconds).
+    """
+    key = models.CharField(max_length=200, primary_key=True)
+    tat = models.FloatField()
+
+    def __str__(self):
+        return self.key
+
+
+class UserCacheVersion(models.Model):
+    """
+    Generation of a user's cached payloads (todos.cache). Bumped in the
+    database on every change, so every worker process sees it at once, even
+    with a per-process cache.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='cache_version')
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.version}"
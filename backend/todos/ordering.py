@@ -0,0 +1,149 @@
+"""
+Fractional rank keys for manual ordering (Task.position, Subtask.position).
+
+A key is a string of base-36 digits read as a fraction (0.k1k2k3...), so
+comparing keys as strings compares them as numbers and a row can always be
+given a key between any two neighbours: moving a row writes only that row.
+Generated keys never end in '0', which keeps that true below the first key.
+"""
+from django.db import transaction
+
+DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+BASE = len(DIGITS)
+
+# Appended keys advance the first HEAD_LENGTH digits by APPEND_STEP, so
+# adding to the end of a list keeps keys short and leaves room for moves
+HEAD_LENGTH = 6
+APPEND_STEP = BASE ** 2
+
+# Moves that produce a longer key schedule a background rebalance of the list
+REBALANCE_KEY_LENGTH = 24
+# Hard limit (the column size); a move past it rebalances right away
+MAX_KEY_LENGTH = 64
+
+
+def _encode(value, width):
+    digits = []
+    for _ in range(width):
+        value, digit = divmod(value, BASE)
+        digits.append(DIGITS[digit])
+    return ''.join(reversed(digits)).rstrip('0')
+
+
+def key_between(low, high):
+    """A key strictly between `low` and `high`; None (or '') is an open end."""
+    low = low or ''
+    if high is not None and low >= high:
+        raise ValueError(f'{low!r} is not below {high!r}')
+    key = []
+    i = 0
+    while True:
+        lo = DIGITS.index(low[i]) if i < len(low) else 0
+        hi = DIGITS.index(high[i]) if high is not None and i < len(high) else BASE
+        if lo == hi:
+            key.append(DIGITS[lo])
+        else:
+            middle = (lo + hi) // 2
+            if middle > lo:
+                key.append(DIGITS[middle])
+                return ''.join(key)
+            # Adjacent digits: keep low's digit, anything above the rest of low fits
+            key.append(DIGITS[lo])
+            high = None
+        i += 1
+
+
+def key_after(key):
+    """Key for appending after `key` (None or '': the first key of a list)."""
+    if not key:
+        return DIGITS[BASE // 2]
+    value = int(key[:HEAD_LENGTH].ljust(HEAD_LENGTH, '0'), BASE) + APPEND_STEP
+    if value >= BASE ** HEAD_LENGTH:
+        return key_between(key, None)
+    return _encode(value, HEAD_LENGTH)
+
+
+def append_keys(last, count):
+    """`count` consecutive keys after `last`."""
+    keys = []
+    for _ in range(count):
+        last = key_after(last)
+        keys.append(last)
+    return keys
+
+
+def spread_keys(count):
+    """`count` short, evenly spaced keys, for rebalancing a whole list."""
+    width = HEAD_LENGTH
+    while BASE ** width // (count + 1) < APPEND_STEP:
+        width += 1
+    step = BASE ** width // (count + 1)
+    return [_encode(step * (i + 1), width) for i in range(count)]
+
+
+def last_position(siblings):
+    return siblings.order_by('-position').values_list('position', flat=True).first()
+
+
+def next_position(siblings):
+    """Key that puts a new row at the end of `siblings`."""
+    return key_after(last_position(siblings))
+
+
+def rebalance(siblings, batch_size=500):
+    """Rewrite every key of the list with short, evenly spaced ones, keeping the order."""
+    with transaction.atomic(using=siblings.db):
+        rows = list(siblings.order_by('position', 'pk').only('pk', 'position'))
+        for row, key in zip(rows, spread_keys(len(rows))):
+            row.position = key
+        siblings.model.objects.using(siblings.db).bulk_update(rows, ['position'], batch_size=batch_size)
+    return len(rows)
+
+
+def _neighbour(siblings, pk):
+    if pk in (None, ''):
+        return None
+    try:
+        position = siblings.filter(pk=int(pk)).values_list('position', flat=True).first()
+    except (TypeError, ValueError):
+        position = None
+    if position is None:
+        raise ValueError(f'Unknown neighbour: {pk}')
+    return position
+
+
+def move(obj, siblings, after_id=None, before_id=None):
+    """
+    Move `obj` right after the row `after_id` and/or right before the row
+    `before_id` (rows of `siblings`, the list `obj` belongs to). With one
+    neighbour the other one is looked up, so nothing ends up in between.
+    Only `obj` is written, unless the list needs an immediate rebalance.
+    Returns the new key.
+    """
+    others = siblings.exclude(pk=obj.pk)
+    if after_id in (None, '') and before_id in (None, ''):
+        raise ValueError('after_id or before_id is required')
+    for _ in range(2):
+        after, before = _neighbour(others, after_id), _neighbour(others, before_id)
+        if before is None:
+            before = others.filter(position__gt=after).order_by('position').values_list('position', flat=True).first()
+        elif after is None:
+            after = others.filter(position__lt=before).order_by('-position').values_list('position', flat=True).first()
+
+        if before is None:
+            key = key_after(after)
+        elif after is None or after < before:
+            key = key_between(after, before)
+        else:
+            key = None  # neighbours share a key, or were given in the wrong order
+        if key is not None and len(key) <= MAX_KEY_LENGTH:
+            break
+        if after is not None and before is not None and after > before:
+            raise ValueError('after_id must come before before_id')
+        rebalance(siblings)
+    else:
+        raise ValueError('Could not place the row')
+
+    type(obj).objects.using(siblings.db).filter(pk=obj.pk).update(position=key)
+    obj.position = key
+    return key
@@ -0,0 +1,201 @@
+"""
+Recurring tasks.
+
+A recurring task (the "series") has an RRULE in Task.recurrence and stands
+for its next pending occurrence: its due_date is that occurrence's slot.
+Later occurrences are never stored, they are expanded for the date window
+a list or calendar asks for. An occurrence only gets its own row once it is
+completed (Task.save() stores a copy and moves the series on) or edited
+(`POST /api/tasks/{id}/materialize/`); such rows point back with
+recurrence_parent and keep the slot they stand for in occurrence_date.
+Days in Task.recurrence_exceptions are skipped.
+
+Supported RRULE subset: FREQ=DAILY|WEEKLY|MONTHLY, INTERVAL, BYDAY (weekly
+only), COUNT and UNTIL. Slots keep the wall-clock time of the first
+occurrence in the current time zone, so they don't drift across DST changes.
+"""
+import calendar
+from datetime import date, datetime, time, timedelta
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+FREQUENCIES = ('DAILY', 'WEEKLY', 'MONTHLY')
+WEEKDAYS = ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU')
+# COUNT series are walked from their first slot, so they are kept short
+MAX_COUNT = 1000
+MAX_INTERVAL = 999
+
+
+class Rule:
+    def __init__(self, freq, interval=1, byweekday=(), count=None, until=None):
+        self.freq = freq
+        self.interval = interval
+        self.byweekday = byweekday
+        self.count = count
+        # Inclusive, aware datetime
+        self.until = until
+
+
+def _positive_int(name, value, maximum):
+    if not value.isdigit() or not 1 <= int(value) <= maximum:
+        raise ValueError(f'{name} must be an integer between 1 and {maximum}')
+    return int(value)
+
+
+def _parse_until(value):
+    # RFC 5545 forms: 20261231, 20261231T235959Z (UTC) or floating local time
+    try:
+        if 'T' not in value:
+            return timezone.make_aware(datetime.combine(datetime.strptime(value, '%Y%m%d').date(), time.max))
+        if value.endswith('Z'):
+            return datetime.strptime(value, '%Y%m%dT%H%M%SZ').replace(tzinfo=timezone.utc)
+        return timezone.make_aware(datetime.strptime(value, '%Y%m%dT%H%M%S'))
+    except ValueError:
+        raise ValueError(f'Invalid UNTIL: {value}')
+
+
+def parse_rule(text):
+    """Parse an RRULE string ("FREQ=WEEKLY;BYDAY=MO,TH;COUNT=10", optional "RRULE:" prefix)."""
+    if text.upper().startswith('RRULE:'):
+        text = text[6:]
+    parts = {}
+    for part in filter(None, text.strip().split(';')):
+        name, sep, value = part.partition('=')
+        if not sep or not value:
+            raise ValueError(f'Invalid rule part: {part}')
+        parts[name.strip().upper()] = value.strip().upper()
+
+    freq = parts.pop('FREQ', None)
+    if freq not in FREQUENCIES:
+        raise ValueError(f"FREQ must be one of {', '.join(FREQUENCIES)}")
+    rule = Rule(freq)
+    if 'INTERVAL' in parts:
+        rule.interval = _positive_int('INTERVAL', parts.pop('INTERVAL'), MAX_INTERVAL)
+    if 'BYDAY' in parts:
+        if freq != 'WEEKLY':
+            raise ValueError('BYDAY is only supported with FREQ=WEEKLY')
+        days = parts.pop('BYDAY').split(',')
+        if any(day not in WEEKDAYS for day in days):
+            raise ValueError(f"BYDAY values must be in {', '.join(WEEKDAYS)}")
+        rule.byweekday = tuple(sorted({WEEKDAYS.index(day) for day in days}))
+    if 'COUNT' in parts and 'UNTIL' in parts:
+        raise ValueError('COUNT and UNTIL cannot be combined')
+    if 'COUNT' in parts:
+        rule.count = _positive_int('COUNT', parts.pop('COUNT'), MAX_COUNT)
+    if 'UNTIL' in parts:
+        rule.until = _parse_until(parts.pop('UNTIL'))
+    if parts:
+        raise ValueError(f"Unsupported rule parts: {', '.join(sorted(parts))}")
+    return rule
+
+
+def parse_exceptions(values):
+    """Validate a list of skipped days ("YYYY-MM-DD") and return it normalized and sorted."""
+    if not isinstance(values, list):
+        raise ValueError('Expected a list of dates')
+    days = set()
+    for value in values:
+        day = parse_date(value) if isinstance(value, str) else None
+        if day is None:
+            raise ValueError(f'Invalid date: {value}')
+        days.add(day.isoformat())
+    return sorted(days)
+
+
+def _days(rule, first, from_day):
+    """Slot days from the period containing `from_day` on (never before `first`), forever."""
+    if rule.freq == 'DAILY':
+        day = first + timedelta(days=max(0, (from_day - first).days // rule.interval) * rule.interval)
+        while True:
+            yield day
+            day += timedelta(days=rule.interval)
+    elif rule.freq == 'WEEKLY':
+        weekdays = rule.byweekday or (first.weekday(),)
+        first_monday = first - timedelta(days=first.weekday())
+        period = max(0, (from_day - first_monday).days // (7 * rule.interval))
+        while True:
+            monday = first_monday + timedelta(weeks=period * rule.interval)
+            for weekday in weekdays:
+                day = monday + timedelta(days=weekday)
+                if day >= first:
+                    yield day
+            period += 1
+    else:
+        months = (from_day.year - first.year) * 12 + from_day.month - first.month
+        period = max(0, months // rule.interval)
+        while True:
+            month_index = first.month - 1 + period * rule.interval
+            year, month = first.year + month_index // 12, month_index % 12 + 1
+            # Like RFC 5545: months without that day (31st, Feb 30th) have no slot
+            if first.day <= calendar.monthrange(year, month)[1]:
+                yield date(year, month, first.day)
+            period += 1
+
+
+def slots(rule, dtstart, since=None):
+    """
+    Slot datetimes of a series starting at `dtstart`, in order, from `since`
+    (inclusive) on. Open-ended series jump straight to `since`, so the cost
+    doesn't grow with the age of the series.
+    """
+    tz = timezone.get_current_timezone()
+    first = timezone.localtime(dtstart, tz)
+    # COUNT series must be counted from the first slot
+    from_day = first.date() if rule.count or since is None else timezone.localtime(since, tz).date()
+    for index, day in enumerate(_days(rule, first.date(), from_day)):
+        if rule.count and index >= rule.count:
+            return
+        slot = timezone.make_aware(datetime.combine(day, first.time()), tz)
+        if rule.until and slot > rule.until:
+            return
+        if since is None or slot >= since:
+            yield slot
+
+
+def _pending_slots(task, since, taken):
+    """Slots of `task`'s series from `since` on, minus skipped days and stored occurrences."""
+    skipped = set(task.recurrence_exceptions)
+    for slot in slots(parse_rule(task.recurrence), task.recurrence_start or task.due_date, since):
+        if timezone.localdate(slot).isoformat() not in skipped and slot not in taken:
+            yield slot
+
+
+def is_slot(task, when):
+    """Whether `when` is an occurrence of `task`'s series (skipped days excluded)."""
+    return next(_pending_slots(task, when, ()), None) == when
+
+
+def next_slot(task, after):
+    """The first pending slot strictly after `after`, or None when the series is over."""
+    from .models import Task
+    taken = set(Task.objects.filter(recurrence_parent=task, occurrence_date__gt=after)
+                .values_list('occurrence_date', flat=True))
+    return next((slot for slot in _pending_slots(task, after, taken) if slot > after), None)
+
+
+def expand(task, start, end, taken=()):
+    """
+    Virtual occurrences of the series `task` in [start, end): the slots after
+    its due_date (the task itself is the current one) that have no row in
+    `taken` (slot datetimes of its stored occurrences).
+    """
+    result = []
+    for slot in _pending_slots(task, max(start, task.due_date), set(taken)):
+        if slot >= end:
+            break
+        if slot > task.due_date:
+            result.append(slot)
+    return result
+
+
+def expand_window(masters, start, end):
+    """{series id: [slots]} for every recurring task in `masters`, with one query for stored occurrences."""
+    from .models import Task
+    masters = list(masters)
+    taken = {}
+    for parent_id, slot in Task.objects.filter(
+        recurrence_parent__in=masters, occurrence_date__gte=start, occurrence_date__lt=end
+    ).values_list('recurrence_parent_id', 'occurrence_date'):
+        taken.setdefault(parent_id, set()).add(slot)
+    return {task.pk: expand(task, start, end, taken.get(task.pk, ())) for task in masters}
@@ -0,0 +1,167 @@
+"""
+Due-date reminders.
+
+A task with a reminder_offset (minutes before due_date) gets
+Task.next_reminder_at, kept up to date by a pre_save signal and indexed, so
+finding what is due is a range scan instead of a pass over every task.
+`manage.py run_reminders` keeps the next few minutes of that index in a
+min-heap, sleeps until the earliest entry and hands due reminders, in
+batches, to the notifier configured in TODOS_REMINDER_NOTIFIER.
+
+A reminder is claimed by moving next_reminder_at into last_reminder_at, with
+an UPDATE conditional on the time that was read, so it is sent once even
+with several schedulers running, and editing a task after its reminder went
+out doesn't send it again unless the time changed. Bulk updates that skip
+the pre_save signal (archive_tasks, refresh_urgency) keep next_reminder_at
+in step themselves.
+"""
+import heapq
+import json
+import logging
+import sys
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils.module_loading import import_string
+
+from .models import Task
+from .sharding import data_aliases
+
+logger = logging.getLogger(__name__)
+
+
+def reminder_time(task):
+    """When `task`'s reminder should fire, or None if it has none pending."""
+    if (task.reminder_offset is None or task.due_date is None or task.completed or task.is_deleted
+            or task.is_archived):
+        return None
+    when = task.due_date - timedelta(minutes=task.reminder_offset)
+    # Already sent for this exact time
+    if when == task.last_reminder_at:
+        return None
+    return when
+
+
+def reminder_payload(task):
+    return {
+        'task_id': task.pk,
+        'user_id': task.user_id,
+        'username': task.user.username,
+        'email': task.user.email,
+        'title': task.title,
+        'due_date': task.due_date.isoformat(),
+        'remind_at': task.last_reminder_at.isoformat(),
+    }
+
+
+class ConsoleNotifier:
+    """Writes one line per reminder; the default, for development."""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def send(self, reminders):
+        for reminder in reminders:
+            self.stream.write(f"[{reminder['remind_at']}] {reminder['username']}: "
+                              f"{reminder['title']} (vence {reminder['due_date']})\n")
+        self.stream.flush()
+
+
+class FileNotifier:
+    """Appends the reminders as NDJSON, for another process to pick up."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def send(self, reminders):
+        with open(self.path, 'a', encoding='utf-8') as output:
+            for reminder in reminders:
+                output.write(json.dumps(reminder, ensure_ascii=False) + '\n')
+
+
+def get_notifier():
+    config = settings.TODOS_REMINDER_NOTIFIER
+    return import_string(config['BACKEND'])(**config.get('OPTIONS', {}))
+
+
+class ReminderScheduler:
+    """
+    Loads reminders due within `window` from the index into a heap, refilling
+    every `refresh` seconds (so changes are picked up with at most that
+    delay), and delivers due ones through `notifier` in batches.
+    """
+
+    def __init__(self, notifier, window=timedelta(minutes=10), refresh=timedelta(minutes=1),
+                 batch_size=100, max_loaded=10000):
+        self.notifier = notifier
+        self.window = window
+        self.refresh = refresh
+        self.batch_size = batch_size
+        self.max_loaded = max_loaded
+        self.heap = []
+        self.loaded = set()
+        self.next_refill = None
+
+    def refill(self, now):
+        horizon = now + self.window
+        for using in data_aliases():
+            rows = (Task.objects.using(using).filter(next_reminder_at__lt=horizon)
+                    .order_by('next_reminder_at').values_list('id', 'next_reminder_at')[:self.max_loaded])
+            for task_id, when in rows:
+                entry = (when, using, task_id)
+                if entry not in self.loaded:
+                    self.loaded.add(entry)
+                    heapq.heappush(self.heap, entry)
+        self.next_refill = now + self.refresh
+
+    def seconds_until_next(self, now):
+        """How long the caller may sleep before the next reminder or refill."""
+        upcoming = [self.next_refill] + ([self.heap[0][0]] if self.heap else [])
+        return max(0.0, (min(upcoming) - now).total_seconds())
+
+    def run_pending(self, now):
+        """Refill if due, then deliver every reminder due at `now`. Returns the number sent."""
+        if self.next_refill is None or now >= self.next_refill:
+            self.refill(now)
+        due = {}
+        while self.heap and self.heap[0][0] <= now:
+            entry = heapq.heappop(self.heap)
+            self.loaded.discard(entry)
+            due.setdefault(entry[1], []).append(entry[2])
+        sent = 0
+        for using, task_ids in due.items():
+            for start in range(0, len(task_ids), self.batch_size):
+                sent += self.deliver(using, task_ids[start:start + self.batch_size], now)
+        return sent
+
+    def deliver(self, using, task_ids, now):
+        with transaction.atomic(using=using):
+            # Rows whose time moved since they were loaded are skipped here
+            # and come back with the next refill
+            tasks = list(Task.objects.using(using).select_related('user').select_for_update(of=('self',))
+                         .filter(pk__in=task_ids, next_reminder_at__lte=now))
+            # Only the rows still at the time read above: without row locks
+            # (SQLite) another scheduler may have claimed some in between
+            tasks = [
+                task for task in tasks
+                if Task.objects.using(using).filter(pk=task.pk, next_reminder_at=task.next_reminder_at).update(
+                    last_reminder_at=F('next_reminder_at'), next_reminder_at=None
+                )
+            ]
+            claimed = [task.pk for task in tasks]
+        if not tasks:
+            return 0
+        for task in tasks:
+            task.last_reminder_at = task.next_reminder_at
+        try:
+            self.notifier.send([reminder_payload(task) for task in tasks])
+        except Exception:
+            logger.exception('Notifier failed; %d reminders will be retried', len(tasks))
+            # Put the claims back for the next refill
+            Task.objects.using(using).filter(pk__in=claimed, next_reminder_at=None).update(
+                next_reminder_at=F('last_reminder_at'), last_reminder_at=None
+            )
+            return 0
+        return len(tasks)
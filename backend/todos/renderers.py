@@ -0,0 +1,83 @@
+import json
+from datetime import timezone
+
+from rest_framework.renderers import BaseRenderer
+
+
+class PassthroughRenderer(BaseRenderer):
+    """
+    Lets `?format=<name>` pass DRF content negotiation for views that build
+    their own body (streamed exports, feeds). Error payloads are still dicts,
+    so those fall back to plain JSON.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if isinstance(data, (bytes, str)):
+            return data
+        return json.dumps(data).encode(self.charset)
+
+
+class NDJSONRenderer(PassthroughRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+
+class CSVRenderer(PassthroughRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+
+def _ics_escape(text):
+    return (text or '').replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+
+
+def _ics_fold(line):
+    # RFC 5545: lines longer than 75 octets are continued with a leading space
+    chunks = []
+    while len(line.encode('utf-8')) > 75:
+        cut = 75
+        while len(line[:cut].encode('utf-8')) > 75:
+            cut -= 1
+        chunks.append(line[:cut])
+        line = ' ' + line[cut:]
+    chunks.append(line)
+    return '\r\n'.join(chunks)
+
+
+def _ics_datetime(value):
+    return value.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+# iCalendar PRIORITY: 1 is highest, 9 lowest
+ICS_PRIORITIES = {'high': 1, 'medium': 5, 'low': 9}
+
+
+class ICalendarRenderer(PassthroughRenderer):
+    """Renders the `tasks` of a calendar payload as VEVENTs."""
+    media_type = 'text/calendar'
+    format = 'ics'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if not isinstance(data, dict) or 'tasks' not in data:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        lines = ['BEGIN:VCALENDAR', 'VERSION:2.0', 'PRODID:-//ToList//Calendario//ES', 'CALSCALE:GREGORIAN']
+        for task in data['tasks']:
+            # Unstored occurrences of a recurring task are identified by series and slot
+            uid = task['id'] or f"{task['recurrence_parent']}-{_ics_datetime(task['due_date'])}"
+            lines += [
+                'BEGIN:VEVENT',
+                f"UID:task-{uid}@tolist",
+                f"DTSTAMP:{_ics_datetime(task['updated_at'])}",
+                f"DTSTART:{_ics_datetime(task['due_date'])}",
+                f"SUMMARY:{'✓ ' if task['completed'] else ''}{_ics_escape(task['title'])}",
+                f"PRIORITY:{ICS_PRIORITIES.get(task['priority'], 0)}",
+                'END:VEVENT',
+            ]
+        lines.append('END:VCALENDAR')
+        return ('\r\n'.join(_ics_fold(line) for line in lines) + '\r\n').encode(self.charset)
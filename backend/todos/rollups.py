@@ -0,0 +1,131 @@
+"""
+Daily rollups for the statistics history.
+
+DailyStat keeps, per user and day (in the server time zone), how many tasks
+were created and how many completions happened. The task signals and the
+importer add to it as things happen; `manage.py rebuild_daily_stats`
+recomputes it from the tasks and the COMPLETED activity. Only tasks still in
+the database are counted there, so it can come out lower than the live
+counters once the trash has been purged.
+
+`history()` reads a date range from it and merges days into weeks, months or
+years as needed to stay within MAX_POINTS, so the cost of a chart depends on
+its number of points, not on the length of the range.
+"""
+from datetime import date, timedelta
+
+from django.db import IntegrityError, router, transaction
+from django.db.models import Count, DateField, F, Sum
+from django.db.models.functions import Trunc, TruncDate
+
+from .models import ActivityLog, DailyStat, Task
+
+BUCKETS = ('day', 'week', 'month', 'year')
+MAX_POINTS = 100
+# Last day history() accepts: the bucket after it must still be a date
+MAX_DAY = date(9998, 12, 31)
+
+
+def record(user, day, **counts):
+    """Add `counts` (created=1, completed=1) to `user`'s row for `day`."""
+    using = router.db_for_write(DailyStat, instance=user)
+    rows = DailyStat.objects.using(using).filter(user=user, day=day)
+    increments = {name: F(name) + value for name, value in counts.items()}
+    if rows.update(**increments):
+        return
+    try:
+        with transaction.atomic(using=using):
+            DailyStat.objects.using(using).create(user=user, day=day, **counts)
+    except IntegrityError:
+        # Another request created the row in between
+        rows.update(**increments)
+
+
+def rebuild(using, user_ids=None):
+    """Recompute the rows of `user_ids` (every user when None) in `using`. Returns the number of rows."""
+    tasks = Task.objects.using(using).filter(recurrence_parent__isnull=True)
+    completions = ActivityLog.objects.using(using).filter(action='COMPLETED', target_type='Task')
+    existing = DailyStat.objects.using(using)
+    if user_ids is not None:
+        tasks, completions, existing = (qs.filter(user_id__in=user_ids) for qs in (tasks, completions, existing))
+
+    rows = {}
+    for field, queryset, column in (('created', tasks, 'created_at'), ('completed', completions, 'timestamp')):
+        counts = (queryset.annotate(day=TruncDate(column)).values('user_id', 'day')
+                  .annotate(count=Count('id')).order_by())
+        for item in counts:
+            key = (item['user_id'], item['day'])
+            rows.setdefault(key, DailyStat(user_id=key[0], day=key[1]))
+            setattr(rows[key], field, item['count'])
+
+    with transaction.atomic(using=using):
+        existing.delete()
+        DailyStat.objects.using(using).bulk_create(rows.values(), batch_size=1000)
+    return len(rows)
+
+
+def bucket_start(day, bucket):
+    if bucket == 'week':
+        return day - timedelta(days=day.weekday())
+    if bucket == 'month':
+        return day.replace(day=1)
+    if bucket == 'year':
+        return day.replace(month=1, day=1)
+    return day
+
+
+def _next_bucket(day, bucket):
+    if bucket == 'week':
+        return day + timedelta(weeks=1)
+    if bucket == 'month':
+        return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+    if bucket == 'year':
+        return date(day.year + 1, 1, 1)
+    return day + timedelta(days=1)
+
+
+def point_count(start, end, bucket):
+    first, last = bucket_start(start, bucket), bucket_start(end, bucket)
+    if bucket == 'week':
+        return (last - first).days // 7 + 1
+    if bucket == 'month':
+        return (last.year - first.year) * 12 + last.month - first.month + 1
+    if bucket == 'year':
+        return last.year - first.year + 1
+    return (last - first).days + 1
+
+
+def choose_bucket(start, end, bucket='day'):
+    """`bucket`, or the first coarser one that fits in MAX_POINTS; None if not even years do."""
+    for candidate in BUCKETS[BUCKETS.index(bucket):]:
+        if point_count(start, end, candidate) <= MAX_POINTS:
+            return candidate
+    return None
+
+
+def history(user, start, end, bucket):
+    """Created and completed counts for the days in [start, end], one point per `bucket`."""
+    period = F('day') if bucket == 'day' else Trunc('day', bucket, output_field=DateField())
+    totals = {
+        item['period']: item
+        for item in DailyStat.objects.filter(user=user, day__gte=start, day__lte=end)
+        .annotate(period=period).values('period')
+        .annotate(created_sum=Sum('created'), completed_sum=Sum('completed')).order_by()
+    }
+
+    labels, created, completed = [], [], []
+    period = bucket_start(start, bucket)
+    while period <= end:
+        item = totals.get(period, {})
+        labels.append(period.isoformat())
+        created.append(item.get('created_sum', 0))
+        completed.append(item.get('completed_sum', 0))
+        period = _next_bucket(period, bucket)
+    return {
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'bucket': bucket,
+        'labels': labels,
+        'created': created,
+        'completed': completed,
+    }
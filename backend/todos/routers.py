@@ -0,0 +1,49 @@
+from django.conf import settings
+
+from .sharding import SHARDED_MODELS, current_user_id, shard_for_user
+
+
+def _is_sharded(model):
+    return model._meta.app_label == 'todos' and model._meta.model_name in SHARDED_MODELS
+
+
+class UserShardRouter:
+    """
+    Sends each user's todos rows to the shard that owns the user. The shard
+    is taken from the instance when there is one (its database, or its
+    user_id), otherwise from the user of the current request / use_shard_for().
+
+    There is no allow_migrate: every database gets the full schema and the
+    tables a database doesn't own stay empty, so cascades from deleting a
+    user work wherever they run.
+    """
+
+    def _shard(self, model, **hints):
+        if not _is_sharded(model):
+            return None
+        instance = hints.get('instance')
+        if instance is not None:
+            if instance._state.db in settings.TODOS_SHARDS:
+                return instance._state.db
+            if instance._meta.label == settings.AUTH_USER_MODEL:
+                # Reverse relations such as user.tasks
+                return shard_for_user(instance.pk)
+            user_id = getattr(instance, 'user_id', None)
+            if user_id is not None and _is_sharded(type(instance)):
+                return shard_for_user(user_id)
+        user_id = current_user_id()
+        if user_id is None:
+            return None
+        return shard_for_user(user_id)
+
+    def db_for_read(self, model, **hints):
+        return self._shard(model, **hints)
+
+    def db_for_write(self, model, **hints):
+        return self._shard(model, **hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Users live in default and are replicated into every shard
+        if _is_sharded(type(obj1)) or _is_sharded(type(obj2)):
+            return True
+        return None
@@ -1,7 +1,70 @@
 from rest_framework import serializers
-from .models import Task, Project, Tag, Subtask, Comment, ActivityLog, Template, TemplateItem
+from rest_framework.relations import MANY_RELATION_KWARGS
+from .models import Task, Project, Tag, Subtask, Comment, ActivityLog, Template, TemplateItem, Job
+from .recurrence import parse_exceptions, parse_rule
 from django.contrib.auth.models import User
 
+class BatchedManyRelatedField(serializers.ManyRelatedField):
+    """Resolves the whole list of ids with one query instead of one per id."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        return self.child_relation.resolve(data)
+
+class UserPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Primary key field limited to the requesting user's own objects. Resolved
+    objects are cached on the request, so several serializers validated in
+    the same request (bulk writes) don't look the same ids up again.
+    """
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return BatchedManyRelatedField(**list_kwargs)
+
+    def get_queryset(self):
+        request = self.context.get('request')
+        if request is None or not request.user.is_authenticated:
+            return super().get_queryset().none()
+        return super().get_queryset().filter(user=request.user)
+
+    def _request_cache(self):
+        request = self.context.get('request')
+        if request is None:
+            return {}
+        if not hasattr(request, '_related_pk_cache'):
+            request._related_pk_cache = {}
+        return request._related_pk_cache.setdefault(self.queryset.model._meta.label, {})
+
+    def resolve(self, values):
+        pks = []
+        for value in values:
+            if isinstance(value, bool):
+                self.fail('incorrect_type', data_type=type(value).__name__)
+            try:
+                pks.append(int(value))
+            except (TypeError, ValueError):
+                self.fail('incorrect_type', data_type=type(value).__name__)
+
+        cache = self._request_cache()
+        missing = {pk for pk in pks if pk not in cache}
+        if missing:
+            cache.update((obj.pk, obj) for obj in self.get_queryset().filter(pk__in=missing))
+        for pk in pks:
+            if pk not in cache:
+                self.fail('does_not_exist', pk_value=pk)
+        return [cache[pk] for pk in pks]
+
+    def to_internal_value(self, data):
+        return self.resolve([data])[0]
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -10,13 +73,15 @@ class UserSerializer(serializers.ModelSerializer):
 class TagSerializer(serializers.ModelSerializer):
     class Meta:
         model = Tag
-        fields = '__all__'
+        exclude = ('name_lower',)
         read_only_fields = ('user',)
 
 class SubtaskSerializer(serializers.ModelSerializer):
     class Meta:
         model = Subtask
         fields = '__all__'
+        # Changed with the move action only
+        read_only_fields = ('position',)
 
 class CommentSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
@@ -28,7 +93,7 @@ class CommentSerializer(serializers.ModelSerializer):
 class ProjectSerializer(serializers.ModelSerializer):
     class Meta:
         model = Project
-        fields = '__all__'
+        exclude = ('name_lower',)
         read_only_fields = ('user',)
 
 class ActivityLogSerializer(serializers.ModelSerializer):
@@ -37,21 +102,77 @@ class ActivityLogSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 class TaskSerializer(serializers.ModelSerializer):
-    project_id = serializers.PrimaryKeyRelatedField(
+    project_id = UserPrimaryKeyRelatedField(
         queryset=Project.objects.all(), source='project', write_only=True, required=False, allow_null=True
     )
     project = ProjectSerializer(read_only=True)
     subtasks = SubtaskSerializer(many=True, read_only=True)
     comments = CommentSerializer(many=True, read_only=True)
     tags = TagSerializer(many=True, read_only=True)
-    tag_ids = serializers.PrimaryKeyRelatedField(
+    tag_ids = UserPrimaryKeyRelatedField(
         queryset=Tag.objects.all(), source='tags', write_only=True, many=True, required=False
     )
 
     class Meta:
         model = Task
         fields = '__all__'
-        read_only_fields = ('user',)
+        read_only_fields = ('user', 'position', 'urgency', 'is_archived', 'archived_at', 'recurrence_start',
+                            'recurrence_parent', 'occurrence_date', 'next_reminder_at', 'last_reminder_at')
+
+    def validate_recurrence(self, value):
+        if value:
+            try:
+                parse_rule(value)
+            except ValueError as exc:
+                raise serializers.ValidationError(str(exc))
+        return value.strip()
+
+    def validate_recurrence_exceptions(self, value):
+        try:
+            return parse_exceptions(value)
+        except ValueError as exc:
+            raise serializers.ValidationError(str(exc))
+
+    def validate(self, attrs):
+        recurrence = attrs.get('recurrence', getattr(self.instance, 'recurrence', ''))
+        due_date = attrs.get('due_date', getattr(self.instance, 'due_date', None))
+        if recurrence and due_date is None:
+            raise serializers.ValidationError({'recurrence': 'A recurring task needs a due_date'})
+        if recurrence and getattr(self.instance, 'recurrence_parent_id', None):
+            raise serializers.ValidationError({'recurrence': 'An occurrence cannot have its own recurrence'})
+        return attrs
+
+    def create(self, validated_data):
+        tags = validated_data.pop('tags', None)
+        task = super().create(validated_data)
+        if tags:
+            task.tags.add(*tags)
+        return task
+
+    def update(self, instance, validated_data):
+        tags = validated_data.pop('tags', None)
+        if validated_data.get('recurrence', instance.recurrence) != instance.recurrence:
+            # A new rule starts from the task's (possibly new) due date
+            instance.recurrence_start = None
+        if tags is not None:
+            old_names = sorted(instance.tags.values_list('name', flat=True))
+            new_names = sorted(tag.name for tag in tags)
+            if old_names != new_names:
+                # Logged by the task's post_save together with its other changes
+                instance._extra_changes = {'tags': [old_names, new_names]}
+        instance = super().update(instance, validated_data)
+        if tags is not None:
+            self._sync_tags(instance, tags)
+        return instance
+
+    def _sync_tags(self, task, tags):
+        # Only touch the links that actually changed
+        current = set(task.tags.through.objects.filter(task=task).values_list('tag_id', flat=True))
+        wanted = {tag.pk for tag in tags}
+        if current - wanted:
+            task.tags.remove(*(current - wanted))
+        if wanted - current:
+            task.tags.add(*(wanted - current))
 
 class TemplateItemSerializer(serializers.ModelSerializer):
     class Meta:
@@ -82,3 +203,10 @@ class TemplateSerializer(serializers.ModelSerializer):
             for item_data in items_data:
                 TemplateItem.objects.create(template=instance, **item_data)
         return instance
+
+class JobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = ('id', 'kind', 'status', 'progress', 'result', 'error', 'attempts',
+                  'run_at', 'created_at', 'started_at', 'finished_at')
+        read_only_fields = fields
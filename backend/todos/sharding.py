@@ -0,0 +1,222 @@
+"""
+Optional per-user sharding of the todos data.
+
+With TODOS_SHARD_COUNT > 0 each user's tasks, projects, tags, templates,
+activity and daily statistics live in one of N databases, picked by consistent hashing of the user
+id (see `todos.routers.UserShardRouter`). Everything else (auth, tokens,
+sessions, jobs) stays in `default`, and user rows are replicated into the
+user's shard so foreign keys inside the shard still hold.
+"""
+import bisect
+import hashlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import transaction
+
+# model_name of every todos model that lives in the user's shard
+SHARDED_MODELS = {
+    'project', 'tag', 'task', 'task_tags', 'subtask', 'comment', 'activitylog', 'template', 'templateitem',
+    'dailystat',
+}
+
+_current_request = ContextVar('todos_shard_request', default=None)
+_current_user_id = ContextVar('todos_shard_user_id', default=None)
+
+
+def _hash(value):
+    return int(hashlib.md5(str(value).encode()).hexdigest()[:16], 16)
+
+
+class HashRing:
+    """Consistent hash ring: adding a shard only moves ~1/N of the users."""
+
+    def __init__(self, nodes, replicas=128):
+        points = sorted((_hash(f'{node}#{i}'), node) for node in nodes for i in range(replicas))
+        self._hashes = [point for point, _ in points]
+        self._nodes = [node for _, node in points]
+
+    def get(self, key):
+        index = bisect.bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._nodes[index]
+
+
+def sharding_enabled():
+    return bool(settings.TODOS_SHARDS)
+
+
+def data_aliases():
+    """Databases that hold todos data: every shard, or just `default`."""
+    return list(settings.TODOS_SHARDS) or ['default']
+
+
+@lru_cache(maxsize=None)
+def _ring(shards):
+    return HashRing(shards)
+
+
+def shard_for_user(user_id):
+    if not sharding_enabled():
+        return 'default'
+    return _ring(tuple(settings.TODOS_SHARDS)).get(user_id)
+
+
+def current_user_id():
+    """The user whose shard unqualified queries go to: explicit context first, then the request."""
+    user_id = _current_user_id.get()
+    if user_id is not None:
+        return user_id
+    request = _current_request.get()
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user.pk
+    return None
+
+
+@contextmanager
+def use_shard_for(user):
+    """Route todos queries to `user`'s shard (management commands, jobs, streamed responses)."""
+    token = _current_user_id.set(getattr(user, 'pk', user))
+    try:
+        yield
+    finally:
+        _current_user_id.reset(token)
+
+
+def iter_in_shard(user, iterable):
+    """Keep a lazily consumed iterable (streamed response body) on `user`'s shard."""
+    with use_shard_for(user):
+        yield from iterable
+
+
+class ShardContextMiddleware:
+    """
+    Exposes the current request to the router. The user is read lazily, so
+    DRF token authentication (which runs inside the view) is picked up too.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _current_request.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            _current_request.reset(token)
+
+    async def __acall__(self, request):
+        token = _current_request.set(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            _current_request.reset(token)
+
+
+def replicate_user(user, alias):
+    """Copy the user row into `alias` (no password: shards never authenticate)."""
+    from django.contrib.auth.models import User
+    User.objects.using(alias).update_or_create(pk=user.pk, defaults={
+        'username': user.username,
+        'email': user.email,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'is_active': user.is_active,
+        'password': '!',
+    })
+
+
+def _copy_rows(model, rows, target, remap=None):
+    """
+    Insert `rows` into `target` with fresh primary keys (ids are only unique
+    per shard) and return {old pk: new pk}. `remap` maps FK attnames to the
+    id maps of rows copied earlier.
+    """
+    if not rows:
+        return {}
+    # bulk_create re-stamps auto_now/auto_now_add fields; restore them afterwards
+    stamped = [f.attname for f in model._meta.concrete_fields if getattr(f, 'auto_now', False) or getattr(f, 'auto_now_add', False)]
+    originals = [{name: getattr(obj, name) for name in stamped} for obj in rows]
+    old_pks = [obj.pk for obj in rows]
+    for obj in rows:
+        obj.pk = None
+        obj._state.adding = True
+        obj._state.db = None
+        for attname, id_map in (remap or {}).items():
+            value = getattr(obj, attname)
+            if value is not None:
+                setattr(obj, attname, id_map[value])
+    model.objects.using(target).bulk_create(rows, batch_size=500)
+    if stamped:
+        for obj, values in zip(rows, originals):
+            for name, value in values.items():
+                setattr(obj, name, value)
+        model.objects.using(target).bulk_update(rows, stamped, batch_size=500)
+    return dict(zip(old_pks, (obj.pk for obj in rows)))
+
+
+def move_user_data(user, source, target):
+    """Move all of `user`'s todos rows from `source` to `target`. Row ids change."""
+    from django.contrib.auth.models import User
+    from .cache import invalidate_user_cache
+    from .models import Project, Tag, Task, Subtask, Comment, ActivityLog, DailyStat, Template, TemplateItem
+    from .signals import quiet_deletes
+    TaskTag = Task.tags.through
+
+    # The target is the inner block so it commits first: if that commit
+    # fails the source deletes roll back with it, and if the source commit
+    # fails afterwards the rows exist twice rather than nowhere
+    with transaction.atomic(using=source), transaction.atomic(using=target):
+        tasks = list(Task.objects.using(source).filter(user_id=user.pk).order_by('pk'))
+        task_ids = [task.pk for task in tasks]
+        comments = list(Comment.objects.using(source).filter(task_id__in=task_ids).order_by('pk'))
+
+        # Comment authors may be other users; their rows must exist in the target too
+        for author in User.objects.filter(pk__in={user.pk} | {c.user_id for c in comments}):
+            replicate_user(author, target)
+
+        projects = _copy_rows(Project, list(Project.objects.using(source).filter(user_id=user.pk)), target)
+        tags = _copy_rows(Tag, list(Tag.objects.using(source).filter(user_id=user.pk)), target)
+        # recurrence_parent points into the rows being copied: relink after the insert
+        parents = {task.pk: task.recurrence_parent_id for task in tasks if task.recurrence_parent_id}
+        for task in tasks:
+            task.recurrence_parent_id = None
+        task_map = _copy_rows(Task, tasks, target, {'project_id': projects})
+        for old_pk, parent_id in parents.items():
+            Task.objects.using(target).filter(pk=task_map[old_pk]).update(recurrence_parent_id=task_map[parent_id])
+        _copy_rows(TaskTag, list(TaskTag.objects.using(source).filter(task_id__in=task_ids)), target,
+                   {'task_id': task_map, 'tag_id': tags})
+        _copy_rows(Subtask, list(Subtask.objects.using(source).filter(task_id__in=task_ids)), target, {'task_id': task_map})
+        _copy_rows(Comment, comments, target, {'task_id': task_map})
+        activity = list(ActivityLog.objects.using(source).filter(user_id=user.pk))
+        target_maps = {'Task': task_map, 'Project': projects}
+        for row in activity:
+            if row.target_id is not None:
+                # Targets that no longer exist keep the row but lose the link
+                row.target_id = target_maps.get(row.target_type, {}).get(row.target_id)
+        _copy_rows(ActivityLog, activity, target)
+        _copy_rows(DailyStat, list(DailyStat.objects.using(source).filter(user_id=user.pk)), target)
+        templates = list(Template.objects.using(source).filter(user_id=user.pk))
+        template_ids = [template.pk for template in templates]
+        template_map = _copy_rows(Template, templates, target)
+        _copy_rows(TemplateItem, list(TemplateItem.objects.using(source).filter(template_id__in=template_ids)), target,
+                   {'template_id': template_map})
+
+        # Deleting the tasks and templates cascades to their subtasks,
+        # comments, tag links and items. Quietly: a moved task isn't a
+        # DELETED one, and the cache is invalidated below
+        with quiet_deletes():
+            for model in (Task, Tag, Project, Template, ActivityLog, DailyStat):
+                model.objects.using(source).filter(user_id=user.pk).delete()
+    # Cached payloads hold the old row ids
+    invalidate_user_cache(user.pk)
+    return len(tasks)
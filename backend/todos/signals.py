@@ -1,6 +1,39 @@
-from django.db.models.signals import post_save, post_delete, pre_save
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.models.signals import post_save, post_delete, pre_save, m2m_changed
 from django.dispatch import receiver
-from .models import Task, Project, ActivityLog
+from .models import Task, Project, Tag, ActivityLog
+from .activity import TRACKED_TASK_FIELDS, diff, log_update, snapshot
+from .cache import invalidate_user_cache
+from .reminders import reminder_time
+from .rollups import record
+from .sharding import sharding_enabled, shard_for_user, replicate_user
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+_quiet_deletes = ContextVar('todos_quiet_deletes', default=False)
+
+
+@contextmanager
+def quiet_deletes():
+    """
+    Deletes inside this block log no DELETED activity and leave the cache
+    alone: for maintenance (purging the trash, moving a user between shards)
+    that deletes rows in bulk and invalidates the users' cache itself.
+    """
+    token = _quiet_deletes.set(True)
+    try:
+        yield
+    finally:
+        _quiet_deletes.reset(token)
+
+def _is_quiet_delete(origin):
+    # Also quiet when the rows go with their user: nothing is left to log to
+    # or to cache for, and recreating the user's rows would break the delete
+    if _quiet_deletes.get():
+        return True
+    return isinstance(origin, User) or getattr(origin, 'model', None) is User
 
 @receiver(pre_save, sender=Task)
 def check_task_changes(sender, instance, **kwargs):
@@ -8,52 +41,65 @@ def check_task_changes(sender, instance, **kwargs):
         try:
             old_instance = Task.objects.get(pk=instance.pk)
             instance._was_completed = old_instance.completed
-            instance._old_priority = old_instance.priority
-            instance._old_due_date = old_instance.due_date
+            instance._old_values = snapshot(old_instance, TRACKED_TASK_FIELDS)
         except Task.DoesNotExist:
             pass
 
+@receiver(pre_save, sender=Task)
+def schedule_reminder(sender, instance, **kwargs):
+    instance.next_reminder_at = reminder_time(instance)
+
 @receiver(post_save, sender=Task)
 def log_task_save(sender, instance, created, **kwargs):
     user = instance.user
     target_name = instance.title
     
     if created:
+        if instance.recurrence_parent_id and instance.completed:
+            return # Stored copy of a completed occurrence: the series logs the completion
         ActivityLog.objects.create(
             user=user,
             action='CREATED',
             target_type='Task',
+            target_id=instance.pk,
             target_name=target_name,
             details=f"Tarea creada: {target_name}"
         )
+        if not instance.recurrence_parent_id:
+            record(user, timezone.localdate(instance.created_at), created=1)
     else:
+        # Set by Task.complete_occurrence(): the series moved on to its next occurrence
+        completed_occurrence = instance.__dict__.pop('_completed_occurrence', None)
+        # Set by TaskSerializer.update(): the tag change that comes with this save
+        extra_changes = instance.__dict__.pop('_extra_changes', {})
         # Check for specific changes if we have history
         if hasattr(instance, '_was_completed'):
-            if instance.completed and not instance._was_completed:
+            if (instance.completed and not instance._was_completed) or completed_occurrence:
                  ActivityLog.objects.create(
                     user=user,
                     action='COMPLETED',
                     target_type='Task',
+                    target_id=instance.pk,
                     target_name=target_name,
                     details=f"Tarea completada: {target_name}"
                 )
+                 record(user, timezone.localdate(), completed=1)
                  return # Don't log generic update if it was a completion event
 
-        # Generic Update
-        ActivityLog.objects.create(
-            user=user,
-            action='UPDATED',
-            target_type='Task',
-            target_name=target_name,
-            details=f"Tarea actualizada: {target_name}"
-        )
+        # Generic Update, merged with the task's previous one if recent
+        changes = diff(instance._old_values, snapshot(instance, TRACKED_TASK_FIELDS)) if hasattr(instance, '_old_values') else {}
+        changes.update(extra_changes)
+        log_update(user, 'Task', instance.pk, target_name, f"Tarea actualizada: {target_name}", changes)
 
 @receiver(post_delete, sender=Task)
-def log_task_delete(sender, instance, **kwargs):
+def log_task_delete(sender, instance, origin=None, **kwargs):
+    if _is_quiet_delete(origin):
+        return
     ActivityLog.objects.create(
         user=instance.user,
         action='DELETED',
         target_type='Task',
+        target_id=instance.pk,
         target_name=instance.title,
         details=f"Tarea eliminada: {instance.title}"
     )
@@ -66,7 +112,39 @@ def log_project_save(sender, instance, created, **kwargs):
             user=user,
             action='CREATED',
             target_type='Project',
+            target_id=instance.pk,
             target_name=instance.name,
             details=f"Proyecto creado: {instance.name}"
         )
 
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_counts(sender, instance, signal, origin=None, **kwargs):
+    if signal is post_delete and _is_quiet_delete(origin):
+        return
+    invalidate_user_cache(instance.user_id)
+
+@receiver(m2m_changed, sender=Task.tags.through)
+def invalidate_counts_on_tags_change(sender, instance, action, **kwargs):
+    if action.startswith('post_'):
+        # instance is a Task, or a Tag when changed from the reverse side
+        invalidate_user_cache(instance.user_id)
+
+@receiver(post_save, sender=User)
+def replicate_user_to_shard(sender, instance, using, update_fields=None, **kwargs):
+    # Shards keep a copy of the user row so their foreign keys hold
+    if not sharding_enabled() or using != 'default':
+        return
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    replicate_user(instance, shard_for_user(instance.pk))
+
+@receiver(post_delete, sender=User)
+def delete_user_from_shard(sender, instance, using, **kwargs):
+    if sharding_enabled() and using == 'default':
+        # Cascades to the user's todos data inside the shard
+        User.objects.using(shard_for_user(instance.pk)).filter(pk=instance.pk).delete()
@@ -0,0 +1,197 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.db import connections
+from django.db.models import Count
+from django.db.models.functions import TruncDate, ExtractWeekDay
+from django.utils import timezone
+from datetime import timedelta
+
+from .models import Task, ActivityLog
+
+
+def _task_counts(user, today):
+    tasks = Task.objects.filter(user=user)
+    completed_tasks = tasks.filter(completed=True)
+    pending_tasks = tasks.filter(completed=False)
+    return tasks.count(), completed_tasks.count(), pending_tasks.count()
+
+
+def _streak(user, today):
+    # Streak Calculation (simplified based on ActivityLog)
+    # Find continuous days with 'COMPLETED' activity
+    streak = 0
+    current_date = today
+    
+    # We check efficiently by getting distinct dates of completion
+    activity_dates = ActivityLog.objects.filter(
+        user=user, 
+        action='COMPLETED'
+    ).annotate(date=TruncDate('timestamp')).values_list('date', flat=True).distinct().order_by('-date')
+    
+    activity_dates_set = set(activity_dates)
+
+    # Check today then backwards
+    if current_date in activity_dates_set:
+        streak += 1
+        current_date -= timedelta(days=1)
+        while current_date in activity_dates_set:
+            streak += 1
+            current_date -= timedelta(days=1)
+    elif (current_date - timedelta(days=1)) in activity_dates_set:
+         # If not today, but yesterday, streak is alive
+        streak += 1
+        current_date -= timedelta(days=2) # Start checking from day before yesterday
+        while current_date in activity_dates_set:
+            streak += 1
+            current_date -= timedelta(days=1)
+    return streak
+
+
+def _productivity_chart(user, today):
+    # Productivity Chart (Last 7 Days)
+    last_7_days = today - timedelta(days=6)
+    productivity_data = (
+        ActivityLog.objects.filter(
+            user=user, 
+            action='COMPLETED', 
+            timestamp__date__gte=last_7_days
+        )
+        .annotate(date=TruncDate('timestamp'))
+        .values('date')
+        .annotate(count=Count('id'))
+        .order_by('date')
+    )
+    
+    # Fill missing days
+    prod_chart_labels = []
+    prod_chart_data = []
+    prod_map = {item['date']: item['count'] for item in productivity_data}
+    
+    for i in range(7):
+        d = last_7_days + timedelta(days=i)
+        # Spanish day names
+        day_name = d.strftime('%a') # Mon, Tue... we can map or use locale
+        # Simple manual map for Spanish
+        days_es = {'Mon': 'Lun', 'Tue': 'Mar', 'Wed': 'Mié', 'Thu': 'Jue', 'Fri': 'Vie', 'Sat': 'Sáb', 'Sun': 'Dom'}
+        prod_chart_labels.append(days_es.get(day_name, day_name))
+        prod_chart_data.append(prod_map.get(d, 0))
+    return { 'labels': prod_chart_labels, 'data': prod_chart_data }
+
+
+def _projects_chart(user, today):
+    # Projects Chart
+    projects_data = (
+        Task.objects.filter(user=user).values('project__name')
+        .annotate(count=Count('id'))
+        .order_by('-count')
+    )
+    project_labels = [item['project__name'] if item['project__name'] else 'Sin Proyecto' for item in projects_data]
+    project_counts = [item['count'] for item in projects_data]
+    return { 'labels': project_labels, 'data': project_counts }
+
+
+def _priority_counts(user, today):
+    # Priority Chart
+    priority_data = (
+        Task.objects.filter(user=user).values('priority')
+        .annotate(count=Count('id'))
+    )
+    prio_map = {item['priority']: item['count'] for item in priority_data}
+    # Fixed order matches frontend colors
+    return [
+        prio_map.get('high', 0),
+        prio_map.get('medium', 0),
+        prio_map.get('low', 0)
+    ]
+
+
+def _weekday_counts(user, today):
+    # Weekday Chart (Best days)
+    weekday_data = (
+        ActivityLog.objects.filter(user=user, action='COMPLETED')
+        .annotate(weekday=ExtractWeekDay('timestamp'))
+        .values('weekday')
+        .annotate(count=Count('id'))
+        .order_by('weekday')
+    )
+    # Django ExtractWeekDay: 1=Sunday, 7=Saturday (usually) -> verify.
+    # Actually in many DBs it varies. Standard is often Sunday=1.
+    # Let's assume standard and map to 0-6 array.
+    weekday_map = {item['weekday']: item['count'] for item in weekday_data}
+    # Order: Mon (2), Tue (3) ... Sat (7), Sun (1)
+    return [
+        weekday_map.get(2, 0), # Mon
+        weekday_map.get(3, 0),
+        weekday_map.get(4, 0),
+        weekday_map.get(5, 0),
+        weekday_map.get(6, 0),
+        weekday_map.get(7, 0),
+        weekday_map.get(1, 0), # Sun
+    ]
+
+
+# Independent parts of the statistics payload; each one is a few queries
+STATISTICS_PARTS = (
+    ('counts', _task_counts),
+    ('streak', _streak),
+    ('productivity', _productivity_chart),
+    ('projects', _projects_chart),
+    ('priority', _priority_counts),
+    ('weekday', _weekday_counts),
+)
+
+
+def _assemble(parts):
+    total_count, completed_count, pending_count = parts['counts']
+    completion_rate = round((completed_count / total_count * 100), 1) if total_count > 0 else 0
+
+    # Created vs completed over time is served by /api/statistics/history/ (todos/rollups.py)
+
+    data = {
+        'completed_count': completed_count,
+        'pending_count': pending_count,
+        'completion_rate': completion_rate,
+        'streak': parts['streak'],
+        'charts': {
+            'productivity': parts['productivity'],
+            'projects': parts['projects'],
+            'priority': { 'data': parts['priority'] }, # Labels fixed in frontend
+            'weekday': { 'data': parts['weekday'] }
+        }
+    }
+    return data
+
+
+def build_statistics(user):
+    today = timezone.now().date()
+    return _assemble({name: part(user, today) for name, part in STATISTICS_PARTS})
+
+
+def in_own_connection(func):
+    """
+    `func` for sync_to_async(..., thread_sensitive=False): it runs on an
+    executor thread, which opens its own connections; they are closed
+    when it returns.
+    """
+    def run(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            # Worker threads are reused by the executor; don't leave connections behind
+            connections.close_all()
+    return run
+
+
+async def abuild_statistics(user):
+    """
+    build_statistics() for async views. The async ORM runs every query on
+    one shared thread, so the parts are sent to separate worker threads
+    (each with its own connection) to actually overlap.
+    """
+    today = timezone.now().date()
+    results = await asyncio.gather(*(
+        sync_to_async(in_own_connection(part), thread_sensitive=False)(user, today)
+        for _, part in STATISTICS_PARTS
+    ))
+    return _assemble({name: result for (name, _), result in zip(STATISTICS_PARTS, results)})
@@ -0,0 +1,86 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ..activity import merge_changes
+from ..models import ActivityLog, Tag, Task
+
+
+class MergeChangesTests(SimpleTestCase):
+    def test_keeps_the_first_old_and_the_latest_new_value(self):
+        merged = merge_changes({'title': ['a', 'b']}, {'title': ['b', 'c'], 'priority': ['low', 'high']})
+        self.assertEqual(merged, {'title': ['a', 'c'], 'priority': ['low', 'high']})
+
+    def test_fields_back_where_they_started_are_dropped(self):
+        self.assertEqual(merge_changes({'title': ['a', 'b']}, {'title': ['b', 'a']}), {})
+
+
+class UpdateCoalescingTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ana', password='secret')
+        self.task = Task.objects.create(user=self.user, title='a')
+
+    def edit(self, **fields):
+        for name, value in fields.items():
+            setattr(self.task, name, value)
+        self.task.save()
+
+    def rows(self):
+        return list(ActivityLog.objects.filter(target_id=self.task.pk).order_by('id').values_list(
+            'action', 'change_count', 'changes'))
+
+    def test_quick_edits_fold_into_one_row(self):
+        self.edit(title='b')
+        self.edit(title='c', priority='high')
+        self.assertEqual(self.rows(), [('CREATED', 1, {}),
+                                       ('UPDATED', 2, {'title': ['a', 'c'], 'priority': ['medium', 'high']})])
+
+    def test_edits_after_the_window_get_a_new_row(self):
+        self.edit(title='b')
+        ActivityLog.objects.filter(action='UPDATED').update(timestamp=timezone.now() - timedelta(minutes=10))
+        self.edit(title='c')
+        self.assertEqual([row[2] for row in self.rows()[1:]], [{'title': ['a', 'b']}, {'title': ['b', 'c']}])
+
+    def test_other_events_close_the_row(self):
+        self.edit(title='b')
+        self.edit(completed=True)
+        self.edit(title='c')
+        self.assertEqual([row[0] for row in self.rows()], ['CREATED', 'UPDATED', 'COMPLETED', 'UPDATED'])
+
+    @override_settings(TODOS_ACTIVITY_COALESCE_SECONDS=0)
+    def test_coalescing_can_be_turned_off(self):
+        self.edit(title='b')
+        self.edit(title='c')
+        self.assertEqual([row[:2] for row in self.rows()], [('CREATED', 1), ('UPDATED', 1), ('UPDATED', 1)])
+
+
+class TagActivityTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ana', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.work = Tag.objects.create(user=self.user, name='work')
+        self.home = Tag.objects.create(user=self.user, name='home')
+        self.task = Task.objects.create(user=self.user, title='a')
+        self.task.tags.add(self.work)
+
+    def updates(self):
+        return ActivityLog.objects.filter(action='UPDATED', target_id=self.task.pk)
+
+    def test_tag_swap_is_one_change(self):
+        self.client.patch(f'/api/tasks/{self.task.pk}/', {'title': 'b', 'tag_ids': [self.home.pk]}, format='json')
+        update = self.updates().get()
+        self.assertEqual(update.change_count, 1)
+        self.assertEqual(update.changes, {'title': ['a', 'b'], 'tags': [['work'], ['home']]})
+
+    @override_settings(TODOS_ACTIVITY_COALESCE_SECONDS=0)
+    def test_tag_swap_is_one_row_without_coalescing(self):
+        self.client.patch(f'/api/tasks/{self.task.pk}/', {'tag_ids': [self.home.pk]}, format='json')
+        self.assertEqual(list(self.updates().values_list('changes', flat=True)), [{'tags': [['work'], ['home']]}])
+
+    def test_unchanged_tags_are_not_logged(self):
+        self.client.patch(f'/api/tasks/{self.task.pk}/', {'tag_ids': [self.work.pk]}, format='json')
+        self.assertEqual(self.updates().get().changes, {})
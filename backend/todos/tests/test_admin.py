@@ -0,0 +1,59 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from ..admin import EstimatedCountPaginator
+from ..models import ThrottleBucket
+
+
+class AdminSearchTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser('root', 'Root@example.com', 'secret')
+        User.objects.create_user('rosa', 'rosa@example.com', 'secret')
+        User.objects.create_user('Rob', 'bob@example.com', 'secret')
+        self.client.force_login(self.admin)
+
+    def results(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return sorted(str(obj) for obj in response.context['cl'].result_list)
+
+    def test_user_search_by_username_or_email_prefix(self):
+        self.assertEqual(self.results('/admin/auth/user/?q=ro'), ['root', 'rosa'])
+        self.assertEqual(self.results('/admin/auth/user/?q=BOB@'), ['Rob'])
+
+    def test_throttle_bucket_search_by_key_prefix(self):
+        for key in ('user:4', 'user:42', 'anon:4'):
+            ThrottleBucket.objects.create(key=key, tat=0)
+        self.assertEqual(self.results('/admin/todos/throttlebucket/?q=user:4'), ['user:4', 'user:42'])
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    def setUp(self):
+        for i in range(5):
+            ThrottleBucket.objects.create(key=f'user:{i}', tat=0)
+
+    def count(self, queryset):
+        with CaptureQueriesContext(connection) as queries:
+            count = EstimatedCountPaginator(queryset, 2).count
+        return count, [query['sql'] for query in queries]
+
+    def test_unfiltered_list_uses_the_table_estimate(self):
+        with mock.patch('todos.admin.estimated_row_count', return_value=1000000):
+            count, queries = self.count(ThrottleBucket.objects.all())
+        self.assertEqual((count, queries), (1000000, []))
+
+    def test_without_an_estimate_the_count_is_capped(self):
+        with mock.patch.object(EstimatedCountPaginator, 'COUNT_LIMIT', 3):
+            self.assertEqual(self.count(ThrottleBucket.objects.all())[0], 3)
+            count, queries = self.count(ThrottleBucket.objects.filter(key__startswith='user:'))
+        self.assertEqual(count, 3)
+        self.assertIn('LIMIT 3', queries[0])
+
+    def test_sqlite_estimate_comes_from_analyze(self):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        self.assertEqual(self.count(ThrottleBucket.objects.all())[0], 5)
@@ -0,0 +1,70 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ..models import Task
+
+
+class ArchiveTasksTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ana', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        long_ago = timezone.now() - timedelta(days=120)
+        self.old = Task.objects.create(user=self.user, title='old', completed=True)
+        old_open = Task.objects.create(user=self.user, title='old open')
+        recent = Task.objects.create(user=self.user, title='recent', completed=True)
+        Task.objects.filter(pk__in=[self.old.pk, old_open.pk]).update(updated_at=long_ago)
+        self.kept = {old_open.pk, recent.pk}
+
+    def archive(self):
+        call_command('archive_tasks', '--days=90', '--batch-size=1', stdout=StringIO())
+
+    def listed(self, url):
+        return {task['id'] for task in self.client.get(url).data}
+
+    def test_only_old_completed_tasks_are_archived(self):
+        self.archive()
+        self.old.refresh_from_db()
+        self.assertTrue(self.old.is_archived)
+        self.assertIsNotNone(self.old.archived_at)
+        self.assertEqual(set(Task.objects.filter(is_archived=False).values_list('pk', flat=True)), self.kept)
+
+    def test_default_list_skips_archived_tasks(self):
+        self.archive()
+        self.assertEqual(self.listed('/api/tasks/'), self.kept)
+        self.assertEqual(self.listed('/api/tasks/?include_archived=1'), self.kept | {self.old.pk})
+        self.assertEqual(self.listed('/api/tasks/archived/'), {self.old.pk})
+
+    def test_unarchive(self):
+        self.archive()
+        response = self.client.post(f'/api/tasks/{self.old.pk}/unarchive/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(self.old.pk, self.listed('/api/tasks/'))
+        self.assertEqual(self.client.post(f'/api/tasks/{self.old.pk}/unarchive/').status_code, 400)
+
+    def test_reopening_an_archived_task_unarchives_it(self):
+        self.archive()
+        response = self.client.patch(f'/api/tasks/{self.old.pk}/', {'completed': False}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.old.refresh_from_db()
+        self.assertFalse(self.old.is_archived)
+
+
+class ArchiveFieldsTests(TestCase):
+    def test_archive_fields_are_read_only(self):
+        user = User.objects.create_user('ana', password='secret')
+        client = APIClient()
+        client.force_authenticate(user)
+        task = Task.objects.create(user=user, title='a')
+        response = client.patch(f'/api/tasks/{task.pk}/', {'is_archived': True, 'archived_at': timezone.now()},
+                                format='json')
+        self.assertEqual(response.status_code, 200)
+        task.refresh_from_db()
+        self.assertFalse(task.is_archived)
+        self.assertIsNone(task.archived_at)
@@ -0,0 +1,60 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from ..models import Subtask, Tag, Task
+
+
+class AsyncTaskListTests(TransactionTestCase):
+    # The async list reads on executor threads with their own connections,
+    # which would not see a TestCase's uncommitted rows
+    def setUp(self):
+        self.user = User.objects.create_user('ana', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.token = Token.objects.create(user=self.user).key
+        now = timezone.now()
+        for days, priority in ((1, 'low'), (2, 'high'), (3, 'medium')):
+            Task.objects.create(user=self.user, title=f'{priority}', priority=priority, due_date=now + timedelta(days=days))
+        Task.objects.create(user=self.user, title='daily', due_date=now, recurrence='FREQ=DAILY')
+
+    def assertSamePayload(self, query):
+        sync = self.client.get(f'/api/tasks/{query}')
+        response = self.client.get(f'/api/async/tasks/{query}', HTTP_AUTHORIZATION=f'Token {self.token}')
+        self.assertEqual(response.status_code, sync.status_code)
+        self.assertEqual(response.json(), sync.json())
+        return response
+
+    def test_same_payload_as_task_list(self):
+        today = timezone.localdate()
+        window = f'?start={today}&end={today + timedelta(days=6)}&limit=5'
+        self.assertEqual(len(self.assertSamePayload('').json()), 4)
+        self.assertEqual([task['title'] for task in self.assertSamePayload('?ordering=urgency&limit=2').json()],
+                         ['daily', 'high'])
+        self.assertEqual(len(self.assertSamePayload(window).json()), 5)
+
+    def test_same_errors_as_task_list(self):
+        for query in ('?ordering=title', '?limit=0', '?ordering=urgency&start=2024-01-01&end=2024-01-02'):
+            with self.subTest(query=query):
+                self.assertEqual(self.assertSamePayload(query).status_code, 400)
+
+    def test_list_queries_do_not_grow_with_the_tasks(self):
+        def queries():
+            with CaptureQueriesContext(connection) as captured:
+                self.assertEqual(self.client.get('/api/tasks/').status_code, 200)
+            return len(captured)
+
+        queries()  # creates the throttle bucket
+        before = queries()
+        tag = Tag.objects.create(user=self.user, name='work')
+        for i in range(5):
+            task = Task.objects.create(user=self.user, title=f'more {i}')
+            task.tags.add(tag)
+            Subtask.objects.create(task=task, title='s')
+        self.assertEqual(queries(), before)
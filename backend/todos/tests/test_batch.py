@@ -0,0 +1,63 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from ..models import Task
+
+
+class BatchViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ana', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.task = Task.objects.create(user=self.user, title='a')
+
+    def batch(self, requests, atomic=False):
+        return self.client.post('/api/batch/', {'requests': requests, 'atomic': atomic}, format='json')
+
+    def test_responses_come_back_in_order(self):
+        response = self.batch([
+            {'method': 'PATCH', 'path': f'tasks/{self.task.pk}/', 'body': {'completed': True}},
+            {'method': 'POST', 'path': '/api/tasks/', 'body': {'title': 'b'}},
+            {'path': f'tasks/{self.task.pk}/'},
+            {'path': 'tasks/999999/'},
+        ])
+        self.assertEqual(response.status_code, 200)
+        responses = response.data['responses']
+        self.assertEqual([item['status'] for item in responses], [200, 201, 200, 404])
+        self.assertTrue(responses[2]['body']['completed'])
+        self.assertEqual(Task.objects.get(pk=responses[1]['body']['id']).user, self.user)
+
+    def test_sub_requests_only_see_the_users_data(self):
+        other = Task.objects.create(user=User.objects.create_user('luis', password='secret'), title='ajena')
+        response = self.batch([{'method': 'DELETE', 'path': f'tasks/{other.pk}/'}])
+        self.assertEqual(response.data['responses'][0]['status'], 404)
+        self.assertTrue(Task.objects.filter(pk=other.pk).exists())
+
+    def test_atomic_batch_rolls_back_at_the_first_error(self):
+        response = self.batch([
+            {'method': 'PATCH', 'path': f'tasks/{self.task.pk}/', 'body': {'title': 'changed'}},
+            {'method': 'POST', 'path': 'tasks/', 'body': {'title': ''}},
+            {'method': 'POST', 'path': 'tasks/', 'body': {'title': 'never'}},
+        ], atomic=True)
+        self.assertEqual([item['status'] for item in response.data['responses']], [200, 400, 424])
+        self.assertFalse(response.data['committed'])
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.title, 'a')
+        self.assertFalse(Task.objects.filter(title='never').exists())
+
+    def test_atomic_batch_commits_when_everything_succeeds(self):
+        response = self.batch([{'method': 'POST', 'path': 'tasks/', 'body': {'title': t}} for t in 'bc'], atomic=True)
+        self.assertTrue(response.data['committed'])
+        self.assertEqual(Task.objects.filter(user=self.user).count(), 3)
+
+    def test_only_api_endpoints_can_be_batched(self):
+        response = self.batch([{'path': '/admin/'}, {'path': 'batch/'}, {'path': 'export/?format=ndjson'},
+                               {'method': 'GET'}])
+        self.assertEqual([item['status'] for item in response.data['responses']], [400, 400, 400, 400])
+
+    @override_settings(TODOS_BATCH_MAX_REQUESTS=2)
+    def test_malformed_batches_are_rejected(self):
+        for requests in ([], 'tasks/', [{'path': 'tasks/'}] * 3):
+            with self.subTest(requests=requests):
+                self.assertEqual(self.batch(requests).status_code, 400)
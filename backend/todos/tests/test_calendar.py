@@ -0,0 +1,68 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from ..models import Task
+
+
+def aware(*args):
+    return datetime(*args, tzinfo=ZoneInfo('UTC'))
+
+
+class CalendarViewTests(TestCase):
+    url = '/api/calendar/?start=2024-03-01&end=2024-03-31'
+
+    def setUp(self):
+        self.user = User.objects.create_user('ana', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.task = Task.objects.create(user=self.user, title='Informe; v2', priority='high',
+                                        due_date=aware(2024, 3, 4, 9))
+        Task.objects.create(user=self.user, title='Compra', priority='low', completed=True,
+                            due_date=aware(2024, 3, 4, 18))
+        Task.objects.create(user=self.user, title='Abril', due_date=aware(2024, 4, 1, 9))
+        Task.objects.create(user=self.user, title='Papelera', due_date=aware(2024, 3, 5, 9), is_deleted=True)
+
+    def test_tasks_and_day_counts_in_the_window(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([task['title'] for task in response.data['tasks']], ['Informe; v2', 'Compra'])
+        [day] = response.data['days']
+        self.assertEqual((str(day['day']), day['total'], day['completed'], day['pending']), ('2024-03-04', 2, 1, 1))
+        self.assertEqual((day['high'], day['medium'], day['low']), (1, 0, 1))
+
+    def test_days_follow_the_requested_time_zone(self):
+        # 18:00 UTC is already the 5th in Tokyo
+        response = self.client.get(self.url + '&tz=Asia/Tokyo')
+        self.assertEqual([str(day['day']) for day in response.data['days']], ['2024-03-04', '2024-03-05'])
+
+    def test_unchanged_window_answers_304(self):
+        first = self.client.get(self.url)
+        again = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(again.status_code, 304)
+
+        Task.objects.filter(pk=self.task.pk).update(title='Informe v3', updated_at=aware(2030, 1, 1))
+        changed = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], first['ETag'])
+
+    def test_ics_feed(self):
+        response = self.client.get(self.url + '&format=ics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/calendar'))
+        body = response.content.decode()
+        self.assertTrue(body.startswith('BEGIN:VCALENDAR\r\n'))
+        self.assertEqual(body.count('BEGIN:VEVENT'), 2)
+        self.assertIn(f'UID:task-{self.task.pk}@tolist', body)
+        self.assertIn('DTSTART:20240304T090000Z', body)
+        self.assertIn('SUMMARY:Informe\\; v2', body)
+        self.assertIn('SUMMARY:✓ Compra', body)
+
+    def test_invalid_window_is_rejected(self):
+        for query in ('start=2024-03-10&end=2024-03-01', 'start=2024-01-01&end=2025-06-01', 'start=x&end=y',
+                      'start=2024-03-01&end=2024-03-31&tz=Mars/Base'):
+            with self.subTest(query=query):
+                self.assertEqual(self.client.get(f'/api/calendar/?{query}').status_code, 400)
@@ -0,0 +1,69 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ..models import ActivityLog, Project, Tag, Task, UserCacheVersion
+from ..views import CountsView
+
+
+class CountsViewTests(TestCase):
+    def setUp(self):
+        # Versions start over with every test's database, cached entries don't
+        cache.clear()
+        self.user = User.objects.create_user('ana', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.project = Project.objects.create(user=self.user, name='Casa')
+        self.tag = Tag.objects.create(user=self.user, name='urgente')
+        now = timezone.now()
+        tagged = Task.objects.create(user=self.user, title='a', project=self.project, is_important=True,
+                                     due_date=now)
+        tagged.tags.add(self.tag)
+        Task.objects.create(user=self.user, title='b', completed=True, project=self.project)
+        Task.objects.create(user=self.user, title='c', due_date=now - timedelta(days=3))
+        Task.objects.create(user=self.user, title='d', is_deleted=True)
+        Task.objects.create(user=User.objects.create_user('luis', password='secret'), title='ajena')
+
+    def counts(self):
+        with mock.patch.object(CountsView, 'compute', autospec=True, side_effect=CountsView.compute) as compute:
+            response = self.client.get('/api/counts/')
+        self.assertEqual(response.status_code, 200)
+        return response.data, compute.call_count
+
+    def test_counts(self):
+        data, _ = self.counts()
+        self.assertEqual({name: data[name] for name in ('total', 'completed', 'pending', 'important', 'today',
+                                                        'overdue', 'trash')},
+                         {'total': 3, 'completed': 1, 'pending': 2, 'important': 1, 'today': 1, 'overdue': 1,
+                          'trash': 1})
+        self.assertEqual(data['projects'], {str(self.project.pk): {'total': 2, 'completed': 1},
+                                            'none': {'total': 1, 'completed': 0}})
+        self.assertEqual(data['tags'], {str(self.tag.pk): 1})
+
+    def test_cached_until_a_task_changes(self):
+        self.assertEqual(self.counts()[1], 1)
+        self.assertEqual(self.counts()[1], 0)
+
+        Task.objects.create(user=self.user, title='e')
+        data, computed = self.counts()
+        self.assertEqual((data['total'], computed), (4, 1))
+
+    def test_change_made_by_another_worker_is_seen(self):
+        self.counts()
+        # The other worker has its own per-process cache; only the database is shared
+        with mock.patch('todos.cache.cache', LocMemCache('other-worker', {})):
+            Task.objects.create(user=self.user, title='e')
+        data, computed = self.counts()
+        self.assertEqual((data['total'], computed), (4, 1))
+
+    def test_deleting_the_user_leaves_no_version_behind(self):
+        self.counts()
+        self.user.delete()
+        self.assertFalse(UserCacheVersion.objects.filter(user_id=self.user.pk).exists())
+        self.assertFalse(ActivityLog.objects.filter(user_id=self.user.pk).exists())
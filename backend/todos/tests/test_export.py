@@ -0,0 +1,61 @@
+import csv
+import gzip
+import io
+import json
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from ..export import EXPORT_RESOURCES
+from ..models import Comment, Project, Subtask, Tag, Task
+
+
+class ExportViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ana', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        project = Project.objects.create(user=self.user, name='Casa')
+        tag = Tag.objects.create(user=self.user, name='urgente')
+        self.task = Task.objects.create(user=self.user, title='Pintar, "rápido"', project=project)
+        self.task.tags.add(tag)
+        Subtask.objects.create(task=self.task, title='Comprar pintura')
+        Comment.objects.create(task=self.task, user=self.user, content='ok')
+        other = User.objects.create_user('luis', password='secret')
+        Task.objects.create(user=other, title='Ajena')
+
+    def get(self, query):
+        response = self.client.get(f'/api/export/?{query}')
+        body = b''.join(response.streaming_content)
+        return response, body
+
+    def test_ndjson_has_every_resource_and_only_the_users_rows(self):
+        response, body = self.get('format=ndjson')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('tolist-export.ndjson', response['Content-Disposition'])
+        records = [json.loads(line) for line in body.decode().splitlines()]
+        types = {record['type'] for record in records}
+        self.assertTrue({'projects', 'tags', 'tasks', 'task_tags', 'subtasks', 'comments'} <= types)
+        self.assertTrue(types <= set(EXPORT_RESOURCES))
+        tasks = [record for record in records if record['type'] == 'tasks']
+        self.assertEqual([task['title'] for task in tasks], ['Pintar, "rápido"'])
+        self.assertEqual(tasks[0]['project_id'], self.task.project_id)
+
+    def test_csv_exports_one_resource_with_a_header(self):
+        response, body = self.get('format=csv&resource=tasks')
+        self.assertEqual(response.status_code, 200)
+        rows = list(csv.reader(io.StringIO(body.decode())))
+        self.assertEqual(rows[0], EXPORT_RESOURCES['tasks'][1])
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][1], 'Pintar, "rápido"')
+
+    def test_gzip_output_decompresses_to_the_plain_export(self):
+        _, plain = self.get('format=ndjson&resource=subtasks')
+        response, body = self.get('format=ndjson&resource=subtasks&compress=gzip')
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertEqual(gzip.decompress(body), plain)
+
+    def test_unknown_resource_is_rejected(self):
+        response = self.client.get('/api/export/?format=ndjson&resource=passwords')
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,86 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from ..importer import TaskImporter, decode_lines, parse_csv, parse_ndjson
+from ..models import ActivityLog, DailyStat, Tag, Task
+
+
+class TaskImporterTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ana', password='secret')
+
+    def run_csv(self, text, **kwargs):
+        lines = decode_lines(iter(line.encode() for line in text.splitlines(keepends=True)))
+        return TaskImporter(self.user, **kwargs).run(parse_csv(lines))
+
+    def test_csv_import(self):
+        Tag.objects.create(user=self.user, name='work')
+        report = self.run_csv(
+            'title,priority,completed,due_date,project,tags,subtasks\n'
+            'Informe,high,no,2024-03-04,Trabajo,work|urgente,Borrador|Revisar\n'
+            'Compra,,sí,,,urgente,\n'
+            ',low,no,,,,\n'
+            'Llamar,altísima,no,,,,\n'
+        )
+        self.assertEqual(report['created'], 2)
+        self.assertEqual([error['row'] for error in report['errors']], [4, 5])
+        informe = Task.objects.get(title='Informe')
+        self.assertEqual((informe.priority, informe.completed, informe.project.name), ('high', False, 'Trabajo'))
+        self.assertEqual(sorted(informe.tags.values_list('name', flat=True)), ['urgente', 'work'])
+        self.assertEqual(list(informe.subtasks.order_by('position').values_list('title', flat=True)),
+                         ['Borrador', 'Revisar'])
+        self.assertTrue(Task.objects.get(title='Compra').completed)
+        # Existing tags are reused, new ones created once
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(ActivityLog.objects.filter(target_type='Import').get().target_name, '2 tareas')
+
+    def test_chunks_keep_order_and_positions(self):
+        rows = ''.join(f'{{"title": "t{i}", "tags": ["a"]}}\n' for i in range(7))
+        report = TaskImporter(self.user, batch_size=3).run(parse_ndjson(iter(rows.splitlines())))
+        self.assertEqual(report, {'created': 7, 'failed': 0, 'errors': []})
+        self.assertEqual(list(Task.objects.order_by('position').values_list('title', flat=True)),
+                         [f't{i}' for i in range(7)])
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 1)
+
+    def test_committed_chunks_are_counted_when_the_import_fails(self):
+        def rows():
+            for i in range(3):
+                yield i + 1, {'title': f't{i}'}
+            raise RuntimeError('connection lost')
+
+        with self.assertRaises(RuntimeError):
+            TaskImporter(self.user, batch_size=2).run(rows())
+        self.assertEqual(Task.objects.count(), 2)
+        self.assertEqual(DailyStat.objects.get(user=self.user).created, 2)
+
+    def test_invalid_json_is_a_row_error(self):
+        report = TaskImporter(self.user).run(parse_ndjson(iter(['{"title": "a"}', '{oops', '[1]'])))
+        self.assertEqual(report['created'], 1)
+        self.assertEqual([error['row'] for error in report['errors']], [2, 3])
+
+
+class ImportEncodingTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ana', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_rows_before_bad_bytes_are_kept(self):
+        lines = [b'{"title": "a"}\n', b'{"title": "b"}\n', b'{"title": "c"}\n', b'{"title": "\xff"}\n']
+        report = TaskImporter(self.user, batch_size=2).run(parse_ndjson(decode_lines(iter(lines))))
+        self.assertEqual(report['created'], 3)
+        self.assertEqual([error['row'] for error in report['errors']], [4])
+        self.assertEqual(Task.objects.filter(user=self.user).count(), 3)
+
+    def test_view_reports_partial_import(self):
+        body = b'{"title": "a"}\n{"title": "\xe1rbol"}\n'
+        response = self.client.post('/api/import/', body, content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(response.data['failed'], 1)
+
+    def test_view_rejects_file_that_is_not_utf8(self):
+        response = self.client.post('/api/import/', b'{"title": "\xe1rbol"}\n', content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['created'], 0)
@@ -0,0 +1,112 @@
+import io
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ..jobs import JOB_HANDLERS, delete_finished_jobs, enqueue, forget_heartbeat, run_job, workers_alive
+from ..management.commands.run_workers import Command
+from ..models import Job, Subtask, Task, Template, TemplateItem, WorkerHeartbeat
+
+
+class JobEndpointTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ana', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.template = Template.objects.create(user=self.user, title='Informe')
+        TemplateItem.objects.create(template=self.template, content='Borrador')
+
+    def worker_seen(self, ago=timedelta()):
+        WorkerHeartbeat.objects.create(name='host:1', seen_at=timezone.now() - ago)
+
+    def test_statistics_are_served_in_the_request(self):
+        self.worker_seen()
+        response = self.client.get('/api/statistics/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['pending_count'], 0)
+        self.assertFalse(Job.objects.exists())
+
+    def test_heavy_writes_are_jobs_while_a_worker_is_alive(self):
+        self.worker_seen()
+        response = self.client.post(f'/api/templates/{self.template.pk}/use/')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(Job.objects.get(pk=response.data['job_id']).kind, 'use_template')
+
+    def test_without_a_live_worker_heavy_writes_run_in_the_request(self):
+        self.worker_seen(ago=timedelta(minutes=5))
+        response = self.client.post(f'/api/templates/{self.template.pk}/use/')
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(Job.objects.exists())
+
+    def test_async_1_without_a_worker_fails_fast(self):
+        response = self.client.get('/api/statistics/?async=1')
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(Job.objects.exists())
+
+    def test_async_0_runs_in_the_request(self):
+        self.worker_seen()
+        response = self.client.post(f'/api/templates/{self.template.pk}/use/?async=0')
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Task.objects.filter(pk=response.data['task_id']).exists())
+
+    @override_settings(TODOS_ASYNC_JOBS=False)
+    def test_async_1_overrides_the_setting(self):
+        self.worker_seen()
+        self.assertEqual(self.client.post(f'/api/templates/{self.template.pk}/use/').status_code, 201)
+        self.assertEqual(self.client.get('/api/statistics/?async=1').status_code, 202)
+
+    def test_use_template_retry_returns_the_first_task(self):
+        job = enqueue(self.user, 'use_template', {'template_id': self.template.pk})
+        first = JOB_HANDLERS['use_template'](job)
+        job.refresh_from_db()
+        self.assertEqual(job.result, first)
+
+        self.assertEqual(JOB_HANDLERS['use_template'](job), first)
+        self.assertEqual(Task.objects.filter(user=self.user).count(), 1)
+
+    def test_use_template_failure_leaves_no_task(self):
+        job = enqueue(self.user, 'use_template', {'template_id': self.template.pk})
+        Job.objects.filter(pk=job.pk).update(status='running', attempts=1)
+        with mock.patch.object(Subtask.objects, 'bulk_create', side_effect=RuntimeError('disk full')), \
+                self.assertLogs('todos.jobs', 'ERROR'):
+            self.assertFalse(run_job(job.pk))
+        self.assertFalse(Task.objects.exists())
+
+        self.assertTrue(run_job(job.pk))
+        self.assertEqual(Task.objects.get().subtasks.count(), 1)
+
+
+class JobHousekeepingTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ana', password='secret')
+
+    def job(self, status, finished_days_ago):
+        job = enqueue(self.user, 'statistics')
+        Job.objects.filter(pk=job.pk).update(status=status,
+                                             finished_at=timezone.now() - timedelta(days=finished_days_ago))
+        return job
+
+    def test_only_old_finished_jobs_are_deleted(self):
+        old = [self.job('succeeded', 8), self.job('failed', 8)]
+        kept = [self.job('succeeded', 1), self.job('running', 8), enqueue(self.user, 'statistics')]
+        self.assertEqual(delete_finished_jobs(timedelta(days=7)), len(old))
+        self.assertEqual(set(Job.objects.values_list('pk', flat=True)), {job.pk for job in kept})
+
+    def test_housekeeping_checks_in_requeues_and_cleans_up(self):
+        self.job('succeeded', 30)
+        stale = enqueue(self.user, 'statistics')
+        Job.objects.filter(pk=stale.pk).update(status='running', started_at=timezone.now() - timedelta(hours=1))
+        command = Command(stdout=io.StringIO())
+        command.worker_name = 'host:1'
+
+        self.assertFalse(workers_alive())
+        command.housekeeping({'stale_after': 10})
+        self.assertTrue(workers_alive())
+        self.assertEqual(list(Job.objects.values_list('pk', 'status')), [(stale.pk, 'pending')])
+
+        forget_heartbeat('host:1')
+        self.assertFalse(workers_alive())
@@ -0,0 +1,64 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from ..models import Project, Tag, Task
+
+
+class NamePrefixTests(TestCase):
+    def setUp(self):
+        # Results are cached per user; versions start over with every test's database
+        cache.clear()
+        self.user = User.objects.create_user('ana', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def names(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.data)
+        return [item['name'] for item in response.data]
+
+    def test_prefix_is_case_insensitive(self):
+        for name in ('Work', 'workout', 'home'):
+            Tag.objects.create(user=self.user, name=name)
+        self.assertEqual(self.names('/api/tags/?prefix=WORK'), ['Work', 'workout'])
+
+    def test_prefix_folds_non_ascii_letters(self):
+        for name in ('Árbol', 'Ñandú', 'Éxito'):
+            Tag.objects.create(user=self.user, name=name)
+        Project.objects.create(user=self.user, name='Ópera')
+        self.assertEqual(self.names('/api/tags/?prefix=á'), ['Árbol'])
+        self.assertEqual(self.names('/api/tags/?prefix=ñand'), ['Ñandú'])
+        self.assertEqual(self.names('/api/tags/?prefix=ÉXITO'), ['Éxito'])
+        self.assertEqual(self.names('/api/projects/?prefix=ó'), ['Ópera'])
+
+    def test_rename_updates_lookup(self):
+        tag = Tag.objects.create(user=self.user, name='casa')
+        tag.name = 'Éxodo'
+        tag.save(update_fields=['name'])
+        self.assertEqual(self.names('/api/tags/?prefix=éx'), ['Éxodo'])
+        self.assertEqual(self.names('/api/tags/?prefix=ca'), [])
+
+    def test_exact_match_first_then_the_most_used(self):
+        work, workout, workshop = (Tag.objects.create(user=self.user, name=name)
+                                   for name in ('work', 'workout', 'workshop'))
+        for i in range(2):
+            Task.objects.create(user=self.user, title=f't{i}').tags.add(workshop)
+        Task.objects.create(user=self.user, title='t').tags.add(workout)
+        self.assertEqual(self.names('/api/tags/?prefix=work'), ['work', 'workshop', 'workout'])
+        self.assertEqual(self.names('/api/tags/?prefix=work&limit=2'), ['work', 'workshop'])
+
+    def test_only_the_users_rows(self):
+        Tag.objects.create(user=User.objects.create_user('luis', password='secret'), name='work')
+        self.assertEqual(self.names('/api/tags/?prefix=w'), [])
+
+    def test_new_rows_show_up_at_once(self):
+        self.assertEqual(self.names('/api/projects/?prefix=c'), [])
+        self.client.post('/api/projects/', {'name': 'Casa'}, format='json')
+        self.assertEqual(self.names('/api/projects/?prefix=c'), ['Casa'])
+
+    def test_limit_is_validated(self):
+        for limit in ('0', '51', 'x'):
+            with self.subTest(limit=limit):
+                self.assertEqual(self.client.get(f'/api/tags/?prefix=a&limit={limit}').status_code, 400)
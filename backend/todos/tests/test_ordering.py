@@ -0,0 +1,106 @@
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+
+from ..jobs import enqueue, run_job
+from ..models import Task
+from ..ordering import key_between, move
+
+
+class KeyBetweenTests(SimpleTestCase):
+    def test_key_is_strictly_between(self):
+        for low, high in ((None, None), (None, 'i'), ('i', None), ('a', 'b'), ('a', 'a1'), ('zz', None), ('1', '2')):
+            with self.subTest(low=low, high=high):
+                key = key_between(low, high)
+                self.assertGreater(key, low or '')
+                if high is not None:
+                    self.assertLess(key, high)
+                self.assertFalse(key.endswith('0'))
+
+    def test_repeated_inserts_keep_order(self):
+        low, high = 'a', 'b'
+        for _ in range(100):
+            key = key_between(low, high)
+            self.assertTrue(low < key < high)
+            high = key
+
+    def test_low_must_be_below_high(self):
+        with self.assertRaises(ValueError):
+            key_between('b', 'a')
+        with self.assertRaises(ValueError):
+            key_between('a', 'a')
+
+
+class MoveTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ana', password='secret')
+        self.first, self.second, self.third = (Task.objects.create(user=self.user, title=title) for title in 'abc')
+        self.siblings = Task.objects.filter(user=self.user)
+
+    def titles(self):
+        return list(self.siblings.order_by('position').values_list('title', flat=True))
+
+    def test_move_after_and_before(self):
+        move(self.third, self.siblings, after_id=self.first.pk)
+        self.assertEqual(self.titles(), ['a', 'c', 'b'])
+        move(self.first, self.siblings, before_id=None, after_id=self.second.pk)
+        self.assertEqual(self.titles(), ['c', 'b', 'a'])
+        move(self.first, self.siblings, before_id=self.third.pk)
+        self.assertEqual(self.titles(), ['a', 'c', 'b'])
+
+    def test_only_the_moved_row_is_written(self):
+        before = dict(self.siblings.values_list('pk', 'position'))
+        key = move(self.first, self.siblings, after_id=self.second.pk, before_id=self.third.pk)
+        after = dict(self.siblings.values_list('pk', 'position'))
+        self.assertEqual({pk for pk in after if after[pk] != before[pk]}, {self.first.pk})
+        self.assertTrue(before[self.second.pk] < key < before[self.third.pk])
+
+    def test_neighbours_are_validated(self):
+        with self.assertRaises(ValueError):
+            move(self.first, self.siblings)
+        with self.assertRaises(ValueError):
+            move(self.first, self.siblings, after_id=self.third.pk, before_id=self.second.pk)
+        with self.assertRaises(ValueError):
+            move(self.first, self.siblings, after_id=0)
+
+    def test_crowded_list_is_rebalanced(self):
+        # Keep moving a row between the same two neighbours until keys hit their length limit
+        for _ in range(200):
+            for task in (self.first, self.third):
+                move(task, self.siblings, after_id=self.second.pk)
+        self.assertEqual(len(set(self.siblings.values_list('position', flat=True))), 3)
+        self.assertLessEqual(max(len(key) for key in self.siblings.values_list('position', flat=True)), 64)
+
+
+class MoveEndpointTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ana', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.first, self.trashed, self.archived, self.last = (
+            Task.objects.create(user=self.user, title=title) for title in 'abcd'
+        )
+        Task.objects.filter(pk=self.trashed.pk).update(is_deleted=True)
+        Task.objects.filter(pk=self.archived.pk).update(is_archived=True, completed=True)
+
+    def move(self, task, **data):
+        return self.client.post(f'/api/tasks/{task.pk}/move/', data, format='json')
+
+    def test_hidden_tasks_are_not_neighbours(self):
+        for hidden in (self.trashed, self.archived):
+            with self.subTest(hidden=hidden.title):
+                self.assertEqual(self.move(self.last, after_id=hidden.pk).status_code, 400)
+
+        # `first` is the only visible task before `last`, so moving it there
+        # doesn't squeeze it in between the hidden rows and `last`
+        response = self.move(self.first, before_id=self.last.pk)
+        self.assertEqual(response.status_code, 200)
+        self.assertLess(response.data['position'], self.trashed.position)
+
+    def test_rebalance_leaves_hidden_tasks_alone(self):
+        job = enqueue(self.user, 'rebalance_positions', {})
+        self.assertTrue(run_job(job.pk))
+        job.refresh_from_db()
+        self.assertEqual(job.result, {'rebalanced': 2})
+        for hidden in (self.trashed, self.archived):
+            self.assertEqual(Task.objects.get(pk=hidden.pk).position, hidden.position)
@@ -0,0 +1,99 @@
+from datetime import date, datetime, time, timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ..models import Task
+from ..recurrence import expand_window
+
+
+class ExpandWindowTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ana', password='secret')
+        self.start = timezone.make_aware(datetime.combine(date(2024, 3, 4), time(9)))
+        self.series = Task.objects.create(user=self.user, title='daily', due_date=self.start, recurrence='FREQ=DAILY')
+
+    def days(self, slots):
+        return [timezone.localdate(slot).day for slot in slots]
+
+    def test_occurrences_after_the_series_due_date(self):
+        expanded = expand_window([self.series], self.start, self.start + timedelta(days=5))
+        # The series itself stands for the first slot
+        self.assertEqual(self.days(expanded[self.series.pk]), [5, 6, 7, 8])
+
+    def test_skipped_days_and_stored_occurrences_are_left_out(self):
+        self.series.recurrence_exceptions = ['2024-03-06']
+        self.series.save()
+        stored = self.start + timedelta(days=3)
+        Task.objects.create(user=self.user, title='daily', due_date=stored, recurrence_parent=self.series,
+                            occurrence_date=stored)
+        expanded = expand_window([self.series], self.start, self.start + timedelta(days=5))
+        self.assertEqual(self.days(expanded[self.series.pk]), [5, 8])
+
+    def test_count_and_weekly_rules(self):
+        weekly = Task.objects.create(user=self.user, title='weekly', due_date=self.start,
+                                     recurrence='FREQ=WEEKLY;BYDAY=MO,TH;COUNT=3')
+        expanded = expand_window([self.series, weekly], self.start, self.start + timedelta(days=30))
+        self.assertEqual(self.days(expanded[weekly.pk]), [7, 11])
+        self.assertEqual(len(expanded[self.series.pk]), 29)
+
+    def test_occurrences_name_their_series_the_same_in_every_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        params = {'start': '2024-03-05', 'end': '2024-03-05'}
+        listed = client.get('/api/tasks/', params).data
+        calendar = client.get('/api/calendar/', params).data['tasks']
+        for tasks in (listed, calendar):
+            self.assertEqual([(task['id'], task['recurrence_parent']) for task in tasks], [(None, self.series.pk)])
+
+
+class OccurrenceActionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ana', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.start = timezone.make_aware(datetime.combine(date(2024, 3, 4), time(9)))
+        self.series = Task.objects.create(user=self.user, title='daily', due_date=self.start, recurrence='FREQ=DAILY')
+        self.series.subtasks.create(title='s')
+
+    def post(self, action, data, task=None):
+        return self.client.post(f'/api/tasks/{(task or self.series).pk}/{action}/', data, format='json')
+
+    def test_materialize_stores_one_row_per_occurrence(self):
+        slot = (self.start + timedelta(days=2)).isoformat()
+        response = self.post('materialize', {'date': slot})
+        self.assertEqual(response.status_code, 201)
+        occurrence = Task.objects.get(pk=response.data['id'])
+        self.assertEqual(occurrence.recurrence_parent, self.series)
+        self.assertEqual(occurrence.due_date, self.start + timedelta(days=2))
+        self.assertEqual(list(occurrence.subtasks.values_list('title', flat=True)), ['s'])
+
+        again = self.post('materialize', {'date': slot})
+        self.assertEqual((again.status_code, again.data['id']), (200, occurrence.pk))
+
+    def test_materialize_needs_an_upcoming_slot(self):
+        for slot in (self.start, self.start + timedelta(days=2, hours=1), 'tomorrow'):
+            with self.subTest(slot=slot):
+                self.assertEqual(self.post('materialize', {'date': str(slot)}).status_code, 400)
+        single = Task.objects.create(user=self.user, title='once', due_date=self.start)
+        self.assertEqual(self.post('materialize', {'date': self.start.isoformat()}, single).status_code, 400)
+
+    def test_skipping_the_current_occurrence_moves_the_task_on(self):
+        response = self.post('skip', {'date': '2024-03-04'})
+        self.assertEqual(response.status_code, 200)
+        self.series.refresh_from_db()
+        self.assertEqual(self.series.due_date, self.start + timedelta(days=1))
+        self.assertEqual(self.series.recurrence_exceptions, ['2024-03-04'])
+
+    def test_skipping_a_later_day_leaves_it_out_of_the_window(self):
+        self.assertEqual(self.post('skip', {'date': '2024-03-06'}).status_code, 200)
+        self.series.refresh_from_db()
+        expanded = expand_window([self.series], self.start, self.start + timedelta(days=4))
+        self.assertEqual([timezone.localdate(slot).day for slot in expanded[self.series.pk]], [5, 7])
+
+    def test_last_occurrence_cannot_be_skipped(self):
+        last = Task.objects.create(user=self.user, title='once', due_date=self.start, recurrence='FREQ=DAILY;COUNT=1')
+        self.assertEqual(self.post('skip', {'date': '2024-03-04'}, last).status_code, 400)
+        self.assertEqual(self.post('skip', {'date': 'x'}).status_code, 400)
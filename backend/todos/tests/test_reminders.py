@@ -0,0 +1,98 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db.models import F, QuerySet
+from django.test import TestCase
+from django.utils import timezone
+
+from ..models import Task
+from ..reminders import ReminderScheduler
+
+
+class ReminderSchedulerTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ana', password='secret')
+        self.now = timezone.now()
+        self.sent = []
+        self.scheduler = ReminderScheduler(mock.Mock(send=self.sent.extend), window=timedelta(minutes=10))
+
+    def task(self, title, remind_in, **fields):
+        # Reminder 60 minutes before the due date
+        return Task.objects.create(user=self.user, title=title, reminder_offset=60,
+                                   due_date=self.now + remind_in + timedelta(minutes=60), **fields)
+
+    def test_reminder_time_follows_the_task(self):
+        task = self.task('a', timedelta(minutes=5))
+        self.assertEqual(task.next_reminder_at, task.due_date - timedelta(minutes=60))
+        task.completed = True
+        task.save()
+        self.assertIsNone(task.next_reminder_at)
+
+    def test_due_reminders_are_sent_once(self):
+        due = self.task('due', -timedelta(minutes=1))
+        self.task('later', timedelta(minutes=5))
+        self.task('closed', -timedelta(minutes=1), completed=True)
+
+        self.assertEqual(self.scheduler.run_pending(self.now), 1)
+        self.assertEqual([(reminder['task_id'], reminder['title']) for reminder in self.sent], [(due.pk, 'due')])
+        self.assertEqual(self.scheduler.run_pending(self.now), 0)
+        due.refresh_from_db()
+        self.assertIsNone(due.next_reminder_at)
+        # Saving it again doesn't re-arm the reminder already sent
+        due.save()
+        self.assertIsNone(due.next_reminder_at)
+
+    def test_loaded_reminders_fire_when_their_time_comes(self):
+        self.task('later', timedelta(minutes=5))
+        self.scheduler.run_pending(self.now)
+        self.assertAlmostEqual(self.scheduler.seconds_until_next(self.now), 60, delta=1)
+        self.assertEqual(self.scheduler.run_pending(self.now + timedelta(minutes=6)), 1)
+
+    def test_failed_delivery_is_retried(self):
+        task = self.task('due', -timedelta(minutes=1))
+        self.scheduler.notifier.send = mock.Mock(side_effect=OSError('smtp down'))
+        with self.assertLogs('todos.reminders', 'ERROR'):
+            self.assertEqual(self.scheduler.run_pending(self.now), 0)
+        task.refresh_from_db()
+        self.assertIsNotNone(task.next_reminder_at)
+
+        self.scheduler.notifier.send = self.sent.extend
+        self.assertEqual(self.scheduler.run_pending(self.now + timedelta(minutes=2)), 1)
+
+
+class ReminderTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ana', password='secret')
+        due = timezone.now() + timedelta(hours=1)
+        # Reminders two hours before: already due
+        self.first, self.second = (Task.objects.create(user=self.user, title=title, due_date=due, reminder_offset=120)
+                                   for title in ('a', 'b'))
+
+    def test_deliver_sends_only_the_rows_it_claimed(self):
+        sent = []
+        scheduler = ReminderScheduler(mock.Mock(send=sent.extend))
+        update = QuerySet.update
+        raced = []
+
+        def racing_update(queryset, **kwargs):
+            # Another scheduler claims the second task between our SELECT and UPDATE
+            if not raced:
+                raced.append(True)
+                update(Task.objects.filter(pk=self.second.pk), last_reminder_at=F('next_reminder_at'),
+                       next_reminder_at=None)
+            return update(queryset, **kwargs)
+
+        with mock.patch.object(QuerySet, 'update', racing_update):
+            count = scheduler.deliver('default', [self.first.pk, self.second.pk], timezone.now())
+        self.assertEqual(count, 1)
+        self.assertEqual([reminder['task_id'] for reminder in sent], [self.first.pk])
+
+    def test_refresh_urgency_drops_reminders_of_closed_tasks(self):
+        # update() skips the pre_save signal that clears next_reminder_at
+        Task.objects.filter(pk=self.first.pk).update(completed=True)
+        call_command('refresh_urgency', '--all', stdout=StringIO())
+        self.assertEqual(list(Task.objects.order_by('pk').values_list('next_reminder_at', flat=True)),
+                         [None, self.second.next_reminder_at])
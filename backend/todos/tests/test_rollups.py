@@ -0,0 +1,102 @@
+from datetime import date, timedelta
+
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ..models import DailyStat, Task
+from ..rollups import MAX_POINTS, choose_bucket, history
+
+
+class RollupTests(TestCase):
+    def test_choose_bucket(self):
+        start = date(2024, 1, 1)
+        self.assertEqual(choose_bucket(start, start + timedelta(days=MAX_POINTS - 1)), 'day')
+        self.assertEqual(choose_bucket(start, start + timedelta(days=MAX_POINTS)), 'week')
+        self.assertEqual(choose_bucket(start, date(2030, 12, 31)), 'month')
+        self.assertEqual(choose_bucket(start, date(2100, 1, 1)), 'year')
+        self.assertIsNone(choose_bucket(start, date(2200, 1, 1)))
+        self.assertEqual(choose_bucket(start, start + timedelta(days=5), 'month'), 'month')
+
+    def test_history(self):
+        user = User.objects.create_user('ana', password='secret')
+        other = User.objects.create_user('bea', password='secret')
+        for day, created, completed in ((date(2024, 1, 1), 2, 0), (date(2024, 1, 3), 1, 1), (date(2024, 1, 9), 0, 4)):
+            DailyStat.objects.create(user=user, day=day, created=created, completed=completed)
+        DailyStat.objects.create(user=other, day=date(2024, 1, 2), created=9, completed=9)
+
+        daily = history(user, date(2024, 1, 1), date(2024, 1, 4), 'day')
+        self.assertEqual(daily['labels'], ['2024-01-01', '2024-01-02', '2024-01-03', '2024-01-04'])
+        self.assertEqual(daily['created'], [2, 0, 1, 0])
+        self.assertEqual(daily['completed'], [0, 0, 1, 0])
+
+        weekly = history(user, date(2024, 1, 1), date(2024, 1, 14), 'week')
+        self.assertEqual(weekly['labels'], ['2024-01-01', '2024-01-08'])
+        self.assertEqual(weekly['created'], [3, 0])
+        self.assertEqual(weekly['completed'], [1, 4])
+
+
+class DailyStatTrackingTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ana', password='secret')
+
+    def stats(self):
+        return list(DailyStat.objects.filter(user=self.user).values_list('created', 'completed'))
+
+    def test_tasks_are_counted_as_they_are_created_and_completed(self):
+        task = Task.objects.create(user=self.user, title='a')
+        Task.objects.create(user=self.user, title='b')
+        task.completed = True
+        task.save()
+        # Saving it again completed is not another completion
+        task.save()
+        self.assertEqual(self.stats(), [(2, 1)])
+
+    def test_rebuild_matches_the_live_counters(self):
+        task = Task.objects.create(user=self.user, title='a')
+        task.completed = True
+        task.save()
+        live = self.stats()
+        DailyStat.objects.all().delete()
+        call_command('rebuild_daily_stats', 'ana', stdout=StringIO())
+        self.assertEqual(self.stats(), live)
+        with self.assertRaises(CommandError):
+            call_command('rebuild_daily_stats', 'nadie', stdout=StringIO())
+
+
+class StatisticsHistoryViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ana', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_history_of_the_last_days(self):
+        today = timezone.localdate()
+        DailyStat.objects.create(user=self.user, day=today, created=3, completed=2)
+        response = self.client.get('/api/statistics/history/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((len(response.data['labels']), response.data['bucket']), (30, 'day'))
+        self.assertEqual((response.data['created'][-1], response.data['completed'][-1]), (3, 2))
+
+        response = self.client.get(f'/api/statistics/history/?start={today - timedelta(days=400)}&end={today}')
+        self.assertEqual(response.data['bucket'], 'week')
+        self.assertEqual(sum(response.data['created']), 3)
+
+    def test_invalid_ranges_are_rejected(self):
+        for query in ('start=2024-02-01&end=2024-01-01', 'start=x', 'bucket=fortnight'):
+            with self.subTest(query=query):
+                self.assertEqual(self.client.get(f'/api/statistics/history/?{query}').status_code, 400)
+
+    def test_extreme_dates_are_clamped(self):
+        response = self.client.get('/api/statistics/history/?start=9990-01-01&end=9999-12-31')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['end'], response.data['bucket']), ('9998-12-31', 'year'))
+        response = self.client.get('/api/statistics/history/?end=0001-01-05')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['labels'][0], '0001-01-01')
+        response = self.client.get('/api/statistics/history/?start=9999-06-01&end=9999-12-31&bucket=year')
+        self.assertEqual((response.status_code, response.data['labels']), (200, ['9998-01-01']))
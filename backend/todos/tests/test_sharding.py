@@ -0,0 +1,77 @@
+"""
+Sharding needs two databases: run this module with TODOS_SHARD_COUNT=2.
+The rest of the suite reads and writes `default` directly and runs
+without sharding.
+"""
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import OperationalError, connections
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+from ..cache import get_or_compute
+from ..models import ActivityLog, Comment, DailyStat, Project, Subtask, Tag, Task
+from ..sharding import move_user_data, replicate_user, shard_for_user, use_shard_for
+
+
+@skipUnless(len(settings.TODOS_SHARDS) >= 2, 'needs TODOS_SHARD_COUNT >= 2')
+class MoveUserDataTests(TransactionTestCase):
+    databases = '__all__'
+
+    def test_move_user_data(self):
+        user = User.objects.create_user('ana', password='secret')
+        friend = User.objects.create_user('bea', password='secret')
+        source = shard_for_user(user.pk)
+        target = next(alias for alias in settings.TODOS_SHARDS if alias != source)
+        with use_shard_for(user):
+            project = Project.objects.create(user=user, name='Casa')
+            tag = Tag.objects.create(user=user, name='work')
+            series = Task.objects.create(user=user, title='daily', project=project, due_date=timezone.now(),
+                                         recurrence='FREQ=DAILY')
+            series.tags.add(tag)
+            Subtask.objects.create(task=series, title='s')
+            Task.objects.create(user=user, title='daily', recurrence_parent=series, occurrence_date=series.due_date,
+                                due_date=series.due_date)
+        # Comment authors from other shards are replicated like the owner
+        replicate_user(friend, source)
+        Comment.objects.using(source).create(task=series, user=friend, content='hola')
+        replicate_user(user, target)
+        get_or_compute(user.pk, 'counts', (), lambda: 'before')
+
+        moved = move_user_data(user, source, target)
+
+        self.assertEqual(moved, 2)
+        for model in (Task, Project, Tag, Subtask, ActivityLog, DailyStat):
+            self.assertFalse(model.objects.using(source).filter(**{
+                'task__user' if model is Subtask else 'user': user}).exists(), model)
+        self.assertFalse(Comment.objects.using(source).exists())
+        tasks = Task.objects.using(target).filter(user=user)
+        new_series = tasks.get(recurrence_parent=None)
+        self.assertEqual(new_series.project.name, 'Casa')
+        self.assertEqual(list(new_series.tags.values_list('name', flat=True)), ['work'])
+        self.assertEqual(new_series.subtasks.get().title, 's')
+        self.assertEqual(new_series.comments.get().user_id, friend.pk)
+        self.assertEqual(tasks.get(recurrence_parent__isnull=False).recurrence_parent_id, new_series.pk)
+        self.assertTrue(ActivityLog.objects.using(target).filter(user=user, target_id=new_series.pk).exists())
+        self.assertEqual(DailyStat.objects.using(target).get(user=user).created, 1)
+        self.assertFalse(ActivityLog.objects.using(target).filter(action='DELETED').exists())
+        # Cached payloads with the old ids are dropped
+        self.assertEqual(get_or_compute(user.pk, 'counts', (), lambda: 'after'), 'after')
+
+    def test_failed_target_commit_keeps_the_source_rows(self):
+        user = User.objects.create_user('ana', password='secret')
+        source = shard_for_user(user.pk)
+        target = next(alias for alias in settings.TODOS_SHARDS if alias != source)
+        with use_shard_for(user):
+            task = Task.objects.create(user=user, title='a')
+            Subtask.objects.create(task=task, title='s')
+        replicate_user(user, target)
+
+        with mock.patch.object(connections[target], 'commit', side_effect=OperationalError('database is locked')), \
+                self.assertRaises(OperationalError):
+            move_user_data(user, source, target)
+
+        self.assertEqual(Task.objects.using(source).get(user=user).subtasks.get().title, 's')
+        self.assertFalse(Task.objects.using(target).filter(user=user).exists())
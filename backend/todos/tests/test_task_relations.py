@@ -0,0 +1,68 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient, APIRequestFactory
+
+from ..models import Project, Tag, Task
+from ..serializers import TaskSerializer
+
+
+class TaskRelationFieldTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ana', password='secret')
+        self.tags = [Tag.objects.create(user=self.user, name=f'tag{i}') for i in range(5)]
+        self.project = Project.objects.create(user=self.user, name='Casa')
+        other = User.objects.create_user('luis', password='secret')
+        self.foreign_tag = Tag.objects.create(user=other, name='ajena')
+        self.foreign_project = Project.objects.create(user=other, name='Ajeno')
+        self.request = APIRequestFactory().post('/api/tasks/')
+        self.request.user = self.user
+
+    def serializer(self, data, request=None):
+        return TaskSerializer(data={'title': 't', **data}, context={'request': request or self.request})
+
+    def test_tag_ids_are_resolved_in_one_query(self):
+        serializer = self.serializer({'tag_ids': [tag.pk for tag in self.tags], 'project_id': self.project.pk})
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(len([q for q in queries if 'todos_tag' in q['sql']]), 1)
+        self.assertEqual(serializer.validated_data['tags'], self.tags)
+        self.assertEqual(serializer.validated_data['project'], self.project)
+
+    def test_ids_resolved_earlier_in_the_request_are_not_queried_again(self):
+        self.assertTrue(self.serializer({'tag_ids': [self.tags[0].pk]}).is_valid())
+        serializer = self.serializer({'tag_ids': [self.tags[0].pk, str(self.tags[1].pk)]})
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+        tag_queries = [q['sql'] for q in queries if 'todos_tag' in q['sql']]
+        self.assertEqual(len(tag_queries), 1)
+        # Only the new id is looked up
+        self.assertIn(f'IN ({self.tags[1].pk})', tag_queries[0])
+
+    def test_other_users_objects_are_rejected(self):
+        for data in ({'tag_ids': [self.tags[0].pk, self.foreign_tag.pk]}, {'project_id': self.foreign_project.pk}):
+            with self.subTest(data=data):
+                serializer = self.serializer(data)
+                self.assertFalse(serializer.is_valid())
+                self.assertEqual(serializer.errors[next(iter(data))][0].code, 'does_not_exist')
+
+    def test_malformed_ids_are_rejected(self):
+        for tag_ids in (['x'], [True], 'not a list', [None]):
+            with self.subTest(tag_ids=tag_ids):
+                serializer = self.serializer({'tag_ids': tag_ids})
+                self.assertFalse(serializer.is_valid())
+                self.assertIn('tag_ids', serializer.errors)
+
+    def test_create_and_update_through_the_api(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.post('/api/tasks/', {'title': 't', 'tag_ids': [self.tags[0].pk],
+                                               'project_id': self.project.pk}, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        task = Task.objects.get(pk=response.data['id'])
+        self.assertEqual((list(task.tags.all()), task.project), ([self.tags[0]], self.project))
+
+        response = client.patch(f'/api/tasks/{task.pk}/', {'tag_ids': [self.foreign_tag.pk]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(task.tags.all()), [self.tags[0]])
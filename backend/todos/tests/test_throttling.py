@@ -0,0 +1,69 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.settings import api_settings
+from rest_framework.test import APIClient
+
+from ..models import ThrottleBucket
+from ..throttling import check_throttle_store, consume, parse_rate
+
+
+class ConsumeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate('100/minute'), (100, 60.0))
+        self.assertEqual(parse_rate('5/s'), (5, 1.0))
+        for rate in ('abc', '0/minute', '10/fortnight', '10'):
+            with self.subTest(rate=rate), self.assertRaises(ValueError):
+                parse_rate(rate)
+
+    def assertBucket(self):
+        # A full bucket of 5, then one token every 12 seconds
+        results = [consume('k', '5/minute', now=1000.0) for _ in range(6)]
+        self.assertEqual(results, [None] * 5 + [12.0])
+        self.assertAlmostEqual(consume('k', '5/minute', now=1006.0), 6.0)
+        self.assertIsNone(consume('k', '5/minute', now=1012.0))
+        self.assertIsNotNone(consume('k', '5/minute', now=1012.0))
+        # Buckets are independent
+        self.assertIsNone(consume('other', '5/minute', now=1012.0))
+
+    @override_settings(TODOS_THROTTLE_STORE='cache')
+    def test_cache_store(self):
+        self.assertBucket()
+        self.assertFalse(ThrottleBucket.objects.exists())
+
+    def test_database_store(self):
+        self.assertBucket()
+        self.assertEqual(set(ThrottleBucket.objects.values_list('key', flat=True)), {'k', 'other'})
+
+    def test_per_process_cache_store_is_flagged(self):
+        self.assertEqual(check_throttle_store(None), [])
+        with override_settings(TODOS_THROTTLE_STORE='cache'):
+            self.assertEqual([warning.id for warning in check_throttle_store(None)], ['todos.W001'])
+        with override_settings(TODOS_THROTTLE_STORE='cache', CACHES={'default': {
+                'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://localhost'}}):
+            self.assertEqual(check_throttle_store(None), [])
+
+
+class BatchThrottleTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ana', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def batch(self, *paths):
+        response = self.client.post('/api/batch/', {'requests': [{'path': path} for path in paths]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        return [item['status'] for item in response.data['responses']]
+
+    def test_sub_requests_are_charged_in_their_own_scope(self):
+        rates = {**api_settings.DEFAULT_THROTTLE_RATES, 'statistics': '2/minute'}
+        with mock.patch.object(api_settings, 'DEFAULT_THROTTLE_RATES', rates):
+            self.assertEqual(self.batch('statistics/', 'statistics/', 'statistics/', 'tags/'), [200, 200, 429, 200])
+            # The budget is the one standalone calls use
+            self.assertEqual(self.client.get('/api/statistics/').status_code, 429)
+        self.assertTrue(ThrottleBucket.objects.filter(key=f'statistics:{self.user.pk}').exists())
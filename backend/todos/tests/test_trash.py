@@ -0,0 +1,35 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from ..models import ActivityLog, Comment, Subtask, Tag, Task
+
+
+class PurgeTrashTests(TestCase):
+    def test_purges_expired_tasks_quietly(self):
+        user = User.objects.create_user('ana', password='secret')
+        tag = Tag.objects.create(user=user, name='work')
+        series = Task.objects.create(user=user, title='old', due_date=timezone.now(), recurrence='FREQ=DAILY')
+        occurrence = Task.objects.create(user=user, title='old', recurrence_parent=series,
+                                         occurrence_date=series.due_date, due_date=series.due_date)
+        recent = Task.objects.create(user=user, title='recent')
+        for task in (series, recent):
+            task.tags.add(tag)
+            Subtask.objects.create(task=task, title='s')
+            Comment.objects.create(task=task, user=user, content='c')
+            task.delete()
+        Task.objects.filter(pk=series.pk).update(deleted_at=timezone.now() - timedelta(days=40))
+        logged = ActivityLog.objects.count()
+
+        call_command('purge_trash', '--pause', '0', stdout=StringIO())
+
+        self.assertEqual(set(Task.objects.values_list('pk', flat=True)), {occurrence.pk, recent.pk})
+        self.assertIsNone(Task.objects.get(pk=occurrence.pk).recurrence_parent_id)
+        self.assertEqual(Subtask.objects.count(), 1)
+        self.assertEqual(Comment.objects.count(), 1)
+        self.assertEqual(Task.tags.through.objects.count(), 1)
+        self.assertEqual(ActivityLog.objects.count(), logged)
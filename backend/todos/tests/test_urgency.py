@@ -0,0 +1,80 @@
+from datetime import datetime, time, timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ..models import Task
+from ..urgency import DUE_TODAY_SCORE, IMPORTANT_SCORE, OVERDUE_SCORE, PRIORITY_SCORES, compute_urgency
+
+
+def due_in(days):
+    return timezone.make_aware(datetime.combine(timezone.localdate() + timedelta(days=days), time(12)))
+
+
+class ComputeUrgencyTests(SimpleTestCase):
+    def score(self, **fields):
+        return compute_urgency(Task(**{'priority': 'low', **fields}))
+
+    def test_scores(self):
+        low = PRIORITY_SCORES['low']
+        self.assertEqual(self.score(), low)
+        self.assertEqual(self.score(priority='high'), PRIORITY_SCORES['high'])
+        self.assertEqual(self.score(is_important=True), low + IMPORTANT_SCORE)
+        self.assertEqual(self.score(due_date=due_in(0)), low + DUE_TODAY_SCORE)
+        self.assertEqual(self.score(due_date=due_in(-3)), low + OVERDUE_SCORE + 3)
+        self.assertEqual(self.score(due_date=due_in(-365)), self.score(due_date=due_in(-30)))
+        self.assertEqual(self.score(due_date=due_in(30)), low)
+
+    def test_nearer_due_dates_score_higher(self):
+        scores = [self.score(due_date=due_in(days)) for days in range(8)]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertEqual(len(set(scores)), len(scores))
+
+    def test_closed_tasks_score_zero(self):
+        self.assertEqual(self.score(priority='high', due_date=due_in(-1), completed=True), 0)
+        self.assertEqual(self.score(priority='high', is_deleted=True), 0)
+
+
+class UrgencyOrderingTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ana', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def titles(self, query='?ordering=urgency'):
+        response = self.client.get(f'/api/tasks/{query}')
+        self.assertEqual(response.status_code, 200)
+        return [task['title'] for task in response.data]
+
+    def test_open_tasks_most_urgent_first(self):
+        Task.objects.create(user=self.user, title='someday', priority='low')
+        Task.objects.create(user=self.user, title='overdue', priority='low', due_date=due_in(-2))
+        Task.objects.create(user=self.user, title='important', priority='medium', is_important=True)
+        Task.objects.create(user=self.user, title='next week', priority='high', due_date=due_in(6))
+        Task.objects.create(user=self.user, title='done', priority='high', due_date=due_in(-1), completed=True)
+        Task.objects.create(user=self.user, title='trashed', priority='high', is_deleted=True)
+        self.assertEqual(self.titles(), ['overdue', 'important', 'next week', 'someday'])
+        self.assertEqual(self.titles('?ordering=urgency&limit=2'), ['overdue', 'important'])
+
+    def test_equal_scores_keep_the_manual_order(self):
+        for title in 'abc':
+            Task.objects.create(user=self.user, title=title)
+        first = Task.objects.get(title='a')
+        self.client.post(f'/api/tasks/{first.pk}/move/', {'after_id': Task.objects.get(title='c').pk}, format='json')
+        self.assertEqual(self.titles(), ['b', 'c', 'a'])
+
+    def test_refresh_urgency_follows_the_calendar(self):
+        task = Task.objects.create(user=self.user, title='soon', priority='low', due_date=due_in(1))
+        tomorrow = timezone.localdate() + timedelta(days=1)
+        with mock.patch('todos.management.commands.refresh_urgency.timezone.localdate', return_value=tomorrow):
+            call_command('refresh_urgency', stdout=StringIO())
+        task.refresh_from_db()
+        self.assertEqual(task.urgency, PRIORITY_SCORES['low'] + DUE_TODAY_SCORE)
+
+    def test_unknown_ordering_is_rejected(self):
+        self.assertEqual(self.client.get('/api/tasks/?ordering=title').status_code, 400)
@@ -0,0 +1,145 @@
+import functools
+import math
+import random
+import time
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from .models import ThrottleBucket
+
+# One in this many new buckets also deletes the buckets that refilled completely
+CLEANUP_FREQUENCY = 1000
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+@functools.lru_cache(maxsize=None)
+def parse_rate(rate):
+    """'100/minute' -> (100, 60.0), same format as DRF's DEFAULT_THROTTLE_RATES."""
+    num, _, period = rate.partition('/')
+    if not num.isdigit() or int(num) < 1 or period[:1] not in PERIODS:
+        raise ValueError(f'Invalid throttle rate: {rate!r}')
+    return int(num), float(PERIODS[period[0]])
+
+
+def consume(key, rate, now=None):
+    """
+    Take one token from the bucket `key`. Returns None when allowed, or the
+    seconds to wait for the next token.
+
+    This is GCRA, the constant-time form of a token bucket: instead of
+    counting tokens the bucket stores the time it will be full again (tat).
+    Every request pushes tat forward by one interval, and is refused when
+    that would put tat more than a full bucket ahead of now.
+
+    Buckets live in the ThrottleBucket table, or in the default cache when
+    TODOS_THROTTLE_STORE is 'cache'.
+    """
+    num_requests, duration = parse_rate(rate)
+    interval = duration / num_requests
+    now = time.time() if now is None else now
+    # tat may be at most `capacity` ahead of now after this request
+    capacity = duration
+    if settings.TODOS_THROTTLE_STORE == 'database':
+        return _consume_row(key, now, interval, capacity)
+    return _consume_cached(key, now, interval, capacity)
+
+
+def _consume_cached(key, now, interval, capacity):
+    # Read-then-write: workers racing on the same key may each let one extra
+    # request through, and a per-process cache (LocMemCache) gives every
+    # worker its own budget (see check_throttle_store). Expires once the
+    # bucket is full.
+    cache_key = f'todos:throttle:{key}'
+    tat = max(cache.get(cache_key, now), now)
+    if tat > now + capacity - interval:
+        return tat - (now + capacity - interval)
+    tat += interval
+    cache.set(cache_key, tat, timeout=math.ceil(tat - now))
+    return None
+
+
+def _consume_row(key, now, interval, capacity):
+    # The check and the update are a single UPDATE, so concurrent workers
+    # can't both take the last token
+    updated = ThrottleBucket.objects.filter(key=key, tat__lte=now + capacity - interval).update(
+        tat=Greatest(F('tat'), now) + interval
+    )
+    if updated:
+        return None
+
+    try:
+        with transaction.atomic():
+            ThrottleBucket.objects.create(key=key, tat=now + interval)
+    except IntegrityError:
+        # The bucket exists, so the update above found it empty
+        tat = ThrottleBucket.objects.filter(key=key).values_list('tat', flat=True).first()
+        if tat is None:
+            return None
+        return max(0.0, tat - (now + capacity - interval))
+    if random.randrange(CLEANUP_FREQUENCY) == 0:
+        ThrottleBucket.objects.filter(tat__lt=now).delete()
+    return None
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Throttle with O(1) work per request and state shared across processes
+    (see `consume` for where it is kept). Rates come from DEFAULT_THROTTLE_RATES:
+
+    - a view's `throttle_scope`, or `throttle_scopes[action]` on viewsets,
+      picks the scope, so cheap and expensive endpoints get their own budget;
+    - otherwise authenticated requests use 'user' and anonymous ones 'anon'.
+
+    Each scope has its own bucket per user (or client IP).
+    """
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def get_scope(self, request, view):
+        action = getattr(view, 'action', None)
+        scope = getattr(view, 'throttle_scopes', {}).get(action) or getattr(view, 'throttle_scope', None)
+        if scope:
+            return scope
+        return 'user' if request.user and request.user.is_authenticated else 'anon'
+
+    def get_ident(self, request):
+        if request.user and request.user.is_authenticated:
+            return str(request.user.pk)
+        return super().get_ident(request)
+
+    def allow_request(self, request, view):
+        # Sub-requests of /api/batch/ are charged here too, each in its own
+        # scope: wrapping calls in a batch doesn't widen their budgets
+        scope = self.get_scope(request, view)
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+        if rate is None:
+            return True
+        self.wait_seconds = consume(f'{scope}:{self.get_ident(request)}', rate)
+        return self.wait_seconds is None
+
+    def wait(self):
+        return self.wait_seconds
+
+
+@checks.register(checks.Tags.caches)
+def check_throttle_store(app_configs, **kwargs):
+    """The 'cache' store only limits anything across workers with a shared cache."""
+    if settings.TODOS_THROTTLE_STORE != 'cache':
+        return []
+    backend = settings.CACHES.get('default', {}).get('BACKEND', '')
+    if backend.endswith(('.LocMemCache', '.DummyCache')):
+        return [checks.Warning(
+            "TODOS_THROTTLE_STORE = 'cache' with a per-process cache: each worker process throttles on its own.",
+            hint="Use TODOS_THROTTLE_STORE = 'database', or a shared cache (e.g. Redis or Memcached).",
+            id='todos.W001',
+        )]
+    return []
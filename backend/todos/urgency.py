@@ -0,0 +1,49 @@
+"""
+Urgency score of a task, stored in Task.urgency so "what's next" lists
+(`GET /api/tasks/?ordering=urgency`) are an index scan. Higher is more
+urgent; completed and trashed tasks score 0.
+
+The due date part depends on today's date, so scores of tasks due within
+DUE_SOON_DAYS (or overdue) drift and are refreshed by
+`manage.py refresh_urgency`.
+"""
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+
+PRIORITY_SCORES = {'high': 30, 'medium': 20, 'low': 10}
+IMPORTANT_SCORE = 25
+DUE_TODAY_SCORE = 50
+OVERDUE_SCORE = 60
+# Overdue tasks gain a point per day late, up to this many
+MAX_OVERDUE_DAYS = 30
+# Tasks due within this many days get a bonus that grows as the date nears
+DUE_SOON_DAYS = 7
+
+
+def compute_urgency(task, today=None):
+    if task.completed or task.is_deleted:
+        return 0
+    today = today or timezone.localdate()
+    score = PRIORITY_SCORES.get(task.priority, 0)
+    if task.is_important:
+        score += IMPORTANT_SCORE
+    if task.due_date:
+        days_left = (timezone.localdate(task.due_date) - today).days
+        if days_left < 0:
+            score += OVERDUE_SCORE + min(-days_left, MAX_OVERDUE_DAYS)
+        elif days_left == 0:
+            score += DUE_TODAY_SCORE
+        elif days_left <= DUE_SOON_DAYS:
+            score += 5 * (DUE_SOON_DAYS + 1 - days_left)
+    return score
+
+
+def time_sensitive(queryset, today=None):
+    """Open tasks whose score can still change just because days pass."""
+    today = today or timezone.localdate()
+    horizon = timezone.make_aware(datetime.combine(today + timedelta(days=DUE_SOON_DAYS + 1), time.min))
+    overdue_cap = horizon - timedelta(days=DUE_SOON_DAYS + 1 + MAX_OVERDUE_DAYS + 1)
+    return queryset.filter(
+        completed=False, is_deleted=False, due_date__lt=horizon, due_date__gte=overdue_cap,
+    )
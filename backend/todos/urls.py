@@ -1,6 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import TaskViewSet, ProjectViewSet, TagViewSet, SubtaskViewSet, CommentViewSet, ActivityLogViewSet, StatisticsView, TemplateViewSet
+from . import async_views
+from .views import TaskViewSet, ProjectViewSet, TagViewSet, SubtaskViewSet, CommentViewSet, ActivityLogViewSet, StatisticsView, StatisticsHistoryView, TemplateViewSet, ExportView, ImportView, CalendarView, CountsView, JobViewSet, BatchView
 
 router = DefaultRouter()
 router.register(r'tasks', TaskViewSet, basename='task')
@@ -10,8 +11,21 @@ router.register(r'subtasks', SubtaskViewSet, basename='subtask')
 router.register(r'comments', CommentViewSet, basename='comment')
 router.register(r'activity', ActivityLogViewSet, basename='activity')
 router.register(r'templates', TemplateViewSet, basename='template')
+router.register(r'jobs', JobViewSet, basename='job')
 
 urlpatterns = [
     path('', include(router.urls)),
     path('statistics/', StatisticsView.as_view(), name='statistics'),
+    path('statistics/history/', StatisticsHistoryView.as_view(), name='statistics-history'),
+    path('export/', ExportView.as_view(), name='export'),
+    path('import/', ImportView.as_view(), name='import'),
+    path('calendar/', CalendarView.as_view(), name='calendar'),
+    path('counts/', CountsView.as_view(), name='counts'),
+    path('batch/', BatchView.as_view(), name='batch'),
+    # Async (ASGI) versions of the read-heavy endpoints
+    path('async/statistics/', async_views.statistics, name='async-statistics'),
+    path('async/tasks/', async_views.task_list, name='async-task-list'),
+    path('async/tasks/<int:pk>/', async_views.task_detail, name='async-task-detail'),
+    path('async/activity/', async_views.activity_list, name='async-activity-list'),
+    path('async/activity/<int:pk>/', async_views.activity_detail, name='async-activity-detail'),
 ]
@@ -1,156 +1,510 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import APIException
 from rest_framework.response import Response
-from .models import Task, Project, Tag, Subtask, ActivityLog, Comment, Template, TemplateItem
-from .serializers import TaskSerializer, ProjectSerializer, TagSerializer, SubtaskSerializer, ActivityLogSerializer, CommentSerializer, TemplateSerializer
-
+from .models import Task, Project, Tag, Subtask, ActivityLog, Comment, Template, TemplateItem, Job
+from .serializers import TaskSerializer, ProjectSerializer, TagSerializer, SubtaskSerializer, ActivityLogSerializer, CommentSerializer, TemplateSerializer, JobSerializer
+
+from .export import EXPORT_RESOURCES, iter_ndjson, iter_csv, gzip_stream
+from .importer import TaskImporter, decode_lines, parse_ndjson, parse_csv
+from .cache import get_or_compute
+from .jobs import enqueue, run_inline, workers_alive
+from .ordering import REBALANCE_KEY_LENGTH, move
+from .recurrence import expand_window, is_slot, next_slot
+from .rollups import BUCKETS, MAX_DAY, MAX_POINTS, choose_bucket, history
+from .sharding import iter_in_shard
+from .statistics import build_statistics
+from .renderers import NDJSONRenderer, CSVRenderer, ICalendarRenderer
+
+from rest_framework.fields import DateTimeField
+from rest_framework.settings import api_settings
+from rest_framework.reverse import reverse
 from rest_framework.views import APIView
-from django.db.models import Count, F
-from django.db.models.functions import TruncDate, ExtractWeekDay
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import router, transaction
+from django.db.models import Case, Count, F, Max, Q, When
+from django.db.models.functions import TruncDate
+from django.http import StreamingHttpResponse
+from django.urls import Resolver404, resolve
 from django.utils import timezone
-from datetime import timedelta
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.http import http_date, quote_etag
+from datetime import date, datetime, time, timedelta
+from hashlib import md5
+import io
+import json
+import logging
+import zoneinfo
+from urllib.parse import quote
+
+logger = logging.getLogger(__name__)
+
+class NoWorkerRunning(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'No background worker is running (start `manage.py run_workers`).'
+    default_code = 'no_worker'
+
+def wants_job(request, default=True):
+    """
+    Whether a heavy operation runs as a background job (202 + job id).
+    `?async=1` / `?async=0` decide; otherwise it is a job when `default`,
+    TODOS_ASYNC_JOBS and a live `run_workers` process all say so, so nothing
+    is left waiting in a queue no one reads. Raises NoWorkerRunning when
+    `?async=1` asks for a job and no worker is running.
+    """
+    value = request.query_params.get('async')
+    if value is None:
+        return default and settings.TODOS_ASYNC_JOBS and workers_alive()
+    if value not in ('1', 'true'):
+        return False
+    if not workers_alive():
+        raise NoWorkerRunning()
+    return True
+
+def job_accepted(request, job):
+    url = request.build_absolute_uri(reverse('job-detail', args=[job.pk]))
+    return Response(
+        {'status': 'accepted', 'job_id': job.pk, 'url': url},
+        status=status.HTTP_202_ACCEPTED,
+        headers={'Location': url},
+    )
+
+def move_response(request, obj, siblings, rebalance_payload):
+    """Shared body of the `move` actions: {"after_id": ..., "before_id": ...}."""
+    try:
+        key = move(obj, siblings, request.data.get('after_id'), request.data.get('before_id'))
+    except ValueError as exc:
+        return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    if len(key) > REBALANCE_KEY_LENGTH and not Job.objects.filter(
+        user=request.user, kind='rebalance_positions', status='pending', payload=rebalance_payload
+    ).exists():
+        enqueue(request.user, 'rebalance_positions', rebalance_payload)
+    return Response({'id': obj.pk, 'position': key})
 
 class StatisticsView(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = 'statistics'
 
     def get(self, request):
-        user = request.user
-        tasks = Task.objects.filter(user=user)
-        completed_tasks = tasks.filter(completed=True)
-        pending_tasks = tasks.filter(completed=False)
-        
-        total_count = tasks.count()
-        completed_count = completed_tasks.count()
-        pending_count = pending_tasks.count()
-        
-        completion_rate = round((completed_count / total_count * 100), 1) if total_count > 0 else 0
+        # A read: served in the request (and cached until the user's data
+        # changes) unless ?async=1 asks for a job
+        if wants_job(request, default=False):
+            return job_accepted(request, enqueue(request.user, 'statistics'))
+        data = get_or_compute(request.user.pk, 'statistics', (timezone.now().date(),),
+                              lambda: build_statistics(request.user))
+        return Response(data)
 
-        # Streak Calculation (simplified based on ActivityLog)
-        # Find continuous days with 'COMPLETED' activity
-        streak = 0
-        today = timezone.now().date()
-        current_date = today
-        
-        # We check efficiently by getting distinct dates of completion
-        activity_dates = ActivityLog.objects.filter(
-            user=user, 
-            action='COMPLETED'
-        ).annotate(date=TruncDate('timestamp')).values_list('date', flat=True).distinct().order_by('-date')
-        
-        activity_dates_set = set(activity_dates)
-
-        # Check today then backwards
-        if current_date in activity_dates_set:
-            streak += 1
-            current_date -= timedelta(days=1)
-            while current_date in activity_dates_set:
-                streak += 1
-                current_date -= timedelta(days=1)
-        elif (current_date - timedelta(days=1)) in activity_dates_set:
-             # If not today, but yesterday, streak is alive
-            streak += 1
-            current_date -= timedelta(days=2) # Start checking from day before yesterday
-            while current_date in activity_dates_set:
-                streak += 1
-                current_date -= timedelta(days=1)
-        
-        # Productivity Chart (Last 7 Days)
-        last_7_days = today - timedelta(days=6)
-        productivity_data = (
-            ActivityLog.objects.filter(
-                user=user, 
-                action='COMPLETED', 
-                timestamp__date__gte=last_7_days
+class StatisticsHistoryView(APIView):
+    """
+    Created / completed counts for `?start=&end=` (dates, inclusive; the last
+    30 days by default), one point per `?bucket=`. Buckets that would give
+    more than MAX_POINTS points are widened (day -> week -> month -> year);
+    the response says which one was used. Dates after MAX_DAY are clamped.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    default_days = 30
+
+    def get(self, request):
+        params = request.query_params
+        try:
+            end = parse_date(params['end']) if params.get('end') else timezone.localdate()
+            start = parse_date(params['start']) if params.get('start') else end - timedelta(days=self.default_days - 1)
+        except OverflowError:
+            # The default 30 days before an end in year 1
+            start = date.min
+        except (TypeError, ValueError):
+            start = end = None
+        if start is None or end is None:
+            return Response({'error': 'start and end must be YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+        start, end = min(start, MAX_DAY), min(end, MAX_DAY)
+        if end < start:
+            return Response({'error': 'end must not be before start'}, status=status.HTTP_400_BAD_REQUEST)
+        bucket = params.get('bucket') or 'day'
+        if bucket not in BUCKETS:
+            return Response({'error': f"bucket must be one of {', '.join(BUCKETS)}"}, status=status.HTTP_400_BAD_REQUEST)
+        bucket = choose_bucket(start, end, bucket)
+        if bucket is None:
+            return Response({'error': f'Range too long (max {MAX_POINTS} years)'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(history(request.user, start, end, bucket))
+
+class ExportView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = 'export'
+    renderer_classes = [NDJSONRenderer, CSVRenderer]
+
+    def get(self, request):
+        export_format = request.accepted_renderer.format
+        resource = request.query_params.get('resource')
+        if resource and resource not in EXPORT_RESOURCES:
+            return Response({'error': f'Unknown resource: {resource}'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if export_format == 'csv':
+            # CSV has a single header row, so it exports one resource at a time
+            resource = resource or 'tasks'
+            chunks = iter_csv(request.user, resource)
+            content_type = 'text/csv; charset=utf-8'
+            filename = f'tolist-{resource}.csv'
+        else:
+            resources = [resource] if resource else list(EXPORT_RESOURCES)
+            chunks = iter_ndjson(request.user, resources)
+            content_type = 'application/x-ndjson; charset=utf-8'
+            filename = f'tolist-{resource or "export"}.ndjson'
+
+        if request.query_params.get('compress') == 'gzip':
+            chunks = gzip_stream(chunks)
+            content_type = 'application/gzip'
+            filename += '.gz'
+
+        # The body is produced after the view returns, outside the request's shard context
+        response = StreamingHttpResponse(iter_in_shard(request.user, chunks), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+class ImportView(APIView):
+    """
+    Accepts an NDJSON or CSV body (`Content-Type: application/x-ndjson` or
+    `text/csv`) or a multipart upload in the `file` field.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = 'import'
+
+    def post(self, request):
+        if request.content_type.startswith('multipart/'):
+            upload = request.FILES.get('file')
+            if upload is None:
+                return Response({'error': 'No file provided'}, status=status.HTTP_400_BAD_REQUEST)
+            is_csv = upload.name.lower().endswith('.csv') or upload.content_type == 'text/csv'
+            stream = upload
+        else:
+            is_csv = request.content_type.startswith('text/csv')
+            stream = request.stream
+        if stream is None:
+            return Response({'error': 'Empty body'}, status=status.HTTP_400_BAD_REQUEST)
+
+        lines = decode_lines(stream)
+        rows = parse_csv(lines) if is_csv else parse_ndjson(lines)
+        report = TaskImporter(request.user).run(rows)
+        # A file that stops decoding halfway keeps what was imported before
+        return Response(report, status=status.HTTP_201_CREATED if report['created'] else status.HTTP_400_BAD_REQUEST)
+
+def _request_timezone(params):
+    """The client's `?tz=` (IANA name) so day boundaries match its local calendar."""
+    try:
+        return zoneinfo.ZoneInfo(params.get('tz') or timezone.get_current_timezone_name())
+    except (zoneinfo.ZoneInfoNotFoundError, ValueError) as exc:
+        raise ValueError(str(exc))
+
+def _parse_window_bound(value, tz):
+    """
+    Accepts a date (midnight in `tz`) or a full ISO datetime. Returns the
+    datetime and whether a plain date was given.
+    """
+    day = parse_date(value)
+    if day is not None:
+        return timezone.make_aware(datetime.combine(day, time.min), tz), True
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValueError(value)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, tz)
+    return parsed, False
+
+def _request_window(params, max_days):
+    """[start, end) from `?start=&end=` (and `?tz=`). A plain-date `end` is inclusive."""
+    try:
+        tz = _request_timezone(params)
+    except ValueError:
+        raise ValueError('Invalid tz')
+    try:
+        start, _ = _parse_window_bound(params['start'], tz)
+        end, end_is_date = _parse_window_bound(params['end'], tz)
+    except (KeyError, ValueError):
+        raise ValueError('start and end must be ISO dates or datetimes')
+    if end_is_date:
+        end += timedelta(days=1)
+    if end <= start or end - start > timedelta(days=max_days):
+        raise ValueError(f'Invalid range (max {max_days} days)')
+    return tz, start, end
+
+def virtual_occurrence(series, slot):
+    """An unstored occurrence of a recurring task, shaped like `series` (a dict): no id, due at `slot`."""
+    when = DateTimeField().to_representation(slot)
+    return dict(series, id=None, due_date=when, completed=False, recurrence='', recurrence_exceptions=[],
+                recurrence_start=None, recurrence_parent=series['id'], occurrence_date=when, subtasks=[], comments=[])
+
+def window_list(queryset, start, end, serialize):
+    """Tasks due in [start, end) by due date, recurring tasks expanded into their occurrences."""
+    stored = list(queryset.filter(due_date__gte=start, due_date__lt=end).order_by('due_date', 'id'))
+    series = list(queryset.filter(due_date__lt=end).exclude(recurrence=''))
+    expanded = expand_window(series, start, end)
+    series = [task for task in series if expanded[task.pk]]
+    rows = [(task.due_date, task.pk, item) for task, item in zip(stored, serialize(stored))]
+    for task, item in zip(series, serialize(series)):
+        rows += [(slot, task.pk, virtual_occurrence(item, slot)) for slot in expanded[task.pk]]
+    rows.sort(key=lambda row: row[:2])
+    return [item for _, _, item in rows]
+
+def prefetch_task_relations(queryset):
+    """Everything TaskSerializer reads, so serializing a list of tasks runs no queries."""
+    return queryset.select_related('project').prefetch_related('subtasks', 'tags', 'comments__user')
+
+def list_tasks(queryset, params, serialize):
+    """
+    The GET /api/tasks/ payload for `queryset` (a user's tasks outside the
+    trash) and the query `params`; shared by TaskViewSet and its async
+    version. `serialize` turns a list of tasks into their representations.
+    Raises ValueError with the message of a 400.
+    """
+    ordering = params.get('ordering')
+    if ordering not in (None, '', 'urgency'):
+        raise ValueError(f'Unsupported ordering: {ordering}')
+    limit = params.get('limit')
+    if limit and (not limit.isdigit() or int(limit) < 1):
+        raise ValueError('limit must be a positive integer')
+    limit = int(limit) if limit else None
+    # Archived tasks stay reachable by id, but lists skip them unless asked
+    if params.get('include_archived') not in ('1', 'true'):
+        queryset = queryset.filter(is_archived=False)
+
+    if 'start' in params or 'end' in params:
+        if ordering:
+            raise ValueError('ordering cannot be combined with start/end')
+        _, start, end = _request_window(params, CalendarView.max_window_days)
+        return window_list(queryset, start, end, serialize)[:limit]
+
+    if ordering == 'urgency':
+        # Open tasks, most urgent first: served by todos_task_urgency_idx
+        queryset = queryset.filter(completed=False).order_by('-urgency', 'position')
+    return serialize(list(queryset[:limit]))
+
+class CalendarView(APIView):
+    """
+    Tasks due inside [start, end) plus per-day counts, for the month grid.
+    `end` given as a plain date is inclusive. Recurring tasks add their
+    unstored occurrences (`id` null, `recurrence_parent` set, as in
+    /api/tasks/). Also served as an iCalendar feed with `?format=ics`.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + [ICalendarRenderer]
+    max_window_days = 366
+    summary_fields = ('id', 'title', 'due_date', 'priority', 'completed', 'is_important', 'project_id',
+                      'recurrence_parent', 'updated_at')
+
+    def get(self, request):
+        try:
+            tz, start, end = _request_window(request.query_params, self.max_window_days)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        tasks = Task.objects.filter(user=request.user, is_deleted=False, due_date__gte=start, due_date__lt=end)
+        # Recurring tasks that may have occurrences in the window
+        series = Task.objects.filter(user=request.user, is_deleted=False, due_date__lt=end).exclude(recurrence='')
+
+        # Cheap fingerprint of the window for conditional GETs
+        fingerprint = tasks.aggregate(count=Count('id'), last_modified=Max('updated_at'))
+        series_fingerprint = series.aggregate(count=Count('id'), last_modified=Max('updated_at'))
+        etag = quote_etag(md5(
+            f"{request.accepted_renderer.format}|{tz}|{start}|{end}|{fingerprint['count']}|{fingerprint['last_modified']}"
+            f"|{series_fingerprint['count']}|{series_fingerprint['last_modified']}".encode()
+        ).hexdigest())
+        last_modified = max(filter(None, [fingerprint['last_modified'], series_fingerprint['last_modified']]), default=None)
+        last_modified = last_modified and int(last_modified.timestamp())
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        stored = list(tasks.order_by('due_date', 'id').values(*self.summary_fields))
+        occurrences = []
+        if series_fingerprint['count']:
+            series = list(series)
+            expanded = expand_window(series, start, end)
+            for task in series:
+                summary = {field: getattr(task, field) for field in self.summary_fields if field != 'recurrence_parent'}
+                occurrences += [dict(summary, id=None, due_date=slot, completed=False, recurrence_parent=task.pk)
+                                for slot in expanded[task.pk]]
+        data = {
+            'start': start,
+            'end': end,
+            'tasks': sorted(stored + occurrences, key=lambda task: (task['due_date'], task['id'] or 0)),
+        }
+        if request.accepted_renderer.format != 'ics':
+            days = (
+                tasks.annotate(day=TruncDate('due_date', tzinfo=tz))
+                .values('day')
+                .annotate(
+                    total=Count('id'),
+                    completed=Count('id', filter=Q(completed=True)),
+                    high=Count('id', filter=Q(priority='high')),
+                    medium=Count('id', filter=Q(priority='medium')),
+                    low=Count('id', filter=Q(priority='low')),
+                )
+                .order_by('day')
             )
-            .annotate(date=TruncDate('timestamp'))
-            .values('date')
-            .annotate(count=Count('id'))
-            .order_by('date')
-        )
-        
-        # Fill missing days
-        prod_chart_labels = []
-        prod_chart_data = []
-        prod_map = {item['date']: item['count'] for item in productivity_data}
-        
-        for i in range(7):
-            d = last_7_days + timedelta(days=i)
-            # Spanish day names
-            day_name = d.strftime('%a') # Mon, Tue... we can map or use locale
-            # Simple manual map for Spanish
-            days_es = {'Mon': 'Lun', 'Tue': 'Mar', 'Wed': 'Mié', 'Thu': 'Jue', 'Fri': 'Vie', 'Sat': 'Sáb', 'Sun': 'Dom'}
-            prod_chart_labels.append(days_es.get(day_name, day_name))
-            prod_chart_data.append(prod_map.get(d, 0))
-
-        # Projects Chart
-        projects_data = (
-            tasks.values('project__name')
-            .annotate(count=Count('id'))
-            .order_by('-count')
-        )
-        project_labels = [item['project__name'] if item['project__name'] else 'Sin Proyecto' for item in projects_data]
-        project_counts = [item['count'] for item in projects_data]
+            days = {item['day']: item for item in days}
+            for occurrence in occurrences:
+                day = timezone.localtime(occurrence['due_date'], tz).date()
+                item = days.setdefault(day, {'day': day, 'total': 0, 'completed': 0, 'high': 0, 'medium': 0, 'low': 0})
+                item['total'] += 1
+                item[occurrence['priority']] += 1
+            data['days'] = [dict(item, pending=item['total'] - item['completed']) for _, item in sorted(days.items())]
+
+        response = Response(data)
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+class BatchView(APIView):
+    """
+    Runs several API calls in one round trip:
+
+        {"requests": [{"method": "PATCH", "path": "tasks/5/", "body": {...}},
+                      {"method": "GET", "path": "tasks/5/"}],
+         "atomic": false}
+
+    and answers {"responses": [{"status": ..., "body": ...}, ...]} in the same
+    order. Sub-requests reuse this request's authentication and are throttled
+    like standalone calls, in their own scope (a throttled one answers 429 in
+    its slot). With "atomic": true they share one transaction, which is
+    rolled back at the first error response; the requests after it are
+    skipped (status 424).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = 'batch'
+
+    def post(self, request):
+        items = request.data.get('requests') if isinstance(request.data, dict) else None
+        if not isinstance(items, list) or not items:
+            return Response({'error': 'requests must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > settings.TODOS_BATCH_MAX_REQUESTS:
+            return Response({'error': f'At most {settings.TODOS_BATCH_MAX_REQUESTS} requests per batch'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        # Relative paths are resolved against the API root (where this view is mounted)
+        api_root = request.path_info[:request.path_info.rindex('batch/')]
+
+        if request.data.get('atomic') not in (True, 'true', '1', 1):
+            return Response({'responses': [self.run_subrequest(request, item, api_root) for item in items]})
+
+        responses = []
+        using = router.db_for_write(Task)
+        with transaction.atomic(using=using):
+            for item in items:
+                if responses and responses[-1]['status'] >= 400:
+                    responses.append({'status': status.HTTP_424_FAILED_DEPENDENCY, 'body': None})
+                    continue
+                responses.append(self.run_subrequest(request, item, api_root))
+            committed = responses[-1]['status'] < 400
+            if not committed:
+                transaction.set_rollback(True, using=using)
+        return Response({'responses': responses, 'committed': committed})
+
+    def run_subrequest(self, request, item, api_root):
+        if not isinstance(item, dict) or not isinstance(item.get('path'), str):
+            return {'status': status.HTTP_400_BAD_REQUEST, 'body': {'error': 'Each request needs a path'}}
+        method = str(item.get('method', 'GET')).upper()
+        path, _, query = item['path'].partition('?')
+        if not path.startswith('/'):
+            path = api_root + path
+        try:
+            match = resolve(path)
+        except Resolver404:
+            return {'status': status.HTTP_404_NOT_FOUND, 'body': {'detail': 'Not found.'}}
+        view_class = getattr(match.func, 'cls', None)
+        if view_class is None or not issubclass(view_class, APIView) or issubclass(view_class, BatchView):
+            return {'status': status.HTTP_400_BAD_REQUEST, 'body': {'error': 'Only API endpoints can be batched'}}
+
+        body = json.dumps(item['body']).encode() if item.get('body') is not None else b''
+        environ = {key: value for key, value in request.META.items() if isinstance(value, str)}
+        environ.update({
+            'REQUEST_METHOD': method,
+            'PATH_INFO': path,
+            'QUERY_STRING': query,
+            'CONTENT_TYPE': 'application/json',
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.input': io.BytesIO(body),
+        })
+        subrequest = WSGIRequest(environ)
+        # Authenticated by the batch; throttled in its own scope like a standalone call
+        subrequest._force_auth_user = request.user
+        subrequest._force_auth_token = request.auth
+        if hasattr(request._request, 'session'):
+            subrequest.session = request._request.session
+
+        try:
+            response = match.func(subrequest, *match.args, **match.kwargs)
+        except Exception:
+            logger.exception('Batch sub-request %s %s failed', method, path)
+            return {'status': status.HTTP_500_INTERNAL_SERVER_ERROR, 'body': {'error': 'Server error'}}
+        if response.streaming:
+            response.close()
+            return {'status': status.HTTP_400_BAD_REQUEST, 'body': {'error': 'Streaming responses cannot be batched'}}
+        if hasattr(response, 'render'):
+            response.render()
+
+        result = {'status': response.status_code, 'body': None}
+        if response.content:
+            if 'json' in response.get('Content-Type', ''):
+                result['body'] = json.loads(response.content)
+            else:
+                result['body'] = response.content.decode(response.charset)
+        if response.has_header('Location'):
+            result['location'] = response['Location']
+        return result
+
+class CountsView(APIView):
+    """Badge counts for the sidebar and the Tags/Projects pages, cached per user."""
+    permission_classes = [permissions.IsAuthenticated]
 
-        # Priority Chart
-        priority_data = (
-            tasks.values('priority')
-            .annotate(count=Count('id'))
+    def get(self, request):
+        try:
+            tz = _request_timezone(request.query_params)
+        except ValueError:
+            return Response({'error': 'Invalid tz'}, status=status.HTTP_400_BAD_REQUEST)
+        today = timezone.now().astimezone(tz).date()
+        data = get_or_compute(request.user.pk, 'counts', (tz, today), lambda: self.compute(request.user, tz, today))
+        return Response(data)
+
+    def compute(self, user, tz, today):
+        today_start = timezone.make_aware(datetime.combine(today, time.min), tz)
+        tomorrow_start = today_start + timedelta(days=1)
+        active = Q(is_deleted=False)
+
+        # One pass over the user's tasks for every global counter
+        # (aliases can't reuse field names such as `completed`)
+        totals = Task.objects.filter(user=user).aggregate(
+            total=Count('id', filter=active),
+            done=Count('id', filter=active & Q(completed=True)),
+            important=Count('id', filter=active & Q(is_important=True)),
+            today=Count('id', filter=active & Q(due_date__gte=today_start, due_date__lt=tomorrow_start)),
+            overdue=Count('id', filter=active & Q(completed=False, due_date__lt=today_start)),
+            trash=Count('id', filter=Q(is_deleted=True)),
         )
-        prio_map = {item['priority']: item['count'] for item in priority_data}
-        # Fixed order matches frontend colors
-        priority_counts = [
-            prio_map.get('high', 0),
-            prio_map.get('medium', 0),
-            prio_map.get('low', 0)
-        ]
-
-        # Completion vs Pending (Last 4 weeks is too complex for MVP, lets do Total)
-        # Or simpler: "This Date" vs "Total"
-        # User requested "Tasks Completed vs Pending" chart.
-        # Let's send global ratio for simplicity or maybe breakdown by something else?
-        # The design shows "Week 1, Week 2...". 
-        # Let's stick to a simple Total Completed vs Total Pending in a Bar chart if "Weeks" is too hard.
-        # Actually, let's just send the totals for now effectively making it a comparison.
-        # FOR NOW: Sending just the current snapshot as a single bar? No, users want history.
-        # Let's fallback to "Last 4 days" or similar if we can't do weeks easily.
-        # Let's stick to the SIMPLEST valid data: This Month's Weekly Breakdown. I will skip for now and just return totals.
-        
-        # Weekday Chart (Best days)
-        weekday_data = (
-            ActivityLog.objects.filter(user=user, action='COMPLETED')
-            .annotate(weekday=ExtractWeekDay('timestamp'))
-            .values('weekday')
-            .annotate(count=Count('id'))
-            .order_by('weekday')
+        totals['completed'] = totals.pop('done')
+        totals['pending'] = totals['total'] - totals['completed']
+
+        projects = (
+            Task.objects.filter(user=user, is_deleted=False)
+            .values('project_id')
+            .annotate(total=Count('id'), done=Count('id', filter=Q(completed=True)))
+            .order_by()
         )
-        # Django ExtractWeekDay: 1=Sunday, 7=Saturday (usually) -> verify.
-        # Actually in many DBs it varies. Standard is often Sunday=1.
-        # Let's assume standard and map to 0-6 array.
-        weekday_map = {item['weekday']: item['count'] for item in weekday_data}
-        # Order: Mon (2), Tue (3) ... Sat (7), Sun (1)
-        weekday_counts = [
-            weekday_map.get(2, 0), # Mon
-            weekday_map.get(3, 0),
-            weekday_map.get(4, 0),
-            weekday_map.get(5, 0),
-            weekday_map.get(6, 0),
-            weekday_map.get(7, 0),
-            weekday_map.get(1, 0), # Sun
-        ]
-        
-        data = {
-            'completed_count': completed_count,
-            'pending_count': pending_count,
-            'completion_rate': completion_rate,
-            'streak': streak,
-            'charts': {
-                'productivity': { 'labels': prod_chart_labels, 'data': prod_chart_data },
-                'projects': { 'labels': project_labels, 'data': project_counts },
-                'priority': { 'data': priority_counts }, # Labels fixed in frontend
-                'weekday': { 'data': weekday_counts }
-            }
+        tags = (
+            Task.tags.through.objects.filter(task__user=user, task__is_deleted=False)
+            .values('tag_id')
+            .annotate(total=Count('id'))
+            .order_by()
+        )
+        return {
+            **totals,
+            # null key -> tasks without a project
+            'projects': {
+                str(item['project_id']) if item['project_id'] else 'none': {'total': item['total'], 'completed': item['done']}
+                for item in projects
+            },
+            'tags': {str(item['tag_id']): item['total'] for item in tags},
         }
-        return Response(data)
 
 class ActivityLogViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = ActivityLogSerializer
@@ -159,7 +513,41 @@ class ActivityLogViewSet(viewsets.ReadOnlyModelViewSet):
     def get_queryset(self):
         return ActivityLog.objects.filter(user=self.request.user)
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class NamePrefixMixin:
+    """
+    `?prefix=&limit=` on list: the user's rows whose name starts with prefix
+    (case-insensitive), an exact match first, then the most used. The prefix
+    is a range on the (user, name_lower) index; results are cached per user
+    until one of their tasks, tags or projects changes.
+    """
+    prefix_default_limit = 10
+    prefix_max_limit = 50
+
+    def list(self, request, *args, **kwargs):
+        if 'prefix' not in request.query_params and 'limit' not in request.query_params:
+            return super().list(request, *args, **kwargs)
+        prefix = request.query_params.get('prefix', '').strip().lower()
+        limit = request.query_params.get('limit') or str(self.prefix_default_limit)
+        if not limit.isdigit() or not 1 <= int(limit) <= self.prefix_max_limit:
+            return Response({'error': f'limit must be an integer between 1 and {self.prefix_max_limit}'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        data = get_or_compute(request.user.pk, f'{self.basename}-prefix', (quote(prefix), limit),
+                              lambda: self.prefix_matches(prefix, int(limit)))
+        return Response(data)
+
+    def prefix_matches(self, prefix, limit):
+        queryset = self.get_queryset()
+        ordering = ['-usage', 'name_lower', 'id']
+        if prefix:
+            queryset = queryset.filter(name_lower__gte=prefix, name_lower__startswith=prefix)
+            # Upper end of the range: the prefix with its last character bumped
+            if ord(prefix[-1]) < 0x10FFFF:
+                queryset = queryset.filter(name_lower__lt=prefix[:-1] + chr(ord(prefix[-1]) + 1))
+            ordering.insert(0, Case(When(name_lower=prefix, then=0), default=1))
+        queryset = queryset.annotate(usage=Count('tasks')).order_by(*ordering)[:limit]
+        return list(self.get_serializer(queryset, many=True).data)
+
+class ProjectViewSet(NamePrefixMixin, viewsets.ModelViewSet):
     serializer_class = ProjectSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -169,7 +557,7 @@ class ProjectViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
-class TagViewSet(viewsets.ModelViewSet):
+class TagViewSet(NamePrefixMixin, viewsets.ModelViewSet):
     serializer_class = TagSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -182,13 +570,79 @@ class TagViewSet(viewsets.ModelViewSet):
 class TaskViewSet(viewsets.ModelViewSet):
     serializer_class = TaskSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # PATCH is how the UI toggles completed / important
+    throttle_scopes = {'partial_update': 'toggle'}
 
     def get_queryset(self):
         return Task.objects.filter(user=self.request.user, is_deleted=False)
 
+    def list(self, request, *args, **kwargs):
+        queryset = prefetch_task_relations(self.filter_queryset(self.get_queryset()))
+        try:
+            data = list_tasks(queryset, request.query_params, lambda tasks: self.get_serializer(tasks, many=True).data)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(data)
+
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    @action(detail=False, methods=['get'])
+    def archived(self, request):
+        archived_tasks = self.get_queryset().filter(is_archived=True).order_by('-archived_at')
+        serializer = self.get_serializer(archived_tasks, many=True)
+        return Response(serializer.data)
+
+    @action(detail=True, methods=['post'])
+    def unarchive(self, request, pk=None):
+        task = self.get_object()
+        if not task.is_archived:
+            return Response({'error': 'Task is not archived'}, status=status.HTTP_400_BAD_REQUEST)
+        task.unarchive()
+        return Response({'status': 'task unarchived'}, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['post'])
+    def move(self, request, pk=None):
+        task = self.get_object()
+        # Neighbours and rebalances are taken from the list the user sees
+        siblings = Task.objects.filter(user=request.user, is_deleted=False, is_archived=False)
+        return move_response(request, task, siblings, {})
+
+    @action(detail=True, methods=['post'])
+    def materialize(self, request, pk=None):
+        """Store an upcoming occurrence of a recurring task so it can be edited on its own: {"date": <slot>}."""
+        task = self.get_object()
+        if not task.recurrence:
+            return Response({'error': 'Task is not recurring'}, status=status.HTTP_400_BAD_REQUEST)
+        slot = parse_datetime(str(request.data.get('date', '')))
+        if slot is not None and timezone.is_naive(slot):
+            slot = timezone.make_aware(slot)
+        if slot is None or slot <= task.due_date or not is_slot(task, slot):
+            return Response({'error': 'date is not an upcoming occurrence of this task'}, status=status.HTTP_400_BAD_REQUEST)
+        occurrence, created = task.store_occurrence(slot)
+        return Response(self.get_serializer(occurrence).data,
+                        status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+    @action(detail=True, methods=['post'])
+    def skip(self, request, pk=None):
+        """Skip one day of a recurring task: {"date": "YYYY-MM-DD"}."""
+        task = self.get_object()
+        if not task.recurrence:
+            return Response({'error': 'Task is not recurring'}, status=status.HTTP_400_BAD_REQUEST)
+        day = parse_date(str(request.data.get('date', '')))
+        if day is None:
+            return Response({'error': 'date must be YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+        task.recurrence_exceptions = sorted(set(task.recurrence_exceptions) | {day.isoformat()})
+        if timezone.localdate(task.due_date) == day:
+            # Skipping the current occurrence moves the task on to the next one
+            following = next_slot(task, task.due_date)
+            if following is None:
+                return Response({'error': 'This is the last occurrence; delete the task instead'},
+                                status=status.HTTP_400_BAD_REQUEST)
+            task.due_date = following
+        task.save()
+        return Response(self.get_serializer(task).data)
+
     @action(detail=False, methods=['get'])
     def trash(self, request):
         trash_tasks = Task.objects.filter(user=request.user, is_deleted=True).order_by('-deleted_at')
@@ -215,13 +669,9 @@ class TaskViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['delete'])
     def empty_trash(self, request):
-        Task.objects.filter(user=request.user, is_deleted=True).delete() # This might call custom delete or standard delete depending on manager.
-        # Standard queryset delete() typically bypasses model.delete() method.
-        # But we want HARD delete here.
-        # To hard delete all locally:
-        tasks = Task.objects.filter(user=request.user, is_deleted=True)
-        for task in tasks:
-            task.hard_delete()
+        if wants_job(request):
+            return job_accepted(request, enqueue(request.user, 'empty_trash'))
+        run_inline(request.user, 'empty_trash')
         return Response({'status': 'trash emptied'}, status=status.HTTP_200_OK)
 
     def perform_destroy(self, instance):
@@ -246,19 +696,26 @@ class TaskViewSet(viewsets.ModelViewSet):
         if not task_ids:
             return Response({'error': 'No task IDs provided'}, status=status.HTTP_400_BAD_REQUEST)
         
-        tasks = Task.objects.filter(id__in=task_ids, user=request.user, is_deleted=True)
-        count = tasks.count()
-        for task in tasks:
-            task.hard_delete()
-            
-        return Response({'status': f'{count} tasks permanently deleted'}, status=status.HTTP_200_OK)
+        if wants_job(request):
+            return job_accepted(request, enqueue(request.user, 'bulk_delete_forever', {'task_ids': task_ids}))
+        result = run_inline(request.user, 'bulk_delete_forever', {'task_ids': task_ids})
+        return Response({'status': f"{result['deleted']} tasks permanently deleted"}, status=status.HTTP_200_OK)
 
 
 class SubtaskViewSet(viewsets.ModelViewSet):
     serializer_class = SubtaskSerializer
     permission_classes = [permissions.IsAuthenticated]
+    throttle_scopes = {'partial_update': 'toggle'}
     queryset = Subtask.objects.all()
 
+    @action(detail=True, methods=['post'])
+    def move(self, request, pk=None):
+        subtask = self.get_object()
+        if subtask.task.user_id != request.user.pk:
+            return Response({'error': 'Subtask not found'}, status=status.HTTP_404_NOT_FOUND)
+        siblings = Subtask.objects.filter(task_id=subtask.task_id)
+        return move_response(request, subtask, siblings, {'task_id': subtask.task_id})
+
 class CommentViewSet(viewsets.ModelViewSet):
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -285,22 +742,15 @@ class TemplateViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'])
     def use(self, request, pk=None):
         template = self.get_object()
-        # Logic to create a task from template
-        # For now, frontend can handle this by reading template data and POSTing to /tasks/
-        # But providing an endpoint is also good practice.
-        # Let's implement basic copy logic here for robust "Use" button
-        
-        task_data = {
-            'title': template.title,
-            'description': template.description,
-            'priority': template.priority,
-            # category logic depends on project/tags, skipping for MVP simple copy
-        }
-        
-        task = Task.objects.create(user=request.user, **task_data)
-        
-        # Copy items as subtasks
-        for item in template.items.all():
-            Subtask.objects.create(task=task, title=item.content, completed=False)
-            
+        if wants_job(request):
+            return job_accepted(request, enqueue(request.user, 'use_template', {'template_id': template.pk}))
+        task = template.create_task()
         return Response({'status': 'task created from template', 'task_id': task.id}, status=status.HTTP_201_CREATED)
+
+class JobViewSet(viewsets.ReadOnlyModelViewSet):
+    """Progress/result polling for background jobs."""
+    serializer_class = JobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return Job.objects.filter(user=self.request.user)
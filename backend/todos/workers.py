@@ -0,0 +1,15 @@
+"""
+Entry points for `run_workers` pool processes. This module must stay
+importable before Django is set up (worker processes are spawned fresh), so
+it doesn't import models at module level.
+"""
+
+
+def init_worker():
+    import django
+    django.setup()
+
+
+def execute_job(job_id):
+    from .jobs import run_job
+    return run_job(job_id)
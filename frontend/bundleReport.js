@@ -0,0 +1,65 @@
+import { Buffer } from 'node:buffer'
+import process from 'node:process'
+import { gzipSync } from 'node:zlib'
+
+// What the browser downloads before the first page can render: the entry
+// chunk, the chunks it imports statically, and their CSS. Above this (gzip)
+// the build prints a warning.
+export const INITIAL_LOAD_BUDGET_KB = 200
+
+const kb = (bytes) => (bytes / 1024).toFixed(1)
+
+const fileSize = (item) => {
+  const content = item.type === 'chunk' ? item.code : item.source
+  return { bytes: Buffer.byteLength(content), gzip: gzipSync(content).length }
+}
+
+// After `vite build`: writes dist/bundle-report.json (every chunk with its
+// size and largest modules) and prints the initial load against the budget
+export function bundleReport() {
+  return {
+    name: 'bundle-report',
+    apply: 'build',
+    generateBundle(_, bundle) {
+      const files = Object.values(bundle)
+      const chunks = files
+        .filter(item => item.type === 'chunk')
+        .map(chunk => ({
+          file: chunk.fileName,
+          entry: chunk.isEntry,
+          imports: chunk.imports,
+          css: [...(chunk.viteMetadata?.importedCss ?? [])],
+          ...fileSize(chunk),
+          modules: Object.entries(chunk.modules)
+            .map(([id, module]) => ({ id: id.replace(process.cwd(), ''), bytes: module.renderedLength }))
+            .sort((a, b) => b.bytes - a.bytes)
+            .slice(0, 10),
+        }))
+        .sort((a, b) => b.bytes - a.bytes)
+
+      const byFile = Object.fromEntries(files.map(item => [item.fileName, item]))
+      const initial = new Set()
+      const visit = (fileName) => {
+        if (initial.has(fileName) || !byFile[fileName]) return
+        initial.add(fileName)
+        const item = byFile[fileName]
+        if (item.type === 'chunk') {
+          item.imports.forEach(visit)
+          ;(item.viteMetadata?.importedCss ?? []).forEach(visit)
+        }
+      }
+      chunks.filter(chunk => chunk.entry).forEach(chunk => visit(chunk.file))
+      const initialGzip = [...initial].reduce((total, fileName) => total + fileSize(byFile[fileName]).gzip, 0)
+
+      this.emitFile({
+        type: 'asset',
+        fileName: 'bundle-report.json',
+        source: JSON.stringify({ initialLoad: { files: [...initial], gzip: initialGzip }, chunks }, null, 2),
+      })
+      console.log(`\nInitial load: ${kb(initialGzip)} kB gzip (${[...initial].join(', ')})`)
+      if (initialGzip > INITIAL_LOAD_BUDGET_KB * 1024) {
+        this.warn(`Initial load is over the ${INITIAL_LOAD_BUDGET_KB} kB budget`)
+      }
+    },
+  }
+}
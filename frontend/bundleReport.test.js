@@ -0,0 +1,61 @@
+import { test } from 'node:test'
+import assert from 'node:assert/strict'
+import { randomBytes } from 'node:crypto'
+import { gzipSync } from 'node:zlib'
+import { bundleReport, INITIAL_LOAD_BUDGET_KB } from './bundleReport.js'
+
+const chunk = (fileName, code, { entry = false, imports = [], css = [] } = {}) => ({
+  type: 'chunk', fileName, code, isEntry: entry, imports,
+  viteMetadata: { importedCss: new Set(css) },
+  modules: { [`${process.cwd()}/src/${fileName}`]: { renderedLength: code.length } },
+})
+const asset = (fileName, source) => ({ type: 'asset', fileName, source })
+
+// Runs the plugin over a fake bundle and returns the report and warnings
+const generate = (files) => {
+  const emitted = []
+  const warnings = []
+  const context = { emitFile: file => emitted.push(file), warn: message => warnings.push(message) }
+  const log = console.log
+  console.log = () => {}
+  try {
+    bundleReport().generateBundle.call(context, {}, Object.fromEntries(files.map(file => [file.fileName, file])))
+  } finally {
+    console.log = log
+  }
+  assert.equal(emitted.length, 1)
+  assert.equal(emitted[0].fileName, 'bundle-report.json')
+  return { report: JSON.parse(emitted[0].source), warnings }
+}
+
+test('the initial load is the entry, its static imports and their CSS', () => {
+  const files = [
+    chunk('index.js', 'import "./vendor.js"; import("./Stats.js")', { entry: true, imports: ['vendor.js'], css: ['index.css'] }),
+    chunk('vendor.js', 'export const react = 1'.repeat(50)),
+    chunk('Stats.js', 'export const charts = 2'.repeat(500), { imports: ['vendor.js'], css: ['stats.css'] }),
+    asset('index.css', 'body { margin: 0 }'),
+    asset('stats.css', 'canvas { width: 100% }'),
+  ]
+  const { report, warnings } = generate(files)
+
+  assert.deepEqual(report.initialLoad.files.sort(), ['index.css', 'index.js', 'vendor.js'])
+  const gzip = ['index.js', 'vendor.js', 'index.css']
+    .map(name => files.find(file => file.fileName === name))
+    .reduce((total, file) => total + gzipSync(file.code ?? file.source).length, 0)
+  assert.equal(report.initialLoad.gzip, gzip)
+  assert.deepEqual(warnings, [])
+
+  // Every chunk is listed, largest first, with module paths relative to the project
+  assert.deepEqual(report.chunks.map(item => item.file), ['Stats.js', 'vendor.js', 'index.js'])
+  assert.deepEqual(report.chunks[0].css, ['stats.css'])
+  assert.equal(report.chunks[0].modules[0].id, '/src/Stats.js')
+})
+
+test('an initial load over the budget is warned about', () => {
+  // Random bytes barely compress, so the gzip size stays over the budget
+  const code = randomBytes((INITIAL_LOAD_BUDGET_KB + 20) * 1024).toString('latin1')
+  const { report, warnings } = generate([chunk('index.js', code, { entry: true })])
+  assert.ok(report.initialLoad.gzip > INITIAL_LOAD_BUDGET_KB * 1024)
+  assert.equal(warnings.length, 1)
+  assert.match(warnings[0], /budget/)
+})
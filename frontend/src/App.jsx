@@ -1,145 +1,167 @@
+import { Suspense } from 'react';
 import { BrowserRouter, Routes, Route, Navigate } from 'react-router-dom';
 import Login from './pages/Auth/Login';
-import Register from './pages/Auth/Register';
 import TodoList from './pages/Dashboard/TodoList';
-import CreateTodo from './pages/Tasks/CreateTodo';
-import MyTasks from './pages/MyTasks/MyTasks';
-import TaskDetail from './pages/Tasks/TaskDetail';
-import Calendar from './pages/Calendar/Calendar';
-import Projects from './pages/Projects/Projects';
-import ImportantTasks from './pages/Important/ImportantTasks';
-import Settings from './pages/Settings/Settings';
-import Activity from './pages/Activity/Activity';
-import Tags from './pages/Tags/Tags';
-import Today from './pages/Today/Today';
-import Trash from './pages/Trash/Trash';
-import Statistics from './pages/Statistics/Statistics';
 import ProtectedRoute from './components/ProtectedRoute';
-import EditTodo from './pages/Tasks/EditTodo';
-import Templates from './pages/Templates/Templates';
+import PageErrorBoundary from './components/PageErrorBoundary';
+import { lazyPage } from './routes';
 import './App.css';
 
+// Login and the Dashboard are in the main bundle; every other page is
+// fetched when first needed (see routes.js)
+const Register = lazyPage('/register');
+const MyTasks = lazyPage('/my-tasks');
+const Calendar = lazyPage('/calendar');
+const Projects = lazyPage('/projects');
+const TaskDetail = lazyPage('/tasks/:id');
+const EditTodo = lazyPage('/edit/:id');
+const CreateTodo = lazyPage('/create');
+const ImportantTasks = lazyPage('/important');
+const Settings = lazyPage('/settings');
+const Activity = lazyPage('/activity');
+const Today = lazyPage('/today');
+const Tags = lazyPage('/tags');
+const Trash = lazyPage('/trash');
+const Statistics = lazyPage('/statistics');
+const Templates = lazyPage('/templates');
+
+const PageFallback = () => (
+  <div className="d-flex justify-content-center align-items-center vh-100">Cargando...</div>
+);
+
 function App() {
   return (
     <BrowserRouter>
-      <Routes>
-        <Route path="/login" element={<Login />} />
-        <Route path="/register" element={<Register />} />
-        <Route
-          path="/todos"
-          element={
-            <ProtectedRoute>
-              <TodoList />
-            </ProtectedRoute>
-          }
-        />
-        <Route
-          path="/my-tasks"
-          element={
-            <ProtectedRoute>
-              <MyTasks />
-            </ProtectedRoute>
-          }
-        />
-        <Route
-          path="/calendar"
-          element={
-            <ProtectedRoute>
-              <Calendar />
-            </ProtectedRoute>
-          }
-        />
-        <Route
-          path="/projects"
-          element={
-            <ProtectedRoute>
-              <Projects />
-            </ProtectedRoute>
-          }
-        />
-        <Route
-          path="/tasks/:id"
-          element={
-            <ProtectedRoute>
-              <TaskDetail />
-            </ProtectedRoute>
-          }
-        />
-        <Route
-          path="/create"
-          element={
-            <ProtectedRoute>
-              <CreateTodo />
-            </ProtectedRoute>
-          }
-        />
-        <Route
-          path="/important"
-          element={
-            <ProtectedRoute>
-              <ImportantTasks />
-            </ProtectedRoute>
-          }
-        />
-        <Route
-          path="/settings"
-          element={
-            <ProtectedRoute>
-              <Settings />
-            </ProtectedRoute>
-          }
-        />
-        <Route
-          path="/activity"
-          element={
-            <ProtectedRoute>
-              <Activity />
-            </ProtectedRoute>
-          }
-        />
-        <Route
-          path="/today"
-          element={
-            <ProtectedRoute>
-              <Today />
-            </ProtectedRoute>
-          }
-        />
-        <Route
-          path="/tags"
-          element={
-            <ProtectedRoute>
-              <Tags />
-            </ProtectedRoute>
-          }
-        />
-        <Route
-          path="/trash"
-          element={
-            <ProtectedRoute>
-              <Trash />
-            </ProtectedRoute>
-          }
-        />
-        <Route
-          path="/statistics"
-          element={
-            <ProtectedRoute>
-              <Statistics />
-            </ProtectedRoute>
-          }
-        />
-        <Route
-          path="/templates"
-          element={
-            <ProtectedRoute>
-              <Templates />
-            </ProtectedRoute>
-          }
-        />
-        <Route
-          path="/" element={<Navigate to="/login" replace />} />
-      </Routes>
+      <PageErrorBoundary>
+        <Suspense fallback={<PageFallback />}>
+          <Routes>
+            <Route path="/login" element={<Login />} />
+            <Route path="/register" element={<Register />} />
+            <Route
+              path="/todos"
+              element={
+                <ProtectedRoute>
+                  <TodoList />
+                </ProtectedRoute>
+              }
+            />
+            <Route
+              path="/my-tasks"
+              element={
+                <ProtectedRoute>
+                  <MyTasks />
+                </ProtectedRoute>
+              }
+            />
+            <Route
+              path="/calendar"
+              element={
+                <ProtectedRoute>
+                  <Calendar />
+                </ProtectedRoute>
+              }
+            />
+            <Route
+              path="/projects"
+              element={
+                <ProtectedRoute>
+                  <Projects />
+                </ProtectedRoute>
+              }
+            />
+            <Route
+              path="/tasks/:id"
+              element={
+                <ProtectedRoute>
+                  <TaskDetail />
+                </ProtectedRoute>
+              }
+            />
+            <Route
+              path="/edit/:id"
+              element={
+                <ProtectedRoute>
+                  <EditTodo />
+                </ProtectedRoute>
+              }
+            />
+            <Route
+              path="/create"
+              element={
+                <ProtectedRoute>
+                  <CreateTodo />
+                </ProtectedRoute>
+              }
+            />
+            <Route
+              path="/important"
+              element={
+                <ProtectedRoute>
+                  <ImportantTasks />
+                </ProtectedRoute>
+              }
+            />
+            <Route
+              path="/settings"
+              element={
+                <ProtectedRoute>
+                  <Settings />
+                </ProtectedRoute>
+              }
+            />
+            <Route
+              path="/activity"
+              element={
+                <ProtectedRoute>
+                  <Activity />
+                </ProtectedRoute>
+              }
+            />
+            <Route
+              path="/today"
+              element={
+                <ProtectedRoute>
+                  <Today />
+                </ProtectedRoute>
+              }
+            />
+            <Route
+              path="/tags"
+              element={
+                <ProtectedRoute>
+                  <Tags />
+                </ProtectedRoute>
+              }
+            />
+            <Route
+              path="/trash"
+              element={
+                <ProtectedRoute>
+                  <Trash />
+                </ProtectedRoute>
+              }
+            />
+            <Route
+              path="/statistics"
+              element={
+                <ProtectedRoute>
+                  <Statistics />
+                </ProtectedRoute>
+              }
+            />
+            <Route
+              path="/templates"
+              element={
+                <ProtectedRoute>
+                  <Templates />
+                </ProtectedRoute>
+              }
+            />
+            <Route
+              path="/" element={<Navigate to="/login" replace />} />
+          </Routes>
+        </Suspense>
+      </PageErrorBoundary>
     </BrowserRouter>
   );
 }
@@ -1,9 +1,186 @@
 import axios from 'axios';
 
+// GET responses are cached per URL (query string included) for the current
+// token. For FRESH_MS they are served without a request; after that, until
+// STALE_MS, they are still served at once but refetched in the background
+// (stale-while-revalidate), and `subscribe` listeners get the new data.
+// Identical GETs in flight share one request. A PATCH/PUT/DELETE of a task
+// patches the cached task lists right away (rolled back if it fails); any
+// other change drops the cache. Background jobs (jobs/) are never cached.
+const FRESH_MS = 30 * 1000;
+const STALE_MS = 5 * 60 * 1000;
+const JOB_POLL_MS = 500;
+const JOB_TIMEOUT_MS = 5 * 60 * 1000;
+
+const TASK_LIST = /^tasks\/$/;
+const TASK_DETAIL = /^tasks\/(\d+)\/$/;
+const JOB = /^jobs\//;
+
+const cache = new Map(); // key -> { path, response, fetchedAt, stale }
+const inFlight = new Map(); // key -> { generation, request }
+const listeners = new Map(); // key -> Set of callbacks
+// Bumped around every change: GETs started before it are not cached
+let generation = 0;
+let cacheToken = null;
+
+const defaultAdapter = axios.getAdapter(axios.defaults.adapter);
+
 const api = axios.create({
     baseURL: 'http://localhost:8000/api/',
 });
 
+const cacheKey = (config) => api.getUri(config);
+
+const apiPath = (config) => {
+    const url = config.baseURL && config.url.startsWith(config.baseURL)
+        ? config.url.slice(config.baseURL.length)
+        : config.url;
+    return url.split('?')[0];
+};
+
+// Adapters see the raw body; axios parses it afterwards, so every caller
+// gets its own copy of cached data
+const decode = (data) => {
+    if (typeof data !== 'string') return data;
+    try {
+        return JSON.parse(data);
+    } catch {
+        return data;
+    }
+};
+
+const notify = (key) => {
+    const entry = cache.get(key);
+    if (!entry) return;
+    const data = decode(entry.response.data);
+    (listeners.get(key) || []).forEach(listener => listener(data));
+};
+
+const store = (key, path, response) => {
+    const { data, status, statusText, headers, request } = response;
+    const previous = cache.get(key);
+    cache.set(key, { path, response: { data, status, statusText, headers, request }, fetchedAt: Date.now(), stale: false });
+    if (!previous || previous.response.data !== data) notify(key);
+};
+
+const rewrite = (key, update) => {
+    const entry = cache.get(key);
+    const data = update(decode(entry.response.data));
+    entry.response = { ...entry.response, data: JSON.stringify(data) };
+    notify(key);
+};
+
+const fetchShared = (key, config) => {
+    let shared = inFlight.get(key);
+    // A request sent before the last change may return data from before it
+    if (!shared || shared.generation !== generation) {
+        const started = generation;
+        const request = defaultAdapter(config)
+            .then((response) => {
+                // A 202 is a job id, not the data
+                if (started === generation && response.status === 200) store(key, apiPath(config), response);
+                return response;
+            })
+            .finally(() => {
+                if (inFlight.get(key) === shared) inFlight.delete(key);
+            });
+        shared = { generation: started, request };
+        inFlight.set(key, shared);
+    }
+    return shared.request.then(response => ({ ...response, config }));
+};
+
+const cachedGet = (config) => {
+    const key = cacheKey(config);
+    const entry = cache.get(key);
+    const age = entry ? Date.now() - entry.fetchedAt : Infinity;
+    if (age < STALE_MS) {
+        if (entry.stale || age >= FRESH_MS) {
+            fetchShared(key, config).catch(() => {});
+        }
+        return Promise.resolve({ ...entry.response, config });
+    }
+    return fetchShared(key, config);
+};
+
+// Applies `change` (a task, or null when deleted) to every cached list and
+// to the task's own entry
+const patchTask = (taskId, change) => {
+    for (const [key, entry] of cache) {
+        if (TASK_LIST.test(entry.path)) {
+            rewrite(key, tasks => Array.isArray(tasks)
+                ? tasks.flatMap(t => t.id !== taskId ? [t] : change ? [change(t)] : [])
+                : tasks);
+        } else if (change && entry.path === `tasks/${taskId}/`) {
+            rewrite(key, change);
+        } else if (entry.path === `tasks/${taskId}/`) {
+            cache.delete(key);
+        }
+    }
+};
+
+const mutate = async (config) => {
+    generation += 1;
+    const match = apiPath(config).match(TASK_DETAIL);
+    const taskId = match && ['patch', 'put', 'delete'].includes(config.method) ? Number(match[1]) : null;
+
+    // Whatever the change touched may be in any other response
+    for (const [key, entry] of cache) {
+        if (!taskId || !(TASK_LIST.test(entry.path) || entry.path === `tasks/${taskId}/`)) cache.delete(key);
+    }
+    if (!taskId) {
+        try {
+            return await defaultAdapter(config);
+        } finally {
+            generation += 1;
+        }
+    }
+
+    const snapshot = new Map([...cache].map(([key, entry]) => [key, { ...entry }]));
+    const decoded = decode(config.data);
+    const body = decoded && typeof decoded === 'object' ? decoded : {};
+    // Only fields the task representation has; the server's answer replaces it anyway
+    const merge = task => ({
+        ...task,
+        ...Object.fromEntries(Object.entries(body).filter(([field]) => field in task)),
+    });
+    patchTask(taskId, config.method === 'delete' ? null : merge);
+
+    let response;
+    try {
+        response = await defaultAdapter(config);
+    } catch (error) {
+        for (const [key, saved] of snapshot) {
+            cache.set(key, saved);
+            notify(key);
+        }
+        throw error;
+    } finally {
+        generation += 1;
+    }
+    if (config.method !== 'delete') {
+        const updated = decode(response.data);
+        patchTask(taskId, () => updated);
+    }
+    // Server-side effects (ordering, urgency, recurring tasks) come with the next read
+    for (const entry of cache.values()) entry.stale = true;
+    return response;
+};
+
+const cachingAdapter = (config) => {
+    const token = localStorage.getItem('token');
+    if (token !== cacheToken) {
+        cache.clear();
+        cacheToken = token;
+    }
+    if (config.method !== 'get') return mutate(config);
+    if (config.responseType && config.responseType !== 'json') return defaultAdapter(config);
+    if (JOB.test(apiPath(config))) return defaultAdapter(config);
+    return cachedGet(config);
+};
+
+api.defaults.adapter = cachingAdapter;
+
 api.interceptors.request.use(
     (config) => {
         const token = localStorage.getItem('token');
@@ -27,4 +204,46 @@ api.interceptors.response.use(
     }
 );
 
+// Calls `listener` with the new data whenever the cached GET of `url` (and
+// `params`) changes: background revalidation or a local patch. Returns the
+// unsubscribe function, for useEffect cleanups.
+export const subscribe = (url, listener, params) => {
+    const key = api.getUri({ url, params });
+    if (!listeners.has(key)) listeners.set(key, new Set());
+    listeners.get(key).add(listener);
+    return () => listeners.get(key).delete(listener);
+};
+
+// Runs several API calls in one round trip (POST /api/batch/). Resolves to
+// one {status, body} per request, in order. With atomic, all the changes are
+// rolled back if any of them fails.
+export const batch = async (requests, { atomic = false } = {}) => {
+    const response = await api.post('batch/', { requests, atomic });
+    return response.data.responses;
+};
+
+// Data of a response that may be a 202 + job id (statistics, emptying the
+// trash, using a template): polls the job until it finishes and resolves to
+// its result, or rejects if it fails. Other responses resolve to their data.
+export const jobResult = async (response) => {
+    if (response.status !== 202) return response.data;
+    const deadline = Date.now() + JOB_TIMEOUT_MS;
+    let delay = JOB_POLL_MS;
+    for (;;) {
+        await new Promise(resolve => setTimeout(resolve, delay));
+        const { data: job } = await api.get(`jobs/${response.data.job_id}/`);
+        if (job.status === 'succeeded') {
+            // The change happened after the request; drop what was read in between
+            if (response.config.method !== 'get') {
+                generation += 1;
+                cache.clear();
+            }
+            return job.result;
+        }
+        if (job.status === 'failed') throw new Error(job.error || 'Job failed');
+        if (Date.now() > deadline) throw new Error('Job timed out');
+        delay = Math.min(delay * 2, 4 * JOB_POLL_MS);
+    }
+};
+
 export default api;
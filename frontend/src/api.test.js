@@ -0,0 +1,216 @@
+import { afterEach, beforeEach, describe, mock, test } from 'node:test';
+import assert from 'node:assert/strict';
+import axios, { AxiosError } from 'axios';
+
+// api.js keeps axios' default adapter as its network layer: replace it with
+// a fake server before importing the module
+let handler;
+let gate = null; // a promise the fake server waits for before answering
+const calls = [];
+
+axios.defaults.adapter = async (config) => {
+    const path = config.url.replace(config.baseURL, '');
+    calls.push(`${config.method} ${path}`);
+    await (gate || new Promise(resolve => setTimeout(resolve, 1)));
+    const [status, body] = handler(config.method, path, config.data && JSON.parse(config.data));
+    const response = {
+        data: body === undefined ? '' : JSON.stringify(body),
+        status,
+        statusText: String(status),
+        headers: {},
+        config,
+        request: {},
+    };
+    if (status >= 400) throw new AxiosError('Request failed', AxiosError.ERR_BAD_REQUEST, config, {}, response);
+    return response;
+};
+
+const storage = {};
+globalThis.localStorage = {
+    getItem: key => storage[key] ?? null,
+    setItem: (key, value) => { storage[key] = String(value); },
+    removeItem: key => { delete storage[key]; },
+};
+globalThis.window = { location: {} };
+
+const { default: api, subscribe, jobResult } = await import('./api.js');
+
+let server;
+let tokens = 0;
+
+beforeEach(() => {
+    calls.length = 0;
+    // A new token starts every test with an empty cache
+    storage.token = `token-${++tokens}`;
+    server = {
+        tasks: [{ id: 1, title: 'a', completed: false }, { id: 2, title: 'b', completed: false }],
+        fail: false,
+    };
+    handler = (method, path, body) => {
+        const id = Number(path.split('/')[1]);
+        if (method === 'get' && path === 'tasks/') return [200, server.tasks];
+        if (method === 'get' && path === 'auth/profile/') return [200, { username: 'ana' }];
+        if (method === 'patch' && !server.fail) {
+            server.tasks = server.tasks.map(task => task.id === id ? { ...task, ...body, urgency: 9 } : task);
+            return [200, server.tasks.find(task => task.id === id)];
+        }
+        if (method === 'delete') {
+            server.tasks = server.tasks.filter(task => task.id !== id);
+            return [204, undefined];
+        }
+        if (method === 'post' && path === 'tags/') return [201, { id: 7, ...body }];
+        return [400, { error: 'bad request' }];
+    };
+});
+
+afterEach(() => {
+    gate = null;
+    mock.restoreAll();
+});
+
+const settle = () => new Promise(resolve => setTimeout(resolve, 10));
+
+// Holds the server's answers until the returned function is called
+const holdResponses = () => {
+    let release;
+    gate = new Promise(resolve => { release = resolve; });
+    return () => {
+        gate = null;
+        release();
+    };
+};
+
+describe('GET cache', () => {
+    test('identical requests in flight share one call, and each caller gets its own copy', async () => {
+        const [first, second] = await Promise.all([api.get('tasks/'), api.get('tasks/')]);
+        assert.deepEqual(calls, ['get tasks/']);
+        assert.deepEqual(first.data, server.tasks);
+        assert.notEqual(first.data, second.data);
+    });
+
+    test('fresh responses are served without a request', async () => {
+        await api.get('tasks/');
+        await api.get('tasks/');
+        await api.get('tasks/', { params: { ordering: 'urgency' } });
+        assert.deepEqual(calls, ['get tasks/', 'get tasks/']);
+    });
+
+    test('stale responses are served at once and revalidated in the background', async () => {
+        const now = Date.now();
+        await api.get('auth/profile/');
+        const seen = [];
+        const unsubscribe = subscribe('auth/profile/', data => seen.push(data));
+        handler = () => [200, { username: 'bea' }];
+
+        mock.method(Date, 'now', () => now + 60 * 1000);
+        const response = await api.get('auth/profile/');
+        assert.equal(response.data.username, 'ana');
+        await settle();
+        assert.deepEqual(calls, ['get auth/profile/', 'get auth/profile/']);
+        assert.deepEqual(seen, [{ username: 'bea' }]);
+
+        mock.method(Date, 'now', () => now + 10 * 60 * 1000);
+        unsubscribe();
+        await api.get('auth/profile/');
+        assert.equal(calls.length, 3);
+    });
+
+    test('another token does not see the cached data', async () => {
+        await api.get('auth/profile/');
+        storage.token = 'someone-else';
+        await api.get('auth/profile/');
+        assert.equal(calls.length, 2);
+    });
+
+    test('jobs are never cached', async () => {
+        handler = () => [200, { status: 'running' }];
+        await api.get('jobs/5/');
+        await api.get('jobs/5/');
+        assert.equal(calls.length, 2);
+    });
+});
+
+describe('task changes', () => {
+    test('a PATCH patches the cached list at once, then with the server answer', async () => {
+        await api.get('tasks/');
+        const seen = [];
+        const unsubscribe = subscribe('tasks/', data => seen.push(data));
+
+        const release = holdResponses();
+        const patch = api.patch('tasks/1/', { completed: true, tag_ids: [3] });
+        await settle();
+        assert.equal(seen.length, 1);
+        assert.equal(seen[0][0].completed, true);
+        // Fields the task representation doesn't have are left out
+        assert.equal('tag_ids' in seen[0][0], false);
+
+        release();
+        await patch;
+        assert.equal(seen.at(-1)[0].urgency, 9);
+        const list = await api.get('tasks/');
+        assert.equal(list.data[0].completed, true);
+        unsubscribe();
+    });
+
+    test('a failed PATCH rolls the list back', async () => {
+        await api.get('tasks/');
+        const seen = [];
+        const unsubscribe = subscribe('tasks/', data => seen.push(data));
+        server.fail = true;
+
+        const release = holdResponses();
+        const patch = api.patch('tasks/2/', { title: 'zz' });
+        await settle();
+        assert.equal(seen[0][1].title, 'zz');
+        release();
+        await assert.rejects(patch);
+        assert.equal(seen.at(-1)[1].title, 'b');
+        unsubscribe();
+    });
+
+    test('a DELETE removes the task from the cached list', async () => {
+        await api.get('tasks/');
+        await api.delete('tasks/2/');
+        const list = await api.get('tasks/');
+        assert.deepEqual(list.data.map(task => task.id), [1]);
+    });
+
+    test('after a change the task list is revalidated and other responses are dropped', async () => {
+        await api.get('tasks/');
+        await api.get('auth/profile/');
+        await api.patch('tasks/1/', { title: 'c' });
+        calls.length = 0;
+
+        await api.get('tasks/');
+        await api.get('auth/profile/');
+        await settle();
+        assert.deepEqual(calls.sort(), ['get auth/profile/', 'get tasks/']);
+    });
+
+    test('a GET started before a change is not reused after it', async () => {
+        const before = api.get('tasks/');
+        await api.post('tags/', { name: 'x' });
+        await api.get('tasks/');
+        await before;
+        assert.deepEqual(calls, ['get tasks/', 'post tags/', 'get tasks/']);
+    });
+});
+
+describe('jobResult', () => {
+    test('other responses resolve to their data', async () => {
+        assert.deepEqual(await jobResult({ status: 200, data: { ok: true } }), { ok: true });
+    });
+
+    test('polls the job until it succeeds', async () => {
+        let polls = 0;
+        handler = () => [200, ++polls < 2 ? { status: 'running' } : { status: 'succeeded', result: { deleted: 3 } }];
+        const result = await jobResult({ status: 202, data: { job_id: 5 }, config: { method: 'delete' } });
+        assert.deepEqual(result, { deleted: 3 });
+        assert.deepEqual(calls, ['get jobs/5/', 'get jobs/5/']);
+    });
+
+    test('rejects when the job fails', async () => {
+        handler = () => [200, { status: 'failed', error: 'disk full' }];
+        await assert.rejects(jobResult({ status: 202, data: { job_id: 5 }, config: { method: 'get' } }), /disk full/);
+    });
+});
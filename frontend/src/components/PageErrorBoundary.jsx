@@ -0,0 +1,35 @@
+import React from 'react';
+
+// Shown instead of a page that failed to render, typically because its chunk
+// could not be downloaded (offline, or a new deploy removed the old files).
+// Reloading fetches the current index.html and its chunks.
+class PageErrorBoundary extends React.Component {
+    constructor(props) {
+        super(props);
+        this.state = { error: null };
+    }
+
+    static getDerivedStateFromError(error) {
+        return { error };
+    }
+
+    componentDidCatch(error, info) {
+        console.error('Error loading page:', error, info.componentStack);
+    }
+
+    render() {
+        if (!this.state.error) {
+            return this.props.children;
+        }
+        return (
+            <div className="d-flex flex-column justify-content-center align-items-center vh-100 gap-3">
+                <p>No se pudo cargar la página.</p>
+                <button className="btn btn-primary" onClick={() => window.location.reload()}>
+                    Reintentar
+                </button>
+            </div>
+        );
+    }
+}
+
+export default PageErrorBoundary;
@@ -3,7 +3,15 @@ import { useNavigate } from 'react-router-dom';
 import 'bootstrap-icons/font/bootstrap-icons.css';
 import './Activity.css';
 import logoImage from '../../img/logo-todolist.jpg';
-import api from '../../api';
+import api, { subscribe } from '../../api';
+import { prefetchNav } from '../../routes';
+
+// Field names in ActivityLog.changes
+const FIELD_LABELS = {
+    title: 'título', description: 'descripción', priority: 'prioridad', due_date: 'fecha',
+    project_id: 'proyecto', is_important: 'importante', completed: 'completada', is_deleted: 'papelera',
+    is_archived: 'archivada', recurrence: 'repetición', reminder_offset: 'recordatorio', tags: 'etiquetas',
+};
 
 const Activity = () => {
     const navigate = useNavigate();
@@ -16,6 +24,8 @@ const Activity = () => {
         fetchActivities();
     }, []);
 
+    useEffect(() => subscribe('activity/', setActivities), []);
+
     const fetchUserProfile = async () => {
         try {
             const response = await api.get('auth/profile/');
@@ -122,59 +132,68 @@ const Activity = () => {
         }
     };
 
+    // Several edits of the same task in a row come merged into one UPDATED entry
+    const getChangeSummary = (activity) => {
+        const fields = Object.keys(activity.changes || {}).map(field => FIELD_LABELS[field] || field);
+        const parts = [];
+        if (activity.change_count > 1) parts.push(`${activity.change_count} cambios`);
+        if (fields.length) parts.push(fields.join(', '));
+        return parts.join(' · ');
+    };
+
     return (
         <div className="activity-page">
             <aside className="sidebar">
                 <div className="logo">
                     <img src={logoImage} alt="TaskFlow Logo" className="logo-image" />
                 </div>
-                <nav>
-                    <button className="nav-item" onClick={() => navigate('/todos')}>
+                <nav onMouseOver={prefetchNav}>
+                    <button className="nav-item" onClick={() => navigate('/todos')} data-route="/todos">
                         <i className="bi bi-house-door"></i>
                         <span>Dashboard</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/today')}>
+                    <button className="nav-item" onClick={() => navigate('/today')} data-route="/today">
                         <i className="bi bi-calendar-day"></i>
                         <span>Hoy</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/important')}>
+                    <button className="nav-item" onClick={() => navigate('/important')} data-route="/important">
                         <i className="bi bi-star"></i>
                         <span>Importantes</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/my-tasks')}>
+                    <button className="nav-item" onClick={() => navigate('/my-tasks')} data-route="/my-tasks">
                         <i className="bi bi-list-task"></i>
                         <span>Mis Tareas</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/projects')}>
+                    <button className="nav-item" onClick={() => navigate('/projects')} data-route="/projects">
                         <i className="bi bi-folder"></i>
                         <span>Proyectos</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/calendar')}>
+                    <button className="nav-item" onClick={() => navigate('/calendar')} data-route="/calendar">
                         <i className="bi bi-calendar3"></i>
                         <span>Calendario</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/tags')}>
+                    <button className="nav-item" onClick={() => navigate('/tags')} data-route="/tags">
                         <i className="bi bi-tags"></i>
                         <span>Etiquetas</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/templates')}>
+                    <button className="nav-item" onClick={() => navigate('/templates')} data-route="/templates">
                         <i className="bi bi-file-earmark-text"></i>
                         <span>Plantillas</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/statistics')}>
+                    <button className="nav-item" onClick={() => navigate('/statistics')} data-route="/statistics">
                         <i className="bi bi-graph-up"></i>
                         <span>Estadísticas</span>
                     </button>
-                    <button className="nav-item active" onClick={() => navigate('/activity')}>
+                    <button className="nav-item active" onClick={() => navigate('/activity')} data-route="/activity">
                         <i className="bi bi-clock-history"></i>
                         <span>Actividad</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/trash')}>
+                    <button className="nav-item" onClick={() => navigate('/trash')} data-route="/trash">
                         <i className="bi bi-trash"></i>
                         <span>Papelera</span>
                     </button>
                     <hr style={{ margin: '10px 20px', borderColor: '#e9ecef' }} />
-                    <button className="nav-item" onClick={() => navigate('/settings')}>
+                    <button className="nav-item" onClick={() => navigate('/settings')} data-route="/settings">
                         <i className="bi bi-gear"></i>
                         <span>Configuración</span>
                     </button>
@@ -246,6 +265,9 @@ const Activity = () => {
                                             </div>
                                             <div className="activity-meta">
                                                 <span><i className="bi bi-tag"></i> {activity.target_type}</span>
+                                                {getChangeSummary(activity) && (
+                                                    <span><i className="bi bi-pencil"></i> {getChangeSummary(activity)}</span>
+                                                )}
                                             </div>
                                         </div>
                                     </div>
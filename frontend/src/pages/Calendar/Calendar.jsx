@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
-import api from '../../api';
+import api, { subscribe } from '../../api';
+import { prefetchNav } from '../../routes';
 import 'bootstrap-icons/font/bootstrap-icons.css';
 import './Calendar.css';
 import logoImage from '../../img/logo-todolist.jpg';
@@ -9,25 +10,76 @@ const Calendar = () => {
     const navigate = useNavigate();
     const [currentDate, setCurrentDate] = useState(new Date());
     const [tasks, setTasks] = useState([]);
+    const [dayCounts, setDayCounts] = useState({});
+    const [upcomingTasks, setUpcomingTasks] = useState([]);
     const [user, setUser] = useState({ username: 'Usuario' });
 
     useEffect(() => {
-        fetchTasks();
         const storedUser = localStorage.getItem('user');
         if (storedUser) {
             // setUser(JSON.parse(storedUser));
         }
     }, []);
 
+    useEffect(() => {
+        fetchTasks();
+    }, [currentDate]);
+
+    // The upcoming list doesn't depend on the month shown
+    useEffect(() => {
+        fetchUpcomingTasks();
+        return subscribe('tasks/', setUpcomingTasks, upcomingParams());
+    }, []);
+
+    const toISODate = (date) => {
+        const month = String(date.getMonth() + 1).padStart(2, '0');
+        const day = String(date.getDate()).padStart(2, '0');
+        return `${date.getFullYear()}-${month}-${day}`;
+    };
+
+    // Next 5 due from today on, recurring occurrences included (up to a year ahead)
+    const upcomingParams = () => {
+        const today = new Date();
+        const end = new Date(today.getFullYear() + 1, today.getMonth(), today.getDate() - 1);
+        return {
+            start: toISODate(today),
+            end: toISODate(end),
+            limit: 5,
+            tz: Intl.DateTimeFormat().resolvedOptions().timeZone,
+        };
+    };
+
+    const fetchUpcomingTasks = async () => {
+        try {
+            const response = await api.get('tasks/', { params: upcomingParams() });
+            setUpcomingTasks(response.data);
+        } catch (error) {
+            console.error('Error fetching upcoming tasks:', error);
+        }
+    };
+
+    // Only the tasks of the visible grid (6 weeks) are requested
     const fetchTasks = async () => {
+        const days = getDaysInMonth(currentDate);
         try {
-            const response = await api.get('tasks/');
-            setTasks(response.data);
+            const response = await api.get('calendar/', {
+                params: {
+                    start: toISODate(days[0].date),
+                    end: toISODate(days[days.length - 1].date),
+                    tz: Intl.DateTimeFormat().resolvedOptions().timeZone,
+                }
+            });
+            setTasks(response.data.tasks);
+            setDayCounts(Object.fromEntries(response.data.days.map(d => [d.day, d])));
         } catch (error) {
             console.error('Error fetching tasks:', error);
         }
     };
 
+    // Occurrences of a recurring task that aren't stored have no id: they open their series
+    const taskKey = (task) => task.id ?? `${task.recurrence_parent}-${task.due_date}`;
+    const openTask = (task) => navigate(`/tasks/${task.id ?? task.recurrence_parent}`);
+
     const handleLogout = () => {
         localStorage.removeItem('token');
         navigate('/login');
@@ -115,12 +167,6 @@ const Calendar = () => {
 
     const calendarDays = getDaysInMonth(currentDate);
 
-    // Get upcoming tasks (sorted by due date, future only)
-    const upcomingTasks = tasks
-        .filter(t => t.due_date && new Date(t.due_date) >= new Date().setHours(0, 0, 0, 0))
-        .sort((a, b) => new Date(a.due_date) - new Date(b.due_date))
-        .slice(0, 5);
-
     return (
         <div className="calendar-page">
             {/* Sidebar */}
@@ -129,53 +175,53 @@ const Calendar = () => {
                     <img src={logoImage} alt="TaskFlow Logo" className="logo-image" />
                 </div>
 
-                <nav>
-                    <button className="nav-item" onClick={() => navigate('/todos')}>
+                <nav onMouseOver={prefetchNav}>
+                    <button className="nav-item" onClick={() => navigate('/todos')} data-route="/todos">
                         <i className="bi bi-house-door"></i>
                         <span>Dashboard</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/today')}>
+                    <button className="nav-item" onClick={() => navigate('/today')} data-route="/today">
                         <i className="bi bi-calendar-day"></i>
                         <span>Hoy</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/important')}>
+                    <button className="nav-item" onClick={() => navigate('/important')} data-route="/important">
                         <i className="bi bi-star"></i>
                         <span>Importantes</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/my-tasks')}>
+                    <button className="nav-item" onClick={() => navigate('/my-tasks')} data-route="/my-tasks">
                         <i className="bi bi-list-task"></i>
                         <span>Mis Tareas</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/projects')}>
+                    <button className="nav-item" onClick={() => navigate('/projects')} data-route="/projects">
                         <i className="bi bi-folder"></i>
                         <span>Proyectos</span>
                     </button>
-                    <button className="nav-item active" onClick={() => navigate('/calendar')}>
+                    <button className="nav-item active" onClick={() => navigate('/calendar')} data-route="/calendar">
                         <i className="bi bi-calendar3"></i>
                         <span>Calendario</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/tags')}>
+                    <button className="nav-item" onClick={() => navigate('/tags')} data-route="/tags">
                         <i className="bi bi-tags"></i>
                         <span>Etiquetas</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/templates')}>
+                    <button className="nav-item" onClick={() => navigate('/templates')} data-route="/templates">
                         <i className="bi bi-file-earmark-text"></i>
                         <span>Plantillas</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/statistics')}>
+                    <button className="nav-item" onClick={() => navigate('/statistics')} data-route="/statistics">
                         <i className="bi bi-graph-up"></i>
                         <span>Estadísticas</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/activity')}>
+                    <button className="nav-item" onClick={() => navigate('/activity')} data-route="/activity">
                         <i className="bi bi-clock-history"></i>
                         <span>Actividad</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/trash')}>
+                    <button className="nav-item" onClick={() => navigate('/trash')} data-route="/trash">
                         <i className="bi bi-trash"></i>
                         <span>Papelera</span>
                     </button>
                     <hr style={{ margin: '10px 20px', borderColor: '#e9ecef' }} />
-                    <button className="nav-item" onClick={() => navigate('/settings')}>
+                    <button className="nav-item" onClick={() => navigate('/settings')} data-route="/settings">
                         <i className="bi bi-gear"></i>
                         <span>Configuración</span>
                     </button>
@@ -240,6 +286,7 @@ const Calendar = () => {
                         <div className="calendar-body">
                             {calendarDays.map((dayObj, index) => {
                                 const dayTasks = getTasksForDate(dayObj.date);
+                                const dayCount = dayCounts[toISODate(dayObj.date)]?.total ?? dayTasks.length;
                                 const isCurrentToday = isToday(dayObj.date);
                                 const isCurrentWeekend = isWeekend(dayObj.date);
 
@@ -253,25 +300,25 @@ const Calendar = () => {
                                     >
                                         <div className="day-header">
                                             <span className="day-number">{dayObj.day}</span>
-                                            {dayTasks.length > 0 && (
-                                                <span className="task-count">{dayTasks.length}</span>
+                                            {dayCount > 0 && (
+                                                <span className="task-count">{dayCount}</span>
                                             )}
                                         </div>
                                         <div className="day-tasks">
                                             {dayTasks.slice(0, 3).map(task => (
                                                 <div
-                                                    key={task.id}
+                                                    key={taskKey(task)}
                                                     className={`day-task priority-${task.priority} ${task.completed ? 'completed' : ''}`}
                                                     onClick={(e) => {
                                                         e.stopPropagation();
-                                                        navigate(`/tasks/${task.id}`);
+                                                        openTask(task);
                                                     }}
                                                 >
                                                     {task.title}
                                                 </div>
                                             ))}
-                                            {dayTasks.length > 3 && (
-                                                <span className="more-tasks">+{dayTasks.length - 3} más</span>
+                                            {dayCount > 3 && (
+                                                <span className="more-tasks">+{dayCount - 3} más</span>
                                             )}
                                         </div>
                                     </div>
@@ -309,10 +356,10 @@ const Calendar = () => {
                             ) : (
                                 upcomingTasks.map(task => (
                                     <div
-                                        key={task.id}
+                                        key={taskKey(task)}
                                         className="upcoming-item"
                                         style={{ cursor: 'pointer' }}
-                                        onClick={() => navigate(`/tasks/${task.id}`)}
+                                        onClick={() => openTask(task)}
                                     >
                                         <div className="upcoming-item-header">
                                             <h4>{task.title}</h4>
@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
-import api from '../../api';
+import api, { subscribe } from '../../api';
+import { prefetchNav } from '../../routes';
 import 'bootstrap-icons/font/bootstrap-icons.css';
 import './ImportantTasks.css';
 import logoImage from '../../img/logo-todolist.jpg';
@@ -25,6 +26,9 @@ const ImportantTasks = () => {
         }
     }, []);
 
+    // Background refreshes and local patches of the cached task list
+    useEffect(() => subscribe('tasks/', data => setTasks(data.filter(task => task.is_important))), []);
+
     useEffect(() => {
         filterTasks();
         calculateStats();
@@ -121,53 +125,53 @@ const ImportantTasks = () => {
                     <img src={logoImage} alt="TaskFlow Logo" className="logo-image" />
                 </div>
 
-                <nav>
-                    <button className="nav-item" onClick={() => navigate('/todos')}>
+                <nav onMouseOver={prefetchNav}>
+                    <button className="nav-item" onClick={() => navigate('/todos')} data-route="/todos">
                         <i className="bi bi-house-door"></i>
                         <span>Dashboard</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/today')}>
+                    <button className="nav-item" onClick={() => navigate('/today')} data-route="/today">
                         <i className="bi bi-calendar-day"></i>
                         <span>Hoy</span>
                     </button>
-                    <button className="nav-item active" onClick={() => navigate('/important')}>
+                    <button className="nav-item active" onClick={() => navigate('/important')} data-route="/important">
                         <i className="bi bi-star"></i>
                         <span>Importantes</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/my-tasks')}>
+                    <button className="nav-item" onClick={() => navigate('/my-tasks')} data-route="/my-tasks">
                         <i className="bi bi-list-task"></i>
                         <span>Mis Tareas</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/projects')}>
+                    <button className="nav-item" onClick={() => navigate('/projects')} data-route="/projects">
                         <i className="bi bi-folder"></i>
                         <span>Proyectos</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/calendar')}>
+                    <button className="nav-item" onClick={() => navigate('/calendar')} data-route="/calendar">
                         <i className="bi bi-calendar3"></i>
                         <span>Calendario</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/tags')}>
+                    <button className="nav-item" onClick={() => navigate('/tags')} data-route="/tags">
                         <i className="bi bi-tags"></i>
                         <span>Etiquetas</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/templates')}>
+                    <button className="nav-item" onClick={() => navigate('/templates')} data-route="/templates">
                         <i className="bi bi-file-earmark-text"></i>
                         <span>Plantillas</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/statistics')}>
+                    <button className="nav-item" onClick={() => navigate('/statistics')} data-route="/statistics">
                         <i className="bi bi-graph-up"></i>
                         <span>Estadísticas</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/activity')}>
+                    <button className="nav-item" onClick={() => navigate('/activity')} data-route="/activity">
                         <i className="bi bi-clock-history"></i>
                         <span>Actividad</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/trash')}>
+                    <button className="nav-item" onClick={() => navigate('/trash')} data-route="/trash">
                         <i className="bi bi-trash"></i>
                         <span>Papelera</span>
                     </button>
                     <hr style={{ margin: '10px 20px', borderColor: '#e9ecef' }} />
-                    <button className="nav-item" onClick={() => navigate('/settings')}>
+                    <button className="nav-item" onClick={() => navigate('/settings')} data-route="/settings">
                         <i className="bi bi-gear"></i>
                         <span>Configuración</span>
                     </button>
@@ -3,7 +3,8 @@ import { useNavigate } from 'react-router-dom';
 import 'bootstrap-icons/font/bootstrap-icons.css';
 import './Statistics.css';
 import logoImage from '../../img/logo-todolist.jpg';
-import api from '../../api';
+import api, { jobResult, subscribe } from '../../api';
+import { prefetchNav } from '../../routes';
 
 import {
     Chart as ChartJS,
@@ -33,17 +34,44 @@ ChartJS.register(
     Filler
 );
 
+// Ranges of the history chart; the server widens the bucket if needed
+const HISTORY_RANGES = {
+    month: { label: 'Últimos 30 días', days: 30, bucket: 'day' },
+    quarter: { label: 'Últimas 12 semanas', days: 84, bucket: 'week' },
+    year: { label: 'Último año', days: 365, bucket: 'month' },
+    all: { label: 'Últimos 5 años', days: 5 * 365, bucket: 'month' },
+};
+
+const BUCKET_LABEL_OPTIONS = {
+    day: { day: 'numeric', month: 'short' },
+    week: { day: 'numeric', month: 'short' },
+    month: { month: 'short', year: 'numeric' },
+    year: { year: 'numeric' },
+};
+
+const toISODate = (date) => date.toISOString().slice(0, 10);
+
 const Statistics = () => {
     const navigate = useNavigate();
     const [user, setUser] = useState({ username: '' });
     const [stats, setStats] = useState(null);
     const [loading, setLoading] = useState(true);
+    const [historyRange, setHistoryRange] = useState('month');
+    const [history, setHistory] = useState(null);
 
     useEffect(() => {
         fetchUserProfile();
         fetchStatistics();
     }, []);
 
+    // Only cached when the server answers inline (no job)
+    useEffect(() => subscribe('statistics/', setStats), []);
+
+    useEffect(() => {
+        fetchHistory(historyRange);
+        return subscribe('statistics/history/', setHistory, historyParams(historyRange));
+    }, [historyRange]);
+
     const fetchUserProfile = async () => {
         try {
             const response = await api.get('auth/profile/');
@@ -60,7 +88,7 @@ const Statistics = () => {
     const fetchStatistics = async () => {
         try {
             const response = await api.get('statistics/');
-            setStats(response.data);
+            setStats(await jobResult(response));
         } catch (error) {
             console.error('Error fetching statistics:', error);
         } finally {
@@ -68,6 +96,22 @@ const Statistics = () => {
         }
     };
 
+    const historyParams = (range) => {
+        const { days, bucket } = HISTORY_RANGES[range];
+        const end = new Date();
+        const start = new Date(end.getTime() - (days - 1) * 24 * 60 * 60 * 1000);
+        return { start: toISODate(start), end: toISODate(end), bucket };
+    };
+
+    const fetchHistory = async (range) => {
+        try {
+            const response = await api.get('statistics/history/', { params: historyParams(range) });
+            setHistory(response.data);
+        } catch (error) {
+            console.error('Error fetching history:', error);
+        }
+    };
+
     const getInitials = () => {
         if (user.first_name && user.last_name) {
             return `${user.first_name[0]}${user.last_name[0]}`.toUpperCase();
@@ -133,6 +177,31 @@ const Statistics = () => {
         }]
     };
 
+    const historyData = history && {
+        labels: history.labels.map(label =>
+            new Date(`${label}T00:00:00`).toLocaleDateString('es-ES', BUCKET_LABEL_OPTIONS[history.bucket])
+        ),
+        datasets: [
+            {
+                label: 'Creadas',
+                data: history.created,
+                backgroundColor: 'rgba(102, 126, 234, 0.35)',
+                borderRadius: 4
+            },
+            {
+                label: 'Completadas',
+                data: history.completed,
+                backgroundColor: '#667eea',
+                borderRadius: 4
+            }
+        ]
+    };
+
+    const historyOptions = {
+        ...chartOptions,
+        plugins: { ...chartOptions.plugins, legend: { display: true, position: 'bottom' } }
+    };
+
     const projectData = {
         labels: stats.charts.projects.labels,
         datasets: [{
@@ -165,53 +234,53 @@ const Statistics = () => {
                 <div className="logo">
                     <img src={logoImage} alt="TaskFlow Logo" className="logo-image" />
                 </div>
-                <nav>
-                    <button className="nav-item" onClick={() => navigate('/todos')}>
+                <nav onMouseOver={prefetchNav}>
+                    <button className="nav-item" onClick={() => navigate('/todos')} data-route="/todos">
                         <i className="bi bi-house-door"></i>
                         <span>Dashboard</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/today')}>
+                    <button className="nav-item" onClick={() => navigate('/today')} data-route="/today">
                         <i className="bi bi-calendar-day"></i>
                         <span>Hoy</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/important')}>
+                    <button className="nav-item" onClick={() => navigate('/important')} data-route="/important">
                         <i className="bi bi-star"></i>
                         <span>Importantes</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/my-tasks')}>
+                    <button className="nav-item" onClick={() => navigate('/my-tasks')} data-route="/my-tasks">
                         <i className="bi bi-list-task"></i>
                         <span>Mis Tareas</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/projects')}>
+                    <button className="nav-item" onClick={() => navigate('/projects')} data-route="/projects">
                         <i className="bi bi-folder"></i>
                         <span>Proyectos</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/calendar')}>
+                    <button className="nav-item" onClick={() => navigate('/calendar')} data-route="/calendar">
                         <i className="bi bi-calendar3"></i>
                         <span>Calendario</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/tags')}>
+                    <button className="nav-item" onClick={() => navigate('/tags')} data-route="/tags">
                         <i className="bi bi-tags"></i>
                         <span>Etiquetas</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/templates')}>
+                    <button className="nav-item" onClick={() => navigate('/templates')} data-route="/templates">
                         <i className="bi bi-file-earmark-text"></i>
                         <span>Plantillas</span>
                     </button>
-                    <button className="nav-item active" onClick={() => navigate('/statistics')}>
+                    <button className="nav-item active" onClick={() => navigate('/statistics')} data-route="/statistics">
                         <i className="bi bi-graph-up"></i>
                         <span>Estadísticas</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/activity')}>
+                    <button className="nav-item" onClick={() => navigate('/activity')} data-route="/activity">
                         <i className="bi bi-clock-history"></i>
                         <span>Actividad</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/trash')}>
+                    <button className="nav-item" onClick={() => navigate('/trash')} data-route="/trash">
                         <i className="bi bi-trash"></i>
                         <span>Papelera</span>
                     </button>
                     <hr style={{ margin: '10px 20px', borderColor: '#e9ecef' }} />
-                    <button className="nav-item" onClick={() => navigate('/settings')}>
+                    <button className="nav-item" onClick={() => navigate('/settings')} data-route="/settings">
                         <i className="bi bi-gear"></i>
                         <span>Configuración</span>
                     </button>
@@ -294,6 +363,31 @@ const Statistics = () => {
                     </div>
                 </div>
 
+                {/* Created vs completed over time */}
+                <div className="chart-card mb-4">
+                    <div className="d-flex justify-content-between align-items-center">
+                        <div className="chart-title">Tareas Creadas vs Completadas</div>
+                        <select
+                            className="form-select form-select-sm w-auto"
+                            value={historyRange}
+                            onChange={(e) => setHistoryRange(e.target.value)}
+                        >
+                            {Object.entries(HISTORY_RANGES).map(([key, range]) => (
+                                <option key={key} value={key}>{range.label}</option>
+                            ))}
+                        </select>
+                    </div>
+                    <div className="chart-container" style={{ height: '300px' }}>
+                        {historyData ? (
+                            <Bar data={historyData} options={historyOptions} />
+                        ) : (
+                            <div className="d-flex h-100 justify-content-center align-items-center text-muted">
+                                Cargando...
+                            </div>
+                        )}
+                    </div>
+                </div>
+
                 {/* Secondary Charts Grid */}
                 <div className="charts-grid">
                     <div className="chart-card">
@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
-import api from '../../api';
+import api, { subscribe } from '../../api';
+import { prefetchNav } from '../../routes';
 import 'bootstrap-icons/font/bootstrap-icons.css';
 import './Tags.css';
 import logoImage from '../../img/logo-todolist.jpg';
@@ -10,7 +11,8 @@ const Tags = () => {
     const [tags, setTags] = useState([]);
     const [user, setUser] = useState({ username: '' });
     const [showModal, setShowModal] = useState(false);
-    const [tasks, setTasks] = useState([]); // All tasks to count relations
+    const [tasks, setTasks] = useState(null); // Loaded the first time a tag is expanded
+    const [tagCounts, setTagCounts] = useState({}); // { tagId: number of tasks }
     const [expandedTags, setExpandedTags] = useState({}); // { tagId: boolean }
 
     // Form State
@@ -23,7 +25,17 @@ const Tags = () => {
     useEffect(() => {
         fetchUserProfile();
         fetchTags();
-        fetchTasks();
+        fetchCounts();
+    }, []);
+
+    // Background revalidation and local task edits
+    useEffect(() => {
+        const unsubscribes = [
+            subscribe('tags/', setTags),
+            subscribe('counts/', data => setTagCounts(data.tags)),
+            subscribe('tasks/', setTasks),
+        ];
+        return () => unsubscribes.forEach(unsubscribe => unsubscribe());
     }, []);
 
     const fetchUserProfile = async () => {
@@ -44,6 +56,15 @@ const Tags = () => {
         }
     };
 
+    const fetchCounts = async () => {
+        try {
+            const response = await api.get('counts/');
+            setTagCounts(response.data.tags);
+        } catch (error) {
+            console.error('Error fetching counts:', error);
+        }
+    };
+
     const fetchTasks = async () => {
         try {
             const response = await api.get('tasks/');
@@ -60,6 +81,7 @@ const Tags = () => {
             setShowModal(false);
             setNewTag({ name: '', color: '#667eea', icon: 'bi-tag' });
             fetchTags();
+            fetchCounts();
         } catch (error) {
             console.error('Error creating tag:', error);
         }
@@ -78,15 +100,18 @@ const Tags = () => {
     };
 
     const toggleExpand = (id) => {
+        if (tasks === null) {
+            fetchTasks();
+        }
         setExpandedTags(prev => ({ ...prev, [id]: !prev[id] }));
     };
 
     const getTagTaskCount = (tagId) => {
-        return tasks.filter(task => task.tags.some(t => t.id === tagId)).length;
+        return tagCounts[tagId] || 0;
     };
 
     const getTagTasks = (tagId) => {
-        return tasks.filter(task => task.tags.some(t => t.id === tagId));
+        return (tasks || []).filter(task => task.tags.some(t => t.id === tagId));
     };
 
     const getTagSizeClass = (count) => {
@@ -115,53 +140,53 @@ const Tags = () => {
                 <div className="logo">
                     <img src={logoImage} alt="TaskFlow Logo" className="logo-image" />
                 </div>
-                <nav>
-                    <button className="nav-item" onClick={() => navigate('/todos')}>
+                <nav onMouseOver={prefetchNav}>
+                    <button className="nav-item" onClick={() => navigate('/todos')} data-route="/todos">
                         <i className="bi bi-house-door"></i>
                         <span>Dashboard</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/today')}>
+                    <button className="nav-item" onClick={() => navigate('/today')} data-route="/today">
                         <i className="bi bi-calendar-day"></i>
                         <span>Hoy</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/important')}>
+                    <button className="nav-item" onClick={() => navigate('/important')} data-route="/important">
                         <i className="bi bi-star"></i>
                         <span>Importantes</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/my-tasks')}>
+                    <button className="nav-item" onClick={() => navigate('/my-tasks')} data-route="/my-tasks">
                         <i className="bi bi-list-task"></i>
                         <span>Mis Tareas</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/projects')}>
+                    <button className="nav-item" onClick={() => navigate('/projects')} data-route="/projects">
                         <i className="bi bi-folder"></i>
                         <span>Proyectos</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/calendar')}>
+                    <button className="nav-item" onClick={() => navigate('/calendar')} data-route="/calendar">
                         <i className="bi bi-calendar3"></i>
                         <span>Calendario</span>
                     </button>
-                    <button className="nav-item active" onClick={() => navigate('/tags')}>
+                    <button className="nav-item active" onClick={() => navigate('/tags')} data-route="/tags">
                         <i className="bi bi-tags"></i>
                         <span>Etiquetas</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/templates')}>
+                    <button className="nav-item" onClick={() => navigate('/templates')} data-route="/templates">
                         <i className="bi bi-file-earmark-text"></i>
                         <span>Plantillas</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/statistics')}>
+                    <button className="nav-item" onClick={() => navigate('/statistics')} data-route="/statistics">
                         <i className="bi bi-graph-up"></i>
                         <span>Estadísticas</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/activity')}>
+                    <button className="nav-item" onClick={() => navigate('/activity')} data-route="/activity">
                         <i className="bi bi-clock-history"></i>
                         <span>Actividad</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/trash')}>
+                    <button className="nav-item" onClick={() => navigate('/trash')} data-route="/trash">
                         <i className="bi bi-trash"></i>
                         <span>Papelera</span>
                     </button>
                     <hr style={{ margin: '10px 20px', borderColor: '#e9ecef' }} />
-                    <button className="nav-item" onClick={() => navigate('/settings')}>
+                    <button className="nav-item" onClick={() => navigate('/settings')} data-route="/settings">
                         <i className="bi bi-gear"></i>
                         <span>Configuración</span>
                     </button>
@@ -12,6 +12,8 @@ const CreateTodo = () => {
     const [date, setDate] = useState('');
     const [time, setTime] = useState('');
     const [priority, setPriority] = useState('medium');
+    const [reminderOffset, setReminderOffset] = useState('');
+    const [recurrence, setRecurrence] = useState('');
     const [projectId, setProjectId] = useState(null);
     const [error, setError] = useState('');
 
@@ -38,6 +40,9 @@ const CreateTodo = () => {
                 description,
                 priority,
                 due_date,
+                reminder_offset: date && reminderOffset !== '' ? Number(reminderOffset) : null,
+                // A repeating task needs a due date to count from
+                recurrence: date ? recurrence : '',
                 project_id: projectId
             });
             navigate('/todos');
@@ -122,6 +127,46 @@ const CreateTodo = () => {
                             </div>
                         </div>
 
+                        {/* Reminder */}
+                        <div className="mb-4">
+                            <label className="form-label">Recordatorio</label>
+                            <div className="input-icon">
+                                <i className="bi bi-bell"></i>
+                                <select
+                                    className="form-control"
+                                    value={reminderOffset}
+                                    onChange={(e) => setReminderOffset(e.target.value)}
+                                    disabled={!date}
+                                >
+                                    <option value="">Sin recordatorio</option>
+                                    <option value="0">A la hora de vencimiento</option>
+                                    <option value="15">15 minutos antes</option>
+                                    <option value="60">1 hora antes</option>
+                                    <option value="1440">1 día antes</option>
+                                </select>
+                            </div>
+                        </div>
+
+                        {/* Recurrence */}
+                        <div className="mb-4">
+                            <label className="form-label">Repetir</label>
+                            <div className="input-icon">
+                                <i className="bi bi-arrow-repeat"></i>
+                                <select
+                                    className="form-control"
+                                    value={recurrence}
+                                    onChange={(e) => setRecurrence(e.target.value)}
+                                    disabled={!date}
+                                >
+                                    <option value="">No se repite</option>
+                                    <option value="FREQ=DAILY">Cada día</option>
+                                    <option value="FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR">De lunes a viernes</option>
+                                    <option value="FREQ=WEEKLY">Cada semana</option>
+                                    <option value="FREQ=MONTHLY">Cada mes</option>
+                                </select>
+                            </div>
+                        </div>
+
                         {/* Priority */}
                         <div className="mb-4">
                             <label className="form-label">Prioridad</label>
@@ -4,6 +4,9 @@ import api from '../../api';
 import 'bootstrap-icons/font/bootstrap-icons.css';
 import './CreateTodo.css'; // Reuse the same styles
 
+// Rules the "Repetir" select offers; others (set through the API) are shown as custom
+const PRESET_RULES = ['', 'FREQ=DAILY', 'FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR', 'FREQ=WEEKLY', 'FREQ=MONTHLY'];
+
 const EditTodo = () => {
     const { id } = useParams();
     const navigate = useNavigate();
@@ -12,6 +15,10 @@ const EditTodo = () => {
     const [date, setDate] = useState('');
     const [time, setTime] = useState('');
     const [priority, setPriority] = useState('medium');
+    const [reminderOffset, setReminderOffset] = useState('');
+    const [recurrence, setRecurrence] = useState('');
+    // Occurrences of a series repeat with it; they can't have their own rule
+    const [isOccurrence, setIsOccurrence] = useState(false);
     const [error, setError] = useState('');
     const [loading, setLoading] = useState(true);
 
@@ -26,6 +33,9 @@ const EditTodo = () => {
             setTitle(task.title);
             setDescription(task.description);
             setPriority(task.priority);
+            setReminderOffset(task.reminder_offset ?? '');
+            setRecurrence(task.recurrence);
+            setIsOccurrence(Boolean(task.recurrence_parent));
 
             if (task.due_date) {
                 const dateObj = new Date(task.due_date);
@@ -53,7 +63,9 @@ const EditTodo = () => {
                 title,
                 description,
                 priority,
-                due_date
+                due_date,
+                reminder_offset: date && reminderOffset !== '' ? Number(reminderOffset) : null,
+                ...(isOccurrence ? {} : { recurrence: date ? recurrence : '' })
             });
             navigate(`/tasks/${id}`);
         } catch (err) {
@@ -139,6 +151,49 @@ const EditTodo = () => {
                             </div>
                         </div>
 
+                        {/* Reminder */}
+                        <div className="mb-4">
+                            <label className="form-label">Recordatorio</label>
+                            <div className="input-icon">
+                                <i className="bi bi-bell"></i>
+                                <select
+                                    className="form-control"
+                                    value={reminderOffset}
+                                    onChange={(e) => setReminderOffset(e.target.value)}
+                                    disabled={!date}
+                                >
+                                    <option value="">Sin recordatorio</option>
+                                    <option value="0">A la hora de vencimiento</option>
+                                    <option value="15">15 minutos antes</option>
+                                    <option value="60">1 hora antes</option>
+                                    <option value="1440">1 día antes</option>
+                                </select>
+                            </div>
+                        </div>
+
+                        {/* Recurrence */}
+                        <div className="mb-4">
+                            <label className="form-label">Repetir</label>
+                            <div className="input-icon">
+                                <i className="bi bi-arrow-repeat"></i>
+                                <select
+                                    className="form-control"
+                                    value={recurrence}
+                                    onChange={(e) => setRecurrence(e.target.value)}
+                                    disabled={!date || isOccurrence}
+                                >
+                                    <option value="">No se repite</option>
+                                    <option value="FREQ=DAILY">Cada día</option>
+                                    <option value="FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR">De lunes a viernes</option>
+                                    <option value="FREQ=WEEKLY">Cada semana</option>
+                                    <option value="FREQ=MONTHLY">Cada mes</option>
+                                    {recurrence && !PRESET_RULES.includes(recurrence) && (
+                                        <option value={recurrence}>Personalizada ({recurrence})</option>
+                                    )}
+                                </select>
+                            </div>
+                        </div>
+
                         {/* Priority */}
                         <div className="mb-4">
                             <label className="form-label">Prioridad</label>
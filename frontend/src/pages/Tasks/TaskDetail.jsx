@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
-import api from '../../api';
+import api, { batch } from '../../api';
+import { prefetchNav } from '../../routes';
 import 'bootstrap-icons/font/bootstrap-icons.css';
 import './TaskDetail.css';
 import logoImage from '../../img/logo-todolist.jpg';
@@ -19,7 +20,7 @@ const TaskDetail = () => {
     const [newTag, setNewTag] = useState('');
 
     // Tag State
-    const [allTags, setAllTags] = useState([]);
+    const [tagSuggestions, setTagSuggestions] = useState([]);
     const [showTagDropdown, setShowTagDropdown] = useState(false);
     const [activeTagMenuId, setActiveTagMenuId] = useState(null);
 
@@ -30,32 +31,28 @@ const TaskDetail = () => {
 
     useEffect(() => {
         fetchTask();
-        fetchTags();
         const storedUser = localStorage.getItem('user');
         if (storedUser) {
             // setUser(JSON.parse(storedUser));
         }
     }, [id]);
 
-    const fetchTags = async () => {
-        try {
-            const response = await api.get('tags/');
-            setAllTags(response.data);
-        } catch (err) {
-            console.error('Error fetching tags:', err);
-        }
-    };
-
     const fetchTask = async () => {
         try {
             const response = await api.get(`tasks/${id}/`);
             setTask(response.data);
-            setLoading(false);
         } catch (err) {
             console.error('Error fetching task:', err);
             setError('Error loading task details');
-            setLoading(false);
         }
+        setLoading(false);
+    };
+
+    // Applies a change and re-reads the task in one round trip
+    const mutateAndRefresh = async (request) => {
+        const [result, refreshed] = await batch([request, { method: 'GET', path: `tasks/${id}/` }]);
+        if (result.status >= 400) throw new Error(`${request.method} ${request.path}: ${result.status}`);
+        setTask(refreshed.body);
     };
 
     const handleDelete = async () => {
@@ -95,9 +92,8 @@ const TaskDetail = () => {
         e.preventDefault();
         if (!newSubtask.trim()) return;
         try {
-            await api.post('subtasks/', { title: newSubtask, task: id });
+            await mutateAndRefresh({ method: 'POST', path: 'subtasks/', body: { title: newSubtask, task: id } });
             setNewSubtask('');
-            fetchTask();
         } catch (err) {
             console.error('Error adding subtask:', err);
         }
@@ -105,8 +101,7 @@ const TaskDetail = () => {
 
     const handleToggleSubtask = async (subtaskId, currentStatus) => {
         try {
-            await api.patch(`subtasks/${subtaskId}/`, { completed: !currentStatus });
-            fetchTask();
+            await mutateAndRefresh({ method: 'PATCH', path: `subtasks/${subtaskId}/`, body: { completed: !currentStatus } });
         } catch (err) {
             console.error('Error toggling subtask:', err);
         }
@@ -114,8 +109,7 @@ const TaskDetail = () => {
 
     const handleDeleteSubtask = async (subtaskId) => {
         try {
-            await api.delete(`subtasks/${subtaskId}/`);
-            fetchTask();
+            await mutateAndRefresh({ method: 'DELETE', path: `subtasks/${subtaskId}/` });
         } catch (err) {
             console.error('Error deleting subtask:', err);
         }
@@ -126,9 +120,8 @@ const TaskDetail = () => {
         e.preventDefault();
         if (!newComment.trim()) return;
         try {
-            await api.post('comments/', { content: newComment, task: id });
+            await mutateAndRefresh({ method: 'POST', path: 'comments/', body: { content: newComment, task: id } });
             setNewComment('');
-            fetchTask();
         } catch (err) {
             console.error('Error adding comment:', err);
         }
@@ -144,9 +137,8 @@ const TaskDetail = () => {
         e.preventDefault();
         if (!editingContent.trim()) return;
         try {
-            await api.patch(`comments/${editingCommentId}/`, { content: editingContent });
+            await mutateAndRefresh({ method: 'PATCH', path: `comments/${editingCommentId}/`, body: { content: editingContent } });
             setEditingCommentId(null);
-            fetchTask();
         } catch (err) {
             console.error('Error updating comment:', err);
         }
@@ -155,64 +147,61 @@ const TaskDetail = () => {
     const handleDeleteComment = async (commentId) => {
         if (!window.confirm('¿Eliminar este comentario?')) return;
         try {
-            await api.delete(`comments/${commentId}/`);
-            fetchTask();
+            await mutateAndRefresh({ method: 'DELETE', path: `comments/${commentId}/` });
         } catch (err) {
             console.error('Error deleting comment:', err);
         }
     };
 
     // Tags Handlers
-    const [availableTags, setAvailableTags] = useState([]);
-
+    // Suggestions come from the server as the user types (prefix match, most used first)
     useEffect(() => {
-        const fetchTags = async () => {
+        if (!showTagDropdown) return;
+        let cancelled = false;
+        const timer = setTimeout(async () => {
             try {
-                const response = await api.get('tags/');
-                setAvailableTags(response.data);
-            } catch (error) {
-                console.error("Error fetching tags", error);
+                const response = await api.get('tags/', { params: { prefix: newTag.trim(), limit: 20 } });
+                if (!cancelled) setTagSuggestions(response.data);
+            } catch (err) {
+                console.error('Error fetching tags:', err);
             }
+        }, 150);
+        return () => {
+            cancelled = true;
+            clearTimeout(timer);
         };
-        fetchTags();
-    }, []);
+    }, [newTag, showTagDropdown]);
 
     const handleAddTag = async (e) => {
-        if (e.key === 'Enter' && e.target.value.trim()) {
-            e.preventDefault();
-            const tagName = e.target.value.trim();
-
-            // Check if already assigned to task
-            if (task.tags.some(t => t.name.toLowerCase() === tagName.toLowerCase())) {
-                e.target.value = '';
-                return;
-            }
+        e.preventDefault();
+        const tagName = newTag.trim();
+        if (!tagName) return;
 
-            try {
-                let tagToAdd;
-
-                // Check if exists in available tags
-                const existingTag = availableTags.find(t => t.name.toLowerCase() === tagName.toLowerCase());
-
-                if (existingTag) {
-                    tagToAdd = existingTag;
-                } else {
-                    // Create new
-                    const response = await api.post('tags/', { name: tagName });
-                    tagToAdd = response.data;
-                    setAvailableTags([...availableTags, tagToAdd]);
-                }
-
-                const currentTagIds = task.tags.map(t => t.id);
-                await api.patch(`tasks/${id}/`, {
-                    tag_ids: [...currentTagIds, tagToAdd.id]
-                });
-
-                fetchTask(); // Refresh task
-                e.target.value = '';
-            } catch (error) {
-                console.error('Error adding tag:', error);
+        // Check if already assigned to task
+        if (task.tags.some(t => t.name.toLowerCase() === tagName.toLowerCase())) {
+            setNewTag('');
+            return;
+        }
+
+        try {
+            // An exact match always comes first
+            const matches = await api.get('tags/', { params: { prefix: tagName, limit: 1 } });
+            let tagToAdd = matches.data.find(t => t.name.toLowerCase() === tagName.toLowerCase());
+
+            if (!tagToAdd) {
+                // Create new
+                const response = await api.post('tags/', { name: tagName });
+                tagToAdd = response.data;
             }
+
+            const currentTagIds = task.tags.map(t => t.id);
+            await mutateAndRefresh({
+                method: 'PATCH', path: `tasks/${id}/`, body: { tag_ids: [...currentTagIds, tagToAdd.id] }
+            });
+            setNewTag('');
+            setShowTagDropdown(false);
+        } catch (error) {
+            console.error('Error adding tag:', error);
         }
     };
 
@@ -226,10 +215,9 @@ const TaskDetail = () => {
 
         try {
             const currentTagIds = task.tags.map(t => t.id);
-            await api.patch(`tasks/${id}/`, { tag_ids: [...currentTagIds, tag.id] });
+            await mutateAndRefresh({ method: 'PATCH', path: `tasks/${id}/`, body: { tag_ids: [...currentTagIds, tag.id] } });
             setNewTag('');
             setShowTagDropdown(false);
-            fetchTask();
         } catch (err) {
             console.error('Error assigning tag:', err);
         }
@@ -238,8 +226,7 @@ const TaskDetail = () => {
     const handleDeleteTag = async (tagId) => {
         try {
             const currentTagIds = task.tags.map(t => t.id).filter(id => id !== tagId);
-            await api.patch(`tasks/${id}/`, { tag_ids: currentTagIds });
-            fetchTask();
+            await mutateAndRefresh({ method: 'PATCH', path: `tasks/${id}/`, body: { tag_ids: currentTagIds } });
         } catch (err) {
             console.error('Error removing tag:', err);
         }
@@ -278,32 +265,32 @@ const TaskDetail = () => {
                     <img src={logoImage} alt="TaskFlow Logo" className="logo-image" />
                 </div>
 
-                <nav>
-                    <button className="nav-item" onClick={() => navigate('/todos')}>
+                <nav onMouseOver={prefetchNav}>
+                    <button className="nav-item" onClick={() => navigate('/todos')} data-route="/todos">
                         <i className="bi bi-house-door"></i>
                         <span>Dashboard</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/today')}>
+                    <button className="nav-item" onClick={() => navigate('/today')} data-route="/today">
                         <i className="bi bi-calendar-day"></i>
                         <span>Hoy</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/important')}>
+                    <button className="nav-item" onClick={() => navigate('/important')} data-route="/important">
                         <i className="bi bi-star"></i>
                         <span>Importantes</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/my-tasks')}>
+                    <button className="nav-item" onClick={() => navigate('/my-tasks')} data-route="/my-tasks">
                         <i className="bi bi-list-task"></i>
                         <span>Mis Tareas</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/projects')}>
+                    <button className="nav-item" onClick={() => navigate('/projects')} data-route="/projects">
                         <i className="bi bi-folder"></i>
                         <span>Proyectos</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/calendar')}>
+                    <button className="nav-item" onClick={() => navigate('/calendar')} data-route="/calendar">
                         <i className="bi bi-calendar3"></i>
                         <span>Calendario</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/tags')}>
+                    <button className="nav-item" onClick={() => navigate('/tags')} data-route="/tags">
                         <i className="bi bi-tags"></i>
                         <span>Etiquetas</span>
                     </button>
@@ -311,20 +298,20 @@ const TaskDetail = () => {
                         <i className="bi bi-file-earmark-text"></i>
                         <span>Plantillas</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/statistics')}>
+                    <button className="nav-item" onClick={() => navigate('/statistics')} data-route="/statistics">
                         <i className="bi bi-graph-up"></i>
                         <span>Estadísticas</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/activity')}>
+                    <button className="nav-item" onClick={() => navigate('/activity')} data-route="/activity">
                         <i className="bi bi-clock-history"></i>
                         <span>Actividad</span>
                     </button>
-                    <button className="nav-item" onClick={() => navigate('/trash')}>
+                    <button className="nav-item" onClick={() => navigate('/trash')} data-route="/trash">
                         <i className="bi bi-trash"></i>
                         <span>Papelera</span>
                     </button>
                     <hr style={{ margin: '10px 20px', borderColor: '#e9ecef' }} />
-                    <button className="nav-item" onClick={() => navigate('/settings')}>
+                    <button className="nav-item" onClick={() => navigate('/settings')} data-route="/settings">
                         <i className="bi bi-gear"></i>
                         <span>Configuración</span>
                     </button>
@@ -611,8 +598,7 @@ const TaskDetail = () => {
 
                                     {showTagDropdown && (
                                         <div className="tag-suggestions">
-                                            {allTags
-                                                .filter(t => !newTag || t.name.toLowerCase().includes(newTag.toLowerCase()))
+                                            {tagSuggestions
                                                 .map(tag => (
                                                     <button
                                                         key={tag.id}
@@ -633,12 +619,12 @@ const TaskDetail = () => {
                                                     </button>
                                                 ))
                                             }
-                                            {newTag && !allTags.some(t => t.name.toLowerCase() === newTag.toLowerCase()) && (
+                                            {newTag.trim() && !tagSuggestions.some(t => t.name.toLowerCase() === newTag.trim().toLowerCase()) && (
                                                 <button type="submit" className="tag-suggestion-item create-new">
                                                     <i className="bi bi-plus"></i> Crear "{newTag}"
                                                 </button>
                                             )}
-                                            {allTags.length === 0 && !newTag && (
+                                            {tagSuggestions.length === 0 && !newTag && (
                                                 <div className="p-2 text-muted small">No hay etiquetas creadas. Escribe para crear una.</div>
                                             )}
                                         </div>
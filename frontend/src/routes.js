@@ -0,0 +1,43 @@
+import { lazy } from 'react';
+
+// Pages loaded on demand, by route. Each one becomes its own chunk, fetched
+// on first visit or earlier with prefetchRoute() (sidebar hover, through
+// prefetchNav).
+const pageLoaders = {
+    '/register': () => import('./pages/Auth/Register'),
+    '/my-tasks': () => import('./pages/MyTasks/MyTasks'),
+    '/calendar': () => import('./pages/Calendar/Calendar'),
+    '/projects': () => import('./pages/Projects/Projects'),
+    '/tasks/:id': () => import('./pages/Tasks/TaskDetail'),
+    '/edit/:id': () => import('./pages/Tasks/EditTodo'),
+    '/create': () => import('./pages/Tasks/CreateTodo'),
+    '/important': () => import('./pages/Important/ImportantTasks'),
+    '/settings': () => import('./pages/Settings/Settings'),
+    '/activity': () => import('./pages/Activity/Activity'),
+    '/today': () => import('./pages/Today/Today'),
+    '/tags': () => import('./pages/Tags/Tags'),
+    '/trash': () => import('./pages/Trash/Trash'),
+    '/statistics': () => import('./pages/Statistics/Statistics'),
+    '/templates': () => import('./pages/Templates/Templates'),
+};
+
+export const lazyPage = (path) => lazy(pageLoaders[path]);
+
+// Starts downloading a route's chunk; the browser keeps the module, so the
+// later lazy() load resolves at once. Eager routes have no loader.
+const prefetched = new Set();
+
+export const prefetchRoute = (path) => {
+    const load = pageLoaders[path];
+    if (!load || prefetched.has(path)) return;
+    prefetched.add(path);
+    // A failed download is tried again on the next hover
+    load().catch(() => prefetched.delete(path));
+};
+
+// onMouseOver of a sidebar <nav>: one handler for all its items, each naming
+// its route in data-route
+export const prefetchNav = (event) => {
+    const item = event.target.closest('[data-route]');
+    if (item) prefetchRoute(item.dataset.route);
+};
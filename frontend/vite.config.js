@@ -1,7 +1,19 @@
 import { defineConfig } from 'vite'
 import react from '@vitejs/plugin-react'
+import { bundleReport } from './bundleReport.js'
 
 // https://vite.dev/config/
 export default defineConfig({
-  plugins: [react()],
+  plugins: [react(), bundleReport()],
+  build: {
+    rollupOptions: {
+      output: {
+        // Charts are only used by Statistics; as their own chunk they are
+        // cached separately from the page code
+        manualChunks: {
+          charts: ['chart.js', 'react-chartjs-2'],
+        },
+      },
+    },
+  },
 })